@@ -1,26 +1,68 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
 from flask_socketio import SocketIO
 from flask_cors import CORS
-from flask_migrate import Migrate
+from flask_jwt_extended import JWTManager
+from app.utils.database import RoutingSession
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 socketio = SocketIO()
-migrate = Migrate()
 
-def create_app():
+# Components a worker can be built with - see APP_COMPONENTS in config.
+# Modules are only imported for the components that are enabled.
+BLUEPRINTS = {
+    'auth': 'app.routes.auth:auth_bp',
+    'events': 'app.routes.events:events_bp',
+    'chat': 'app.routes.chat:chat_bp',
+    'reviews': 'app.routes.reviews:reviews_bp',
+    'admin': 'app.routes.admin:admin_bp',
+    'batch': 'app.routes.batch:batch_bp',
+}
+
+def create_app(test_config=None):
     app = Flask(__name__)
     
     # Load configuration
     app.config.from_object('app.config.Config')
+    if test_config:
+        app.config.update(test_config)
+    
+    from app.utils.json_provider import make_json_provider
+    app.json = make_json_provider(app)
+    
+    from app.utils.log import init_logging
+    init_logging(app)
     
     # Initialize extensions
     db.init_app(app)
+    from app.utils.database import configure_engine, check_cooperative_driver
+    from app.utils.metrics import init_metrics
+    from app.utils.query_profiler import init_query_profiler
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config)
+            check_cooperative_driver(engine, app.config['ASYNC_MODE'])
+        init_metrics(app, db.engines.values())
+        init_query_profiler(app, db.engines.values())
     jwt.init_app(app)
-    socketio.init_app(app, cors_allowed_origins="*")
-    migrate.init_app(app, db)
+    from app.utils.auth import token_blocklist
+    token_blocklist.init_app(app, jwt)
+    socketio.init_app(app,
+                      async_mode=app.config['ASYNC_MODE'],
+                      cors_allowed_origins="*",
+                      http_compression=app.config['SOCKETIO_HTTP_COMPRESSION'],
+                      compression_threshold=app.config['SOCKETIO_COMPRESSION_THRESHOLD'],
+                      message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
+    
+    # Flask-Migrate pulls in Alembic, which only the `flask db` commands need
+    if app.config['MIGRATIONS_ENABLED']:
+        from flask_migrate import Migrate
+        Migrate(app, db)
     
     # Configure CORS for React Native
     CORS(app, 
@@ -28,28 +70,50 @@ def create_app():
          allow_headers=["Content-Type", "Authorization"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
+    # Compress large JSON responses
+    from app.utils.compression import init_compression, no_etag
+    init_compression(app)
+    
     # Import models
     from app import models
     
-    # Register blueprints
-    from app.routes.auth import auth_bp
-    from app.routes.events import events_bp
-    from app.routes.chat import chat_bp
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(events_bp)
-    app.register_blueprint(chat_bp)
+    # Daily active users and `flask backfill-analytics`
+    from app.utils.analytics import init_analytics
+    init_analytics(app)
+    
+    # Register blueprints for the enabled components only
+    components = app.config['APP_COMPONENTS']
+    if 'socketio' not in components and not app.config['SOCKETIO_MESSAGE_QUEUE']:
+        logger.warning("No SOCKETIO_MESSAGE_QUEUE - chat and waitlist emits from this worker reach no client",
+                       extra={'components': components})
+    for name, target in BLUEPRINTS.items():
+        if name in components:
+            module_name, attr = target.split(':')
+            app.register_blueprint(getattr(importlib.import_module(module_name), attr))
+    
+    # CLI: flask check-query-plans, flask archive-events
+    from app.utils import archive, query_plans
+    query_plans.register_commands(app)
+    archive.register_commands(app)
+    
+    # Background jobs - flask worker, or in-process with SCHEDULER_ENABLED
+    from app.utils.scheduler import init_scheduler
+    init_scheduler(app)
     
     # Register health check routes
     @app.route('/')
+    @no_etag
     def home():
         return {'message': 'Clustr Backend is running!', 'status': 'healthy'}
     
     @app.route('/api/health')
+    @no_etag
     def health_check():
         return {'status': 'healthy', 'message': 'Clustr API is operational'}
     
     # Register Socket.IO events
-    from app.routes.chat import register_socketio_events
-    register_socketio_events(socketio)
+    if 'socketio' in components:
+        from app.routes.chat import register_socketio_events
+        register_socketio_events(socketio)
     
     return app
\ No newline at end of file
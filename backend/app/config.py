@@ -6,18 +6,145 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here-change-in-production'
     
-    # Database - Use SQLite everywhere (simple and reliable)
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'clustr.db')
+    # Database - DATABASE_URL in production, local SQLite file otherwise
+    SQLALCHEMY_DATABASE_URI = (
+        os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'clustr.db')
+    ).replace('postgres://', 'postgresql://', 1)  # SQLAlchemy no longer accepts postgres://
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Optional read replica - routes marked with @replica_reads send their queries here
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '').replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    # After a user's write their reads stay on the primary this long, to cover replica lag
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # Connection pool - pre-ping and recycle drop connections the server has closed
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        })
+    
+    # SQLite connect-time pragmas - WAL lets readers run alongside a writer and
+    # busy_timeout makes writers wait for the lock instead of failing
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))  # Negative = KiB, so ~64MB
+    
     # Production settings
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     PORT = int(os.environ.get('PORT', 5001))
     
+    # Which parts of the app this worker loads - e.g. "auth,events,chat,reviews,admin,batch" for an API-only
+    # worker or "socketio" for a chat-only one. Everything is on by default.
+    APP_COMPONENTS = [c.strip() for c in os.environ.get('APP_COMPONENTS', 'auth,events,chat,reviews,admin,batch,socketio').split(',') if c.strip()]
+    # Redis/AMQP URL shared by every worker, e.g. redis://localhost:6379/0 (needs the redis package). Required when
+    # APP_COMPONENTS splits API and socketio workers - it carries emits from API workers to the chat ones.
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+    # Register Flask-Migrate (and import Alembic) - web workers can turn this off
+    MIGRATIONS_ENABLED = os.environ.get('MIGRATIONS_ENABLED', 'True').lower() == 'true'
+    
+    # Logging - LOG_LEVELS overrides per module, e.g. "app.routes.events=DEBUG,app.routes.chat=WARNING"
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO').upper()
+    LOG_LEVELS = {
+        name.strip(): level.strip().upper()
+        for name, level in (item.split('=', 1) for item in os.environ.get('LOG_LEVELS', '').split(',') if '=' in item)
+    }
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))  # Fraction of DEBUG lines kept
+    
+    # Per-endpoint latency, SQL and Socket.IO metrics served on /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    # Bearer token for the Prometheus scraper; without it only admin access tokens can read /metrics
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+    
+    # Development/CI query profiler - logs N+1 patterns and slow queries with their call sites
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'False').lower() == 'true'
+    QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 5))
+    QUERY_PROFILER_SLOW_MS = float(os.environ.get('QUERY_PROFILER_SLOW_MS', 100))
+    
+    # JSON encoding - 'auto' uses orjson when it is installed, 'stdlib' forces the json module
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Request bodies - Flask refuses anything above this; each schema in the routes sets a tighter cap
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 1024 * 1024))
+    
+    # POST /api/batch - sub-requests per call, and threads for the GETs of a parallel batch
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    BATCH_PARALLEL_WORKERS = int(os.environ.get('BATCH_PARALLEL_WORKERS', 4))
+    
+    # Response compression - br (when brotli is installed) or gzip, picked from Accept-Encoding
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # Bytes; smaller bodies go out as-is
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    COMPRESS_CACHE_ENTRIES = int(os.environ.get('COMPRESS_CACHE_ENTRIES', 256))
+    
+    # Socket.IO - compress long-polling payloads above the threshold. WebSocket frames use permessage-deflate
+    # when the client offers it: simple-websocket negotiates it under both threading and the deployed gevent
+    # worker (serve.py). eventlet, or gevent with gevent-websocket installed, sends frames uncompressed.
+    SOCKETIO_HTTP_COMPRESSION = os.environ.get('SOCKETIO_HTTP_COMPRESSION', 'True').lower() == 'true'
+    SOCKETIO_COMPRESSION_THRESHOLD = int(os.environ.get('SOCKETIO_COMPRESSION_THRESHOLD', 1024))
+    # Concurrency model - 'threading' pins an OS thread per socket; 'gevent' or 'eventlet' run each
+    # connection as a greenlet. The async modes need the monkey patching done in serve.py.
+    ASYNC_MODE = os.environ.get('ASYNC_MODE', 'threading')
+    
+    # Hot/cold split - the feed lists events until EVENTS_UPCOMING_GRACE_MINUTES after they
+    # start; `flask archive-events` moves them to the archive tables EVENTS_ARCHIVE_AFTER_HOURS later
+    EVENTS_UPCOMING_GRACE_MINUTES = int(os.environ.get('EVENTS_UPCOMING_GRACE_MINUTES', 180))
+    EVENTS_ARCHIVE_AFTER_HOURS = int(os.environ.get('EVENTS_ARCHIVE_AFTER_HOURS', 24))
+    EVENTS_ARCHIVE_BATCH_SIZE = int(os.environ.get('EVENTS_ARCHIVE_BATCH_SIZE', 500))
+    EVENTS_ARCHIVE_INTERVAL_MINUTES = int(os.environ.get('EVENTS_ARCHIVE_INTERVAL_MINUTES', 60))
+    
+    # Delta sync - GET /api/events/changes replays the change log for EVENTS_CHANGES_RETENTION_HOURS;
+    # a gap younger than EVENTS_CHANGES_SETTLE_SECONDS may be an uncommitted write, so paging waits for it
+    EVENTS_CHANGES_RETENTION_HOURS = int(os.environ.get('EVENTS_CHANGES_RETENTION_HOURS', 72))
+    EVENTS_CHANGES_SETTLE_SECONDS = int(os.environ.get('EVENTS_CHANGES_SETTLE_SECONDS', 5))
+    
+    # GET /api/events/<id> - pages cached per process, checked against events.updated_at on every hit
+    EVENT_DETAIL_CACHE_EVENTS = int(os.environ.get('EVENT_DETAIL_CACHE_EVENTS', 1024))
+    EVENT_DETAIL_CACHE_SECONDS = int(os.environ.get('EVENT_DETAIL_CACHE_SECONDS', 60))
+    
+    # Idempotency-Key - responses kept IDEMPOTENCY_TTL_HOURS, the newest IDEMPOTENCY_CACHE_ENTRIES also in
+    # memory; a duplicate waits up to IDEMPOTENCY_WAIT_SECONDS for the first request, whose claim on the
+    # key lapses after IDEMPOTENCY_LOCK_SECONDS if its process dies
+    IDEMPOTENCY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_TTL_HOURS', 24))
+    IDEMPOTENCY_CACHE_ENTRIES = int(os.environ.get('IDEMPOTENCY_CACHE_ENTRIES', 10000))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', 10))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+    
+    # Daily active users - each process writes the day's first sightings in a batch this often
+    ANALYTICS_FLUSH_SECONDS = float(os.environ.get('ANALYTICS_FLUSH_SECONDS', 10))
+    
+    # Background jobs - run them in this process, or in a separate `flask worker`
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'False').lower() == 'true'
+    
+    # Notification outbox - 'log', 'file' (JSON lines in NOTIFICATIONS_FILE) or 'package.module:factory'
+    NOTIFICATIONS_TRANSPORT = os.environ.get('NOTIFICATIONS_TRANSPORT', 'log')
+    NOTIFICATIONS_FILE = os.environ.get('NOTIFICATIONS_FILE', 'notifications.jsonl')
+    NOTIFICATIONS_POLL_SECONDS = float(os.environ.get('NOTIFICATIONS_POLL_SECONDS', 5))
+    NOTIFICATIONS_COALESCE_SECONDS = int(os.environ.get('NOTIFICATIONS_COALESCE_SECONDS', 60))  # Digest window
+    NOTIFICATIONS_BATCH_SIZE = int(os.environ.get('NOTIFICATIONS_BATCH_SIZE', 200))
+    NOTIFICATIONS_WORKERS = int(os.environ.get('NOTIFICATIONS_WORKERS', 4))
+    NOTIFICATIONS_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATIONS_MAX_ATTEMPTS', 5))
+    NOTIFICATIONS_RETRY_SECONDS = int(os.environ.get('NOTIFICATIONS_RETRY_SECONDS', 30))  # Doubles per attempt
+    NOTIFICATIONS_LEASE_SECONDS = int(os.environ.get('NOTIFICATIONS_LEASE_SECONDS', 60))
+    NOTIFICATIONS_REMINDER_LEAD_MINUTES = int(os.environ.get('NOTIFICATIONS_REMINDER_LEAD_MINUTES', 60))
+    
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=30)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Seconds between each worker pulling revocations made by other workers
+    JWT_REVOCATION_SYNC_INTERVAL = float(os.environ.get('JWT_REVOCATION_SYNC_INTERVAL', 5))
+    # How long a gap in revoked_tokens ids may be an uncommitted revocation before the sync skips it
+    JWT_REVOCATION_SETTLE_SECONDS = float(os.environ.get('JWT_REVOCATION_SETTLE_SECONDS', 30))
     
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
     
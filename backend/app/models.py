@@ -2,9 +2,12 @@ from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
 from datetime import datetime
+from app.utils.validators import EMAIL_PATTERN
 import uuid
 import re
 
+USERNAME_UNSAFE = re.compile(r'[^a-zA-Z0-9_]')
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -83,14 +86,13 @@ class User(db.Model):
         """Validate email format"""
         if not email:
             return False
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return EMAIL_PATTERN.match(email) is not None
     
     @staticmethod
     def generate_username_from_email(email):
         """Generate a unique username from email"""
         base_username = email.split('@')[0]
-        base_username = re.sub(r'[^a-zA-Z0-9_]', '_', base_username)
+        base_username = USERNAME_UNSAFE.sub('_', base_username)
         
         # Check if username exists, if so add number suffix
         counter = 1
@@ -106,6 +108,10 @@ class User(db.Model):
 
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        # Events a user hosts, in date order; id makes it a total order for cursors
+        db.Index('ix_events_created_by_event_date', 'created_by', 'event_date', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(255), nullable=False)
@@ -113,11 +119,13 @@ class Event(db.Model):
     category = db.Column(db.String(50), nullable=False)  # Primary category
     tags = db.Column(db.JSON, default=list)  # Multiple categories/tags
     location = db.Column(db.String(500), nullable=False)
-    event_date = db.Column(db.DateTime, nullable=False)
+    event_date = db.Column(db.DateTime, nullable=False, index=True)  # Feed sort
     max_attendees = db.Column(db.Integer, nullable=False)
     attendees = db.Column(db.JSON, default=list)  # Array of user IDs
     created_by = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reminders_queued_at = db.Column(db.DateTime, nullable=True)  # Set once reminders are in the outbox
     
     def to_dict(self):
         return {
@@ -133,9 +141,67 @@ class Event(db.Model):
             'attendee_count': len(self.attendees) if self.attendees else 0,
             'spots_left': self.max_attendees - (len(self.attendees) if self.attendees else 0),
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class EventChange(db.Model):
+    """
+    Append-only log behind GET /api/events/changes. AUTOINCREMENT so a seq
+    is never handed out twice, whatever has been pruned. event_id has no
+    foreign key - rows for deleted (archived) events stay.
+    """
+    __tablename__ = 'event_changes'
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_id = db.Column(db.String(36), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # created, updated, deleted
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)  # Pruning
+    
+    def __repr__(self):
+        return f'<EventChange {self.seq} {self.kind} {self.event_id}>'
+
+class EventAttendee(db.Model):
+    """
+    User -> event reverse lookup for Event.attendees, written in the same
+    transaction as the array. event_date is copied from the event so a
+    user's events come off one index range in date order.
+    """
+    __tablename__ = 'event_attendees'
+    __table_args__ = (
+        db.Index('ix_event_attendees_user_id_event_date', 'user_id', 'event_date', 'event_id'),
+    )
+    
+    event_id = db.Column(db.String(36), db.ForeignKey('events.id'), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    event_date = db.Column(db.DateTime, nullable=False)
+    joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<EventAttendee {self.user_id} -> {self.event_id}>'
+
+class WaitlistEntry(db.Model):
+    """
+    A user queued for a full event. position only ever grows, so an event's
+    queue is the (event_id, position) index in order and its head is the
+    first entry - leave_event promotes it in the same transaction.
+    """
+    __tablename__ = 'event_waitlist'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id', name='uq_event_waitlist_event_id_user_id'),
+        db.Index('ix_event_waitlist_event_id_position', 'event_id', 'position'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    position = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_id = db.Column(db.String(36), db.ForeignKey('events.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<WaitlistEntry {self.position} {self.user_id} -> {self.event_id}>'
+
 class ChatRoom(db.Model):
     __tablename__ = 'chat_rooms'
     
@@ -155,6 +221,10 @@ class ChatRoom(db.Model):
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Chat history: filter by room, newest first
+        db.Index('ix_messages_chat_room_id_created_at', 'chat_room_id', 'created_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     chat_room_id = db.Column(db.String(36), db.ForeignKey('chat_rooms.id'), nullable=False)
@@ -177,4 +247,165 @@ class Message(db.Model):
             'message_type': self.message_type,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'timestamp': int(self.created_at.timestamp() * 1000) if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)  # Monotonic sync watermark
+    jti = db.Column(db.String(36), unique=True, nullable=False, index=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Row can be purged after this
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+class IdempotencyKey(db.Model):
+    """Stored response for an Idempotency-Key header - status_code stays NULL while the first request runs"""
+    __tablename__ = 'idempotency_keys'
+    
+    user_id = db.Column(db.String(36), primary_key=True)  # '' for anonymous requests
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # Method, path and body the key was first used with
+    status_code = db.Column(db.Integer, nullable=True)
+    body = db.Column(db.LargeBinary, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Claim time while running
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key}>'
+
+class Notification(db.Model):
+    """Outbox row - written in the request's transaction, delivered by app.utils.notifications"""
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        # A user's due notifications, so a batch picks up everything to coalesce
+        db.Index('ix_notification_outbox_user_id_deliver_after', 'user_id', 'deliver_after'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)  # event_reminder, event_joined, chat_message
+    payload = db.Column(db.JSON, default=dict)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deliver_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    claimed_by = db.Column(db.String(36), nullable=True)  # Drain pass holding the lease
+    claimed_until = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<Notification {self.kind} for {self.user_id}>'
+
+class Review(db.Model):
+    """Post-event review. event_id has no foreign key - reviewed events end up in archived_events."""
+    __tablename__ = 'reviews'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id', name='uq_reviews_event_id_user_id'),
+        # Newest-first cursor pages; id breaks ties between equal timestamps
+        db.Index('ix_reviews_event_id_created_at', 'event_id', 'created_at', 'id'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    event_id = db.Column(db.String(36), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    rating = db.Column(db.Integer, nullable=False)  # 1-5
+    comment = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    user = db.relationship('User', lazy=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'user_id': self.user_id,
+            'username': self.user.username if self.user else 'Unknown',
+            'rating': self.rating,
+            'comment': self.comment,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class RatingAggregate(db.Model):
+    """Running review totals for an event or an organizer, updated with each review"""
+    __tablename__ = 'rating_aggregates'
+    
+    subject_type = db.Column(db.String(20), primary_key=True)  # event, organizer
+    subject_id = db.Column(db.String(36), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
+    
+    def summary(self):
+        """What an event card shows"""
+        return {
+            'count': self.count,
+            'average': round(self.total / self.count, 2) if self.count else None
+        }
+    
+    def to_dict(self):
+        return {
+            **self.summary(),
+            'histogram': {str(stars): getattr(self, f'stars_{stars}') for stars in range(1, 6)}
+        }
+
+class AnalyticsCounter(db.Model):
+    """Pre-aggregated admin dashboard numbers, kept current by app.utils.analytics"""
+    __tablename__ = 'analytics_counters'
+    __table_args__ = (
+        # Top-N lookups, e.g. busiest chat rooms
+        db.Index('ix_analytics_counters_metric_period_value', 'metric', 'period', 'value'),
+    )
+    
+    metric = db.Column(db.String(30), primary_key=True)  # events_created, joins, leaves, messages, active_users
+    period = db.Column(db.String(10), primary_key=True)  # YYYY-MM-DD, or 'all' for running totals
+    key = db.Column(db.String(64), primary_key=True, default='')  # Category, chat room or event id, or '' for none
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class ActiveUser(db.Model):
+    """One row per user per day they made an authenticated request - source of the active_users counter"""
+    __tablename__ = 'active_users'
+    
+    period = db.Column(db.String(10), primary_key=True)
+    user_id = db.Column(db.String(36), primary_key=True)
+
+# Finished events are moved out of the hot tables by app.utils.archive, together with
+# their chat rooms and messages. The archive keeps the same columns plus archived_at.
+
+class ArchivedEvent(db.Model):
+    __tablename__ = 'archived_events'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    tags = db.Column(db.JSON, default=list)
+    location = db.Column(db.String(500), nullable=False)
+    event_date = db.Column(db.DateTime, nullable=False, index=True)
+    max_attendees = db.Column(db.Integer, nullable=False)
+    attendees = db.Column(db.JSON, default=list)
+    created_by = db.Column(db.String(36), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedChatRoom(db.Model):
+    __tablename__ = 'archived_chat_rooms'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    event_id = db.Column(db.String(36), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime)
+
+class ArchivedMessage(db.Model):
+    __tablename__ = 'archived_messages'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    chat_room_id = db.Column(db.String(36), nullable=False, index=True)
+    user_id = db.Column(db.String(36), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    message_type = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
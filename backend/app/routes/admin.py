@@ -0,0 +1,142 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt
+from app import db
+from app.utils.analytics import ALL_TIME
+from app.utils.auth import jwt_required
+from app.utils.database import replica_reads
+from app.utils.validators import Schema, String, Integer, validate
+from app.models import AnalyticsCounter
+from datetime import datetime, timedelta
+from functools import wraps
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+MAX_DAYS = 366
+
+class DaysQuery(Schema):
+    days = Integer(default=30, min_value=1, max_value=MAX_DAYS, clamp=True)
+
+class RoomStatsQuery(Schema):
+    chat_room_id = String(max_length=36)
+    limit = Integer(default=20, min_value=1, max_value=100, clamp=True)
+
+def admin_required(view):
+    """Only tokens issued to admins"""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if get_jwt().get('role') != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _day_range(days):
+    """Dates for the last `days` days, oldest first"""
+    end = datetime.utcnow().date()
+    return [(end - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+def _daily_counters(metrics, periods):
+    """{metric: {period: {key: value}}} for a run of days - one primary key range scan per metric"""
+    result = {metric: {period: {} for period in periods} for metric in metrics}
+    rows = db.session.query(AnalyticsCounter.metric, AnalyticsCounter.period, AnalyticsCounter.key, AnalyticsCounter.value)\
+                     .filter(AnalyticsCounter.metric.in_(metrics),
+                             AnalyticsCounter.period >= periods[0],
+                             AnalyticsCounter.period <= periods[-1])\
+                     .all()
+    for metric, period, key, value in rows:
+        result[metric][period][key] = value
+    return result
+
+@admin_bp.route('/stats/events', methods=['GET'])
+@admin_required
+@replica_reads
+@validate(params=DaysQuery)
+def event_stats(params):
+    """
+    Events created per category per day
+    Optional query params: days (default 30)
+    """
+    try:
+        periods = _day_range(params.days)
+        counters = _daily_counters(['events_created'], periods)['events_created']
+        return jsonify({
+            'days': [{'date': period, 'categories': counters[period]} for period in periods]
+        }), 200
+
+    except Exception as e:
+        logger.exception("Event stats error")
+        return jsonify({'error': 'Failed to get event stats'}), 500
+
+@admin_bp.route('/stats/attendance', methods=['GET'])
+@admin_required
+@replica_reads
+@validate(params=DaysQuery)
+def attendance_stats(params):
+    """
+    Joins and leaves per day, summed over the per-event counters
+    Optional query params: days (default 30)
+    """
+    try:
+        periods = _day_range(params.days)
+        counters = _daily_counters(['joins', 'leaves'], periods)
+        return jsonify({
+            'days': [{
+                'date': period,
+                'joins': sum(counters['joins'][period].values()),
+                'leaves': sum(counters['leaves'][period].values()),
+            } for period in periods]
+        }), 200
+
+    except Exception as e:
+        logger.exception("Attendance stats error")
+        return jsonify({'error': 'Failed to get attendance stats'}), 500
+
+@admin_bp.route('/stats/active-users', methods=['GET'])
+@admin_required
+@replica_reads
+@validate(params=DaysQuery)
+def active_user_stats(params):
+    """
+    Daily active users
+    Optional query params: days (default 30)
+    """
+    try:
+        periods = _day_range(params.days)
+        counters = _daily_counters(['active_users'], periods)['active_users']
+        return jsonify({
+            'days': [{'date': period, 'active_users': counters[period].get('', 0)} for period in periods]
+        }), 200
+
+    except Exception as e:
+        logger.exception("Active user stats error")
+        return jsonify({'error': 'Failed to get active user stats'}), 500
+
+@admin_bp.route('/stats/messages', methods=['GET'])
+@admin_required
+@replica_reads
+@validate(params=RoomStatsQuery)
+def message_stats(params):
+    """
+    Messages per chat room - the busiest rooms, or one room
+    Optional query params: chat_room_id, limit (default 20)
+    """
+    try:
+        chat_room_id = params.chat_room_id
+        query = db.session.query(AnalyticsCounter.key, AnalyticsCounter.value)\
+                          .filter(AnalyticsCounter.metric == 'messages', AnalyticsCounter.period == ALL_TIME)
+
+        if chat_room_id:
+            rows = query.filter(AnalyticsCounter.key == chat_room_id).all()
+            return jsonify({'rooms': [{'chat_room_id': chat_room_id, 'messages': rows[0][1] if rows else 0}]}), 200
+
+        rows = query.order_by(AnalyticsCounter.value.desc()).limit(params.limit).all()
+        return jsonify({
+            'rooms': [{'chat_room_id': key, 'messages': value} for key, value in rows]
+        }), 200
+
+    except Exception as e:
+        logger.exception("Message stats error")
+        return jsonify({'error': 'Failed to get message stats'}), 500
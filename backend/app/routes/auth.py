@@ -1,56 +1,49 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity, get_jwt
 from app import db
+from app.utils.database import replica_reads
+from app.utils.validators import Schema, String, Email, Password, Choice, StringList, validate
 from app.models import User
 from datetime import datetime, timedelta
-import re
+import logging
 from app.utils.google_oauth import GoogleOAuth
+from app.utils.auth import jwt_required, token_blocklist
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
-def validate_password(password):
-    """Validate password strength"""
-    if not password:
-        return False, "Password is required"
-    
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters long"
-    
-    if not re.search(r'[A-Z]', password):
-        return False, "Password must contain at least one uppercase letter"
-    
-    if not re.search(r'[a-z]', password):
-        return False, "Password must contain at least one lowercase letter"
-    
-    if not re.search(r'\d', password):
-        return False, "Password must contain at least one number"
-    
-    return True, None
+CREDENTIALS_REQUIRED = 'Email and password are required'
+
+class SignupRequest(Schema):
+    email = Email(required=True, required_error=CREDENTIALS_REQUIRED)
+    password = Password(required=True, required_error=CREDENTIALS_REQUIRED)
+    username = String(max_length=80)
+    interests = StringList()
+
+class LoginRequest(Schema):
+    email = Email(required=True, required_error=CREDENTIALS_REQUIRED)
+    password = String(required=True, max_length=128, strip=False, required_error=CREDENTIALS_REQUIRED)
+
+class ChangePasswordRequest(Schema):
+    current_password = String(required=True, max_length=128, strip=False,
+                              required_error='Current and new passwords are required')
+    new_password = Password(required=True, required_error='Current and new passwords are required')
+
+class GoogleTokenRequest(Schema):
+    token = String(required=True, max_length=4096, required_error='Google token is required')
+    token_type = Choice(('id_token', 'access_token'), default='id_token')
+
+class InterestsRequest(Schema):
+    interests = StringList(required=True, min_items=3, required_error='Interests must be provided as an array')
 
 @auth_bp.route('/signup', methods=['POST'])
-def signup():
+@validate(body=SignupRequest)
+def signup(body):
     """Register new user with email and password"""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Extract and validate data
-        email = data.get('email', '').lower().strip()
-        password = data.get('password', '')
-        username = data.get('username', '').strip()
-        
-        # Validation
-        if not email or not password:
-            return jsonify({'error': 'Email and password are required'}), 400
-        
-        if not User.is_valid_email(email):
-            return jsonify({'error': 'Invalid email format'}), 400
-        
-        is_valid_password, password_error = validate_password(password)
-        if not is_valid_password:
-            return jsonify({'error': password_error}), 400
+        email = body.email
+        username = body.username
         
         # Check if user already exists
         existing_user = User.query.filter_by(email=email).first()
@@ -69,9 +62,9 @@ def signup():
         user = User(
             email=email,
             username=username,
-            interests=data.get('interests', [])
+            interests=body.interests or []
         )
-        user.set_password(password)
+        user.set_password(body.password)
         
         db.session.add(user)
         db.session.commit()
@@ -87,26 +80,16 @@ def signup():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Signup error: {str(e)}")
+        logger.exception("Signup error")
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
-def login():
+@validate(body=LoginRequest)
+def login(body):
     """Login user with email and password"""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        email = data.get('email', '').lower().strip()
-        password = data.get('password', '')
-        
-        if not email or not password:
-            return jsonify({'error': 'Email and password are required'}), 400
-        
         # Find user
-        user = User.query.filter_by(email=email).first()
+        user = User.query.filter_by(email=body.email).first()
         
         if not user:
             return jsonify({'error': 'No account found with this email. Please sign up first.'}), 404
@@ -118,7 +101,7 @@ def login():
                 'oauth_provider': user.oauth_provider
             }), 401
         
-        if not user.check_password(password):
+        if not user.check_password(body.password):
             return jsonify({'error': 'Incorrect password. Please try again.'}), 401
         
         if not user.is_active:
@@ -138,11 +121,12 @@ def login():
         }), 200
         
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.exception("Login error")
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_current_user():
     """Get current user profile"""
     try:
@@ -155,78 +139,63 @@ def get_current_user():
         return jsonify({'user': user.to_dict()}), 200
         
     except Exception as e:
-        print(f"Get user error: {str(e)}")
+        logger.exception("Get user error")
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout user (client should remove token)"""
-    # With JWT, logout is typically handled on the frontend by removing the token
-    # For enhanced security, you could implement token blacklisting here
-    return jsonify({'message': 'Logged out successfully'}), 200
+    """Logout user by revoking the current access token"""
+    try:
+        claims = get_jwt()
+        token_blocklist.revoke(claims['jti'], claims['exp'], user_id=get_jwt_identity())
+        return jsonify({'message': 'Logged out successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Logout error")
+        return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/change-password', methods=['POST'])
 @jwt_required()
-def change_password():
+@validate(body=ChangePasswordRequest)
+def change_password(body):
     """Change user password"""
     try:
-        data = request.get_json()
         user_id = get_jwt_identity()
         user = User.query.get(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        current_password = data.get('current_password', '')
-        new_password = data.get('new_password', '')
-        
-        if not current_password or not new_password:
-            return jsonify({'error': 'Current and new passwords are required'}), 400
-        
         # Check current password
-        if not user.check_password(current_password):
+        if not user.check_password(body.current_password):
             return jsonify({'error': 'Current password is incorrect'}), 401
         
-        # Validate new password
-        is_valid, error_msg = validate_password(new_password)
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
-        
         # Update password
-        user.set_password(new_password)
+        user.set_password(body.new_password)
         db.session.commit()
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
     except Exception as e:
         db.session.rollback()
-        print(f"Change password error: {str(e)}")
+        logger.exception("Change password error")
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/google', methods=['POST'])
-def google_oauth():
+@validate(body=GoogleTokenRequest)
+def google_oauth(body):
     """
     Handle Google OAuth authentication
     Expects: { "token": "google_id_token_or_access_token", "token_type": "id_token" or "access_token" }
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        token = data.get('token')
-        token_type = data.get('token_type', 'id_token')
-        
-        if not token:
-            return jsonify({'error': 'Google token is required'}), 400
-        
         # Verify Google token and get user info
-        if token_type == 'id_token':
-            google_user_info = GoogleOAuth.verify_google_token(token)
+        if body.token_type == 'id_token':
+            google_user_info = GoogleOAuth.verify_google_token(body.token)
         else:
-            google_user_info = GoogleOAuth.get_user_info_from_token(token)
+            google_user_info = GoogleOAuth.get_user_info_from_token(body.token)
         
         if not google_user_info:
             return jsonify({'error': 'Invalid Google token'}), 401
@@ -289,7 +258,7 @@ def google_oauth():
     
     except Exception as e:
         db.session.rollback()
-        print(f"Google OAuth error: {str(e)}")
+        logger.exception("Google OAuth error")
         return jsonify({'error': 'Google authentication failed'}), 500
 
 @auth_bp.route('/google/config', methods=['GET'])
@@ -303,25 +272,15 @@ def google_config():
 
 @auth_bp.route('/interests', methods=['POST'])
 @jwt_required()
-def update_user_interests():
+@validate(body=InterestsRequest)
+def update_user_interests(body):
     """
     Update user interests - saves to USER_INTEREST table
     Expects: { "interests": ["sports", "food", "music", ...] }
     """
     try:
-        data = request.get_json()
         user_id = get_jwt_identity()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        interests = data.get('interests', [])
-        
-        if not interests or not isinstance(interests, list):
-            return jsonify({'error': 'Interests must be provided as an array'}), 400
-        
-        if len(interests) < 3:
-            return jsonify({'error': 'At least 3 interests are required'}), 400
+        interests = body.interests
         
         # Get the user
         user = User.query.get(user_id)
@@ -340,11 +299,12 @@ def update_user_interests():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Update interests error: {str(e)}")
+        logger.exception("Update interests error")
         return jsonify({'error': 'Failed to update interests'}), 500
 
 @auth_bp.route('/interests', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_user_interests():
     """
     Get user's current interests
@@ -362,5 +322,5 @@ def get_user_interests():
         }), 200
         
     except Exception as e:
-        print(f"Get interests error: {str(e)}")
+        logger.exception("Get interests error")
         return jsonify({'error': 'Failed to get interests'}), 500
\ No newline at end of file
@@ -0,0 +1,138 @@
+from flask import Blueprint, current_app, request, jsonify, g
+from flask_jwt_extended import get_jwt, get_jwt_header
+from werkzeug.test import EnvironBuilder
+from app.utils.auth import BATCH_JWT, jwt_required
+from app.utils.compression import SKIP_ETAG
+from app.utils.validators import Schema, String, Boolean, Choice, Object, ObjectList, validate
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api')
+
+class SubRequest(Schema):
+    method = Choice(('GET', 'POST', 'PUT', 'DELETE'), default='GET')
+    path = String(required=True, max_length=2048)
+    body = Object()
+
+class BatchRequest(Schema):
+    max_bytes = 256 * 1024
+    requests = ObjectList(SubRequest, required=True, min_items=1,
+                          max_items=lambda: current_app.config['BATCH_MAX_REQUESTS'])
+    parallel = Boolean()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _executor(app):
+    """Threads for the GETs of parallel batches, shared by all requests"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=app.config['BATCH_PARALLEL_WORKERS'],
+                                       thread_name_prefix='batch')
+        return _pool
+
+def _environ(sub, index, verified):
+    """WSGI environ for a sub-request, carrying the batch's credentials and the token it verified"""
+    headers = {'X-Request-ID': f"{g.get('request_id') or 'batch'}.{index}"}
+    if 'Authorization' in request.headers:
+        headers['Authorization'] = request.headers['Authorization']
+    environ_base = {'REMOTE_ADDR': request.remote_addr, SKIP_ETAG: True}
+    if verified:
+        environ_base[BATCH_JWT] = verified
+    builder = EnvironBuilder(path=sub.path, method=sub.method, json=sub.body, headers=headers,
+                             environ_base=environ_base)
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+def _dispatch(app, environ):
+    """
+    Run one sub-request through the normal Flask pipeline (hooks, auth,
+    validation, error handlers) inside the current app context - and so on
+    its database session. g belongs to the app context, so it is put back
+    afterwards and one sub-request's flags never leak into the next.
+    Returns (status, JSON body bytes).
+    """
+    saved = dict(vars(g))
+    try:
+        with app.request_context(environ):
+            try:
+                response = app.full_dispatch_request()
+            except Exception:
+                logger.exception("Batch sub-request error")
+                return 500, b'{"error":"Internal server error"}'
+            if response.mimetype != 'application/json':
+                return response.status_code, app.json.dumps({'error': response.status}).encode()
+            return response.status_code, response.get_data() or b'null'
+    finally:
+        vars(g).clear()
+        vars(g).update(saved)
+
+def _dispatch_in_thread(app, environ, batch_g):
+    """
+    Parallel GETs get their own app context, and with it their own session.
+    It starts from a copy of the batch's g, as a sequential sub-request does.
+    """
+    with app.app_context():
+        vars(g).update(batch_g)
+        return _dispatch(app, environ)
+
+@batch_bp.route('/batch', methods=['POST'])
+@jwt_required(optional=True)
+@validate(body=BatchRequest)
+def run_batch(body):
+    """
+    Run several API calls in one round trip
+    Expects JSON: {
+        "requests": [
+            {"method": "GET", "path": "/api/auth/me"},
+            {"method": "POST", "path": "/api/events/<id>/join"},
+            {"method": "POST", "path": "/api/chat/events/<id>/messages", "body": {"content": "hi"}}
+        ],
+        "parallel": false
+    }
+    Returns {"responses": [{"status": 200, "body": {...}}, ...]} in request order.
+    The token is verified once here and sub-requests reuse it (each still
+    checks revocation); they share this request's database session,
+    so e.g. the current user is loaded once. Each sub-request commits
+    on its own - a batch is not a transaction. With "parallel": true the GETs run
+    concurrently on worker threads (own sessions) while the rest run in order,
+    so a GET should not rely on seeing a write from the same batch.
+    """
+    started = time.perf_counter()
+    app = current_app._get_current_object()
+
+    for index, sub in enumerate(body.requests):
+        if not sub.path.startswith('/api/') or sub.path.startswith('/api/batch'):
+            return jsonify({'error': f'requests[{index}]: path must be an API path other than /api/batch',
+                            'field': 'requests'}), 400
+
+    # Sub-requests carry the same Authorization header - jwt_required takes the verified one from the environ
+    verified = (get_jwt_header(), get_jwt()) if get_jwt() else None
+    environs = [_environ(sub, index, verified) for index, sub in enumerate(body.requests)]
+    results = [None] * len(environs)
+    futures = {}
+    if body.parallel:
+        pool = _executor(app)
+        batch_g = dict(vars(g))
+        futures = {index: pool.submit(_dispatch_in_thread, app, environ, batch_g)
+                   for index, environ in enumerate(environs) if body.requests[index].method == 'GET'}
+    for index, environ in enumerate(environs):
+        if index not in futures:
+            results[index] = _dispatch(app, environ)
+    for index, future in futures.items():
+        results[index] = future.result()
+
+    logger.debug("Ran batch", extra={'count': len(results), 'parallel': body.parallel,
+                                     'duration_ms': round((time.perf_counter() - started) * 1000, 2)})
+
+    # Sub-responses are already JSON - splice them in rather than decoding and re-encoding
+    payload = b'{"responses":[' + b','.join(b'{"status":%d,"body":%s}' % (status, data)
+                                            for status, data in results) + b']}'
+    return app.response_class(payload, mimetype='application/json')
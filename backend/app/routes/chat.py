@@ -1,15 +1,126 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import get_jwt_identity, decode_token
 from flask_socketio import emit, join_room, leave_room, rooms
 from app import db
+from app.utils.analytics import ALL_TIME, increment
+from app.utils.auth import jwt_required, token_blocklist
+from app.utils.database import replica_reads, use_primary
+from app.utils.idempotency import idempotent
+from app.utils.metrics import metrics, track_socket_event
+from app.utils.notifications import notify
+from app.utils.serializers import message_rows, message_row_to_dict
+from app.utils.sockets import user_room
+from app.utils.validators import Schema, String, Integer, Choice, ValidationError, validate
 from app.models import User, Event, ChatRoom, Message
+from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
+import threading
 import uuid
+import logging
+
+logger = logging.getLogger(__name__)
 
 chat_bp = Blueprint('chat', __name__, url_prefix='/api/chat')
 
+class ChatPresence:
+    """
+    Users with an open socket in each event chat. Per process - with several
+    Socket.IO workers a user on another worker counts as offline and gets a
+    (coalesced) notification as well.
+    """
+    
+    def __init__(self):
+        self._events = defaultdict(lambda: defaultdict(set))  # event_id -> user_id -> sids
+        self._sids = defaultdict(set)  # sid -> {(event_id, user_id)}
+        self._lock = threading.Lock()
+    
+    def join(self, sid, event_id, user_id):
+        with self._lock:
+            self._events[event_id][user_id].add(sid)
+            self._sids[sid].add((event_id, user_id))
+    
+    def leave(self, sid, event_id, user_id):
+        with self._lock:
+            self._discard(sid, event_id, user_id)
+            self._sids[sid].discard((event_id, user_id))
+            if not self._sids[sid]:
+                del self._sids[sid]
+    
+    def disconnect(self, sid):
+        with self._lock:
+            for event_id, user_id in self._sids.pop(sid, ()):
+                self._discard(sid, event_id, user_id)
+    
+    def online(self, event_id):
+        with self._lock:
+            return set(self._events.get(event_id, ()))
+    
+    def _discard(self, sid, event_id, user_id):
+        users = self._events.get(event_id)
+        if users is None or user_id not in users:
+            return
+        users[user_id].discard(sid)
+        if not users[user_id]:
+            del users[user_id]
+        if not users:
+            del self._events[event_id]
+
+presence = ChatPresence()
+
+def _socket_user(auth):
+    """User id from the access token a client sends as its connect auth payload, or None"""
+    token = auth.get('token') if isinstance(auth, dict) else None
+    if not token:
+        return None
+    try:
+        decoded = decode_token(token)
+    except Exception:
+        return None
+    if decoded.get('type') != 'access' or token_blocklist.is_revoked(decoded['jti']):
+        return None
+    return decoded.get(current_app.config['JWT_IDENTITY_CLAIM'])
+
+class ChatPageQuery(Schema):
+    limit = Integer(default=50, min_value=1, max_value=200, clamp=True)
+    offset = Integer(default=0, min_value=0, max_value=100000)
+
+class NewMessage(Schema):
+    content = String(required=True, max_length=2000, required_error='Message content is required')
+    message_type = Choice(('text', 'image'), default='text')
+
+class ChatRoomRequest(Schema):
+    event_id = String(required=True, max_length=36, required_error='Event ID and User ID are required')
+    user_id = String(required=True, max_length=36, required_error='Event ID and User ID are required')
+
+def _get_or_create_chat_room(event_id):
+    """
+    The event's chat room, created on first use. Creation happens on the
+    primary - a lagging replica can miss a room that exists - and a request
+    that loses the race to create it reads the winner's room.
+    """
+    chat_room = ChatRoom.query.filter_by(event_id=event_id).first()
+    if chat_room:
+        return chat_room
+    
+    use_primary()
+    chat_room = ChatRoom.query.filter_by(event_id=event_id).first()
+    if chat_room:
+        return chat_room
+    
+    chat_room = ChatRoom(event_id=event_id)
+    db.session.add(chat_room)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        chat_room = ChatRoom.query.filter_by(event_id=event_id).one()
+    return chat_room
+
 @chat_bp.route('/events/<event_id>/messages', methods=['GET'])
 @jwt_required()
-def get_chat_messages(event_id):
+@replica_reads
+@validate(params=ChatPageQuery)
+def get_chat_messages(event_id, params):
     """
     Get chat messages for an event
     Only accessible to event attendees
@@ -25,52 +136,42 @@ def get_chat_messages(event_id):
         if not event.attendees or user_id not in event.attendees:
             return jsonify({'error': 'Access denied. You must be attending this event to view chat.'}), 403
         
-        # Get or create chat room
-        chat_room = ChatRoom.query.filter_by(event_id=event_id).first()
-        if not chat_room:
-            chat_room = ChatRoom(event_id=event_id)
-            db.session.add(chat_room)
-            db.session.commit()
+        chat_room = _get_or_create_chat_room(event_id)
         
         # Get messages with pagination
-        limit = int(request.args.get('limit', 50))
-        offset = int(request.args.get('offset', 0))
-        
-        messages = Message.query.filter_by(chat_room_id=chat_room.id)\
+        messages = message_rows(Message.query.filter_by(chat_room_id=chat_room.id))\
                                 .order_by(Message.created_at.desc())\
-                                .offset(offset)\
-                                .limit(limit)\
+                                .offset(params.offset)\
+                                .limit(params.limit)\
                                 .all()
         
         # Reverse to show oldest first
         messages.reverse()
         
-        print(f"📱 Retrieved {len(messages)} messages for event {event.title}")
+        logger.debug("Fetched chat messages", extra={'event_id': event_id, 'count': len(messages)})
         
         return jsonify({
-            'messages': [message.to_dict() for message in messages],
+            'messages': [message_row_to_dict(message) for message in messages],
             'chat_room_id': chat_room.id,
             'total': Message.query.filter_by(chat_room_id=chat_room.id).count()
         }), 200
         
     except Exception as e:
-        print(f"❌ Get messages error: {str(e)}")
+        logger.exception("Get messages error")
         return jsonify({'error': 'Failed to get messages'}), 500
 
 @chat_bp.route('/events/<event_id>/messages', methods=['POST'])
 @jwt_required()
-def send_message(event_id):
+@idempotent
+@validate(body=NewMessage)
+def send_message(event_id, body):
     """
     Send a message to event chat
     Only accessible to event attendees
+    Send an Idempotency-Key header so a retry never posts the message twice
     """
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        if not data or not data.get('content'):
-            return jsonify({'error': 'Message content is required'}), 400
-        
         event = Event.query.get(event_id)
         if not event:
             return jsonify({'error': 'Event not found'}), 404
@@ -79,35 +180,36 @@ def send_message(event_id):
         if not event.attendees or user_id not in event.attendees:
             return jsonify({'error': 'Access denied. You must be attending this event to send messages.'}), 403
         
-        # Get or create chat room
-        chat_room = ChatRoom.query.filter_by(event_id=event_id).first()
-        if not chat_room:
-            chat_room = ChatRoom(event_id=event_id)
-            db.session.add(chat_room)
-            db.session.commit()
+        chat_room = _get_or_create_chat_room(event_id)
         
         # Create message
         message = Message(
             chat_room_id=chat_room.id,
             user_id=user_id,
-            content=data.get('content').strip(),
-            message_type=data.get('message_type', 'text')
+            content=body.content,
+            message_type=body.message_type
         )
         
         db.session.add(message)
+        increment('messages', key=chat_room.id, period=ALL_TIME)
+        
+        # Attendees without the chat open hear about it through the outbox
+        online = presence.online(event_id)
+        offline = [attendee for attendee in event.attendees if attendee != user_id and attendee not in online]
+        if offline:
+            notify(offline, 'chat_message', {'event_id': event_id, 'title': event.title})
         db.session.commit()
         
         message_data = message.to_dict()
         
-        print(f"💬 New message in {event.title}: {message.content[:50]}...")
-        
         # Emit to all connected clients (simplified approach)
         from app import socketio
         socketio.emit('new_message', {
             **message_data,
             'event_id': event_id  # Include event_id so frontend can filter
         })
-        print(f"📡 Broadcasted message globally with event_id: {event_id}")
+        metrics.count_socket_event('new_message', direction='out')
+        logger.debug("Broadcast new message", extra={'event_id': event_id, 'message_id': message.id})
         
         return jsonify({
             'message': 'Message sent successfully',
@@ -116,7 +218,7 @@ def send_message(event_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Send message error: {str(e)}")
+        logger.exception("Send message error")
         return jsonify({'error': 'Failed to send message'}), 500
 
 # Socket.IO Events moved to register_socketio_events function below
@@ -125,17 +227,30 @@ def send_message(event_id):
 def register_socketio_events(socketio):
     """Register all Socket.IO events with the main app"""
     
+    @socketio.on('connect')
+    def handle_connect(auth=None):
+        """
+        Track newly connected clients. A client that connects with
+        {"token": <access token>} also joins its user's room.
+        """
+        metrics.socket_connected()
+        user_id = _socket_user(auth)
+        if user_id:
+            join_room(user_room(user_id))
+    
     @socketio.on('join_event_chat')
+    @track_socket_event
     def handle_join_chat(data):
         """Join chat room for an event"""
         try:
             # For now, we'll skip JWT validation in Socket.IO and rely on HTTP API
-            event_id = data.get('event_id')
-            user_id = data.get('user_id')  # Pass from frontend
-            
-            if not event_id or not user_id:
-                emit('error', {'message': 'Event ID and User ID are required'})
+            try:
+                payload = ChatRoomRequest.load(data or {})
+            except ValidationError as e:
+                emit('error', {'message': e.message})
                 return
+            event_id = payload.event_id
+            user_id = payload.user_id  # Pass from frontend
             
             event = Event.query.get(event_id)
             if not event:
@@ -150,9 +265,10 @@ def register_socketio_events(socketio):
             # Join the Socket.IO room
             room_name = f"event_{event_id}"
             join_room(room_name)
+            presence.join(request.sid, event_id, user_id)
             
             user = User.query.get(user_id)
-            print(f"👥 {user.username if user else 'Unknown'} joined chat for {event.title}")
+            logger.debug("User joined chat", extra={'user_id': user_id, 'event_id': event_id})
             
             # Notify others that user joined
             emit('user_joined_chat', {
@@ -167,10 +283,11 @@ def register_socketio_events(socketio):
             })
             
         except Exception as e:
-            print(f"❌ Join chat error: {str(e)}")
+            logger.exception("Join chat error")
             emit('error', {'message': 'Failed to join chat'})
     
     @socketio.on('leave_event_chat')
+    @track_socket_event
     def handle_leave_chat(data):
         """Leave chat room for an event"""
         try:
@@ -180,11 +297,11 @@ def register_socketio_events(socketio):
             if event_id:
                 room_name = f"event_{event_id}"
                 leave_room(room_name)
+                presence.leave(request.sid, event_id, user_id)
                 
                 user = User.query.get(user_id)
-                event = Event.query.get(event_id)
                 
-                print(f"👋 {user.username if user else 'Unknown'} left chat for {event.title if event else 'Unknown Event'}")
+                logger.debug("User left chat", extra={'user_id': user_id, 'event_id': event_id})
                 
                 # Notify others that user left
                 emit('user_left_chat', {
@@ -194,11 +311,13 @@ def register_socketio_events(socketio):
                 }, room=room_name)
             
         except Exception as e:
-            print(f"❌ Leave chat error: {str(e)}")
+            logger.exception("Leave chat error")
     
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle user disconnect"""
-        print(f"🔌 User disconnected from chat")
+        metrics.socket_disconnected()
+        presence.disconnect(request.sid)
+        logger.debug("Socket disconnected")
     
-    print("✅ Socket.IO events registered successfully")
+    logger.debug("Socket.IO events registered")
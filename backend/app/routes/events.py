@@ -1,15 +1,70 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from app import db
-from app.models import User, Event
+from app.utils.analytics import increment
+from app.utils.auth import jwt_required
+from app.utils.changes import record_event_change, current_watermark, check_since, changes_since
+from app.utils.database import replica_reads, use_primary
+from app.utils.event_cache import event_detail_cache, invalidate_event_detail
+from app.utils.idempotency import idempotent
+from app.utils.metrics import metrics
+from app.utils.notifications import notify
+from app.utils.ratings import rating_summaries
+from app.utils.pagination import encode_cursor
+from app.utils.serializers import (EVENT_COLUMNS, ARCHIVED_EVENT_COLUMNS, EVENT_SUMMARY_COLUMNS, PROFILE_COLUMNS,
+                                   event_row_to_dict, event_summary_row_to_dict, profile_row_to_dict)
+from app.utils.sockets import user_room
+from app.utils.validators import Schema, String, Integer, Boolean, Choice, Cursor, StringList, validate
+from app.models import User, Event, EventAttendee, WaitlistEntry, ArchivedEvent, ChatRoom
 from datetime import datetime, timedelta
 import uuid
+import logging
+
+logger = logging.getLogger(__name__)
 
 events_bp = Blueprint('events', __name__, url_prefix='/api/events')
 
+class NewEvent(Schema):
+    title = String(required=True, max_length=255)
+    description = String(required=True, max_length=5000)
+    categories = StringList(required=True, max_items=10)
+    street_address = String(key='streetAddress', required=True, max_length=200)
+    city = String(required=True, max_length=100)
+    state = String(required=True, max_length=50)
+    zip_code = String(key='zipCode', max_length=20)
+    landmark = String(max_length=100)
+    capacity = Integer(required=True, min_value=1, max_value=9999, error='Capacity must be between 1 and 9999')
+
+class EventFeedQuery(Schema):
+    category = String(max_length=50)
+    search = String(max_length=100)
+    limit = Integer(default=50, min_value=1, max_value=100, clamp=True)
+    offset = Integer(default=0, min_value=0, max_value=10000)
+    include_past = Boolean()
+
+class MyEventsQuery(Schema):
+    role = Choice(('attending', 'hosting'), default='attending')
+    limit = Integer(default=20, min_value=1, max_value=100, clamp=True)
+    cursor = Cursor(datetime, str)
+    include_past = Boolean()
+
+class AttendeePageQuery(Schema):
+    limit = Integer(default=50, min_value=1, max_value=200, clamp=True)
+    cursor = Cursor(str)
+
+class JoinQuery(Schema):
+    waitlist = Boolean()
+
+class ChangesQuery(Schema):
+    since = Integer(required=True, min_value=0)
+    limit = Integer(default=500, min_value=1, max_value=1000, clamp=True)
+
 @events_bp.route('', methods=['POST'])
 @jwt_required()
-def create_event():
+@idempotent
+@validate(body=NewEvent)
+def create_event(body):
     """
     Create a new event
     Expects JSON: {
@@ -24,42 +79,16 @@ def create_event():
         "capacity": 25,
         "date": "2025-09-25T10:00:00Z"
     }
+    Send an Idempotency-Key header to make retries safe (also on join and leave)
     """
     try:
-        data = request.get_json()
         user_id = get_jwt_identity()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        print(f"📝 Creating event with data: {data}")
-        print(f"🏷️ Categories received: {data.get('categories', [])}")
-        print(f"🏷️ Categories type: {type(data.get('categories', []))}")
-        print(f"🏷️ Categories length: {len(data.get('categories', []))}")
-        
-        # Validate required fields
-        required_fields = ['title', 'description', 'categories', 'streetAddress', 'city', 'state', 'capacity']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        # Validate categories
-        categories = data.get('categories', [])
-        print(f"🔍 Categories after extraction: {categories}")
-        if not categories or len(categories) == 0:
-            return jsonify({'error': 'At least one category is required'}), 400
-        # Validate capacity
-        try:
-            capacity = int(data.get('capacity'))
-            if capacity < 1 or capacity > 9999:
-                return jsonify({'error': 'Capacity must be between 1 and 9999'}), 400
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Invalid capacity value'}), 400
+        categories = body.categories
         
         # Create full address
-        full_address = f"{data.get('streetAddress')}, {data.get('city')}, {data.get('state')} {data.get('zipCode')}"
-        if data.get('landmark'):
-            full_address += f" ({data.get('landmark')})"
+        full_address = f"{body.street_address}, {body.city}, {body.state} {body.zip_code}"
+        if body.landmark:
+            full_address += f" ({body.landmark})"
         
         # For now, use current time + 1 hour as default event time
         event_date = (datetime.utcnow() + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
@@ -68,27 +97,26 @@ def create_event():
         user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
-        print(f"🎯 About to create event with:")
-        print(f"  - category: {categories[0]}")
-        print(f"  - tags: {categories}")
-        print(f"  - tags type: {type(categories)}")
         # Create new event
         event = Event(
             id=str(uuid.uuid4()),
-            title=data.get('title').strip(),
-            description=data.get('description').strip(),
+            title=body.title,
+            description=body.description,
             category=categories[0],  # Primary category
             tags=categories,  # All selected categories as tags
             location=full_address,
             event_date=event_date,
-            max_attendees=capacity,
+            max_attendees=body.capacity,
             created_by=user_id
         )
         
         db.session.add(event)
+        record_event_change(event.id, 'created')
+        for category in dict.fromkeys(categories):
+            increment('events_created', key=category)
         db.session.commit()
         
-        print(f"✅ Event created successfully: {event.title}")
+        logger.info("Event created", extra={'event_id': event.id, 'category': event.category, 'tag_count': len(categories)})
         
         return jsonify({
             'message': 'Event created successfully',
@@ -97,60 +125,284 @@ def create_event():
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Create event error: {str(e)}")
+        logger.exception("Create event error")
         return jsonify({'error': 'Failed to create event'}), 500
 
 @events_bp.route('', methods=['GET'])
-def get_events():
+@replica_reads
+@validate(params=EventFeedQuery)
+def get_events(params):
     """
-    Get all events (public endpoint)
-    Optional query params: category, search, limit, offset
+    Get upcoming events (public endpoint)
+    Optional query params: category, search, limit (max 100), offset,
+    include_past (true also returns finished and archived events)
+    Returns a watermark for GET /api/events/changes
     """
     try:
-        # Get query parameters
-        category = request.args.get('category')
-        search = request.args.get('search')
-        limit = int(request.args.get('limit', 50))
-        offset = int(request.args.get('offset', 0))
+        # Read before the page so a change racing the query is replayed, not missed
+        watermark = current_watermark(current_app.config['EVENTS_CHANGES_SETTLE_SECONDS'])
+        category = params.category
+        search = params.search
+        limit = params.limit
+        offset = params.offset
+        include_past = params.include_past
+        
+        if include_past:
+            # Live and archived events in one date-ordered page
+            live_filters = _event_filters(Event, category, search)
+            archived_filters = _event_filters(ArchivedEvent, category, search)
+            live = db.select(*EVENT_COLUMNS).where(*live_filters)
+            archived = db.select(*ARCHIVED_EVENT_COLUMNS).where(*archived_filters)
+            combined = db.union_all(live, archived).subquery()
+            events = db.session.execute(
+                db.select(combined).order_by(combined.c.event_date.asc()).offset(offset).limit(limit)
+            ).all()
+            # Counted per table rather than over the union, so each count can walk an index instead of the rows
+            total = db.session.execute(db.select(
+                db.select(db.func.count()).select_from(Event).where(*live_filters).scalar_subquery() +
+                db.select(db.func.count()).select_from(ArchivedEvent).where(*archived_filters).scalar_subquery()
+            )).scalar()
+        else:
+            # Events stay listed for a grace period after they start - the
+            # range scan on ix_events_event_date only touches live rows
+            since = datetime.utcnow() - timedelta(minutes=current_app.config['EVENTS_UPCOMING_GRACE_MINUTES'])
+            query = Event.query.filter(Event.event_date >= since, *_event_filters(Event, category, search))
+            
+            # Order by date and apply pagination - plain rows, no ORM objects
+            events = query.order_by(Event.event_date.asc())\
+                          .with_entities(*EVENT_COLUMNS)\
+                          .offset(offset)\
+                          .limit(limit)\
+                          .all()
+            total = query.count()
+        
+        logger.debug("Fetched events", extra={'category': category, 'search': search,
+                                              'include_past': include_past, 'count': len(events)})
+        
+        # Event and host ratings for the whole page in one lookup
+        events = [event_row_to_dict(event) for event in events]
+        event_ratings, host_ratings = rating_summaries([e['id'] for e in events], [e['created_by'] for e in events])
+        for event in events:
+            event['rating'] = event_ratings.get(event['id'])
+            event['host_rating'] = host_ratings.get(event['created_by'])
         
-        print(f"📋 Getting events - category: {category}, search: {search}")
-        
-        # Build query - get all events for now
-        query = Event.query
+        return jsonify({
+            'events': events,
+            'total': total,
+            'watermark': watermark
+        }), 200
         
-        if category and category != 'all':
-            # Filter by category in tags array
-            query = query.filter(Event.tags.contains([category]))
+    except Exception as e:
+        logger.exception("Get events error")
+        return jsonify({'error': 'Failed to get events'}), 500
+
+@events_bp.route('/changes', methods=['GET'])
+@replica_reads
+@validate(params=ChangesQuery)
+def get_event_changes(params):
+    """
+    Events created, updated or deleted since a watermark (public endpoint)
+    Query params: since (watermark from the feed or the previous call), limit
+    Returns {"events": [...], "deleted": [ids], "watermark": N, "has_more": bool};
+    410 when the watermark is older than the retained log, 400 when it is
+    newer than any change - reload the feed.
+    """
+    try:
+        settle_seconds = current_app.config['EVENTS_CHANGES_SETTLE_SECONDS']
+        problem = check_since(params.since)
+        if problem == 'unknown':
+            # The replica may not have caught up with the write that made this watermark
+            use_primary()
+            problem = check_since(params.since)
+        if problem == 'expired':
+            return jsonify({'error': 'Change history expired, reload the feed',
+                            'watermark': current_watermark(settle_seconds)}), 410
+        if problem == 'unknown':
+            return jsonify({'error': 'Unknown watermark, reload the feed',
+                            'watermark': current_watermark(settle_seconds)}), 400
+        
+        changes, watermark, has_more = changes_since(params.since, params.limit, settle_seconds)
+        
+        # Latest kind per event - one row per event however often it changed
+        latest = {}
+        for seq, event_id, kind in changes:
+            latest[event_id] = kind
+        changed_ids = [event_id for event_id, kind in latest.items() if kind != 'deleted']
+        
+        events = []
+        if changed_ids:
+            rows = db.session.query(*EVENT_COLUMNS)\
+                             .filter(Event.id.in_(changed_ids))\
+                             .all()
+            events = [event_row_to_dict(row) for row in rows]
+            event_ratings, host_ratings = rating_summaries([e['id'] for e in events], [e['created_by'] for e in events])
+            for event in events:
+                event['rating'] = event_ratings.get(event['id'])
+                event['host_rating'] = host_ratings.get(event['created_by'])
+        
+        # Gone from the table (archived after the change) counts as deleted
+        found = {event['id'] for event in events}
+        deleted = [event_id for event_id in latest if event_id not in found]
+        
+        logger.debug("Fetched event changes", extra={'since': params.since, 'changes': len(changes),
+                                                     'events': len(events), 'deleted': len(deleted)})
         
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Event.title.ilike(search_term),
-                    Event.description.ilike(search_term),
-                    Event.location.ilike(search_term)
-                )
-            )
+        return jsonify({
+            'events': events,
+            'deleted': deleted,
+            'watermark': watermark,
+            'has_more': has_more
+        }), 200
         
-        # Order by date and apply pagination
-        events = query.order_by(Event.event_date.asc()).offset(offset).limit(limit).all()
+    except Exception as e:
+        logger.exception("Get event changes error")
+        return jsonify({'error': 'Failed to get event changes'}), 500
+
+@events_bp.route('/mine', methods=['GET'])
+@jwt_required()
+@replica_reads
+@validate(params=MyEventsQuery)
+def get_my_events(params):
+    """
+    Events the current user is attending or hosting, soonest first
+    Optional query params: role (attending|hosting, default attending), limit,
+    cursor (next_cursor from the previous page), include_past (true also
+    returns live events that have already started; archived events are not listed)
+    """
+    try:
+        user_id = get_jwt_identity()
         
-        print(f"✅ Found {len(events)} events")
+        # Both lookups are a single index range: (user_id, event_date, event_id)
+        # on event_attendees, or (created_by, event_date, id) on events
+        if params.role == 'attending':
+            event_date, event_id = EventAttendee.event_date, EventAttendee.event_id
+            query = db.session.query(*EVENT_SUMMARY_COLUMNS)\
+                              .select_from(EventAttendee)\
+                              .join(Event, Event.id == EventAttendee.event_id)\
+                              .filter(EventAttendee.user_id == user_id)
+        else:
+            event_date, event_id = Event.event_date, Event.id
+            query = db.session.query(*EVENT_SUMMARY_COLUMNS).filter(Event.created_by == user_id)
+        
+        if not params.include_past:
+            since = datetime.utcnow() - timedelta(minutes=current_app.config['EVENTS_UPCOMING_GRACE_MINUTES'])
+            query = query.filter(event_date >= since)
+        if params.cursor:
+            query = query.filter(db.tuple_(event_date, event_id) > params.cursor)
+        
+        events = query.order_by(event_date.asc(), event_id.asc())\
+                      .limit(params.limit + 1)\
+                      .all()
+        
+        has_more = len(events) > params.limit
+        events = [event_summary_row_to_dict(event) for event in events[:params.limit]]
         
         return jsonify({
-            'events': [event.to_dict() for event in events],
-            'total': query.count()
+            'events': events,
+            'next_cursor': encode_cursor(events[-1]['event_date'], events[-1]['id']) if has_more else None
         }), 200
         
     except Exception as e:
-        print(f"❌ Get events error: {str(e)}")
+        logger.exception("Get my events error")
         return jsonify({'error': 'Failed to get events'}), 500
 
+@events_bp.route('/<event_id>', methods=['GET'])
+@replica_reads
+@validate(params=AttendeePageQuery)
+def get_event(event_id, params):
+    """
+    Event detail (public endpoint): the event with its host profile, chat room id
+    and one page of attendee profiles (id, username, avatar_url)
+    Optional query params: limit (max 200), cursor (next_cursor from the previous page)
+    The attendee id array is left out - page through attendees instead.
+    """
+    try:
+        # One primary-key read decides whether the cached page is still current
+        version = db.session.query(Event.updated_at).filter(Event.id == event_id).first()
+        if version is None:
+            return jsonify({'error': 'Event not found'}), 404
+        version = version[0]
+        
+        cache = event_detail_cache()
+        page_key = (params.cursor, params.limit)
+        payload = cache.get(event_id, page_key, version)
+        if payload is None:
+            payload = _event_detail(event_id, params.cursor, params.limit)
+            if payload is None:
+                return jsonify({'error': 'Event not found'}), 404
+            cache.put(event_id, page_key, version, payload)
+        
+        return jsonify(payload), 200
+        
+    except Exception as e:
+        logger.exception("Get event error")
+        return jsonify({'error': 'Failed to get event'}), 500
+
+def _event_detail(event_id, cursor, limit):
+    """
+    Detail payload in a fixed number of queries whatever the attendee count:
+    the event joined to its host and chat room, one attendee page, ratings
+    """
+    row = db.session.query(*EVENT_COLUMNS, *PROFILE_COLUMNS, ChatRoom.id)\
+                    .outerjoin(User, User.id == Event.created_by)\
+                    .outerjoin(ChatRoom, ChatRoom.event_id == Event.id)\
+                    .filter(Event.id == event_id)\
+                    .first()
+    if row is None:
+        return None
+    
+    columns = len(EVENT_COLUMNS)
+    event = event_row_to_dict(row[:columns])
+    del event['attendees']
+    event['host'] = profile_row_to_dict(row[columns:columns + 3])
+    event['chat_room_id'] = row[columns + 3]
+    event_ratings, host_ratings = rating_summaries([event['id']], [event['created_by']])
+    event['rating'] = event_ratings.get(event['id'])
+    event['host_rating'] = host_ratings.get(event['created_by'])
+    
+    # Profiles straight off the (event_id, user_id) primary key joined to users - one query per page
+    query = db.session.query(*PROFILE_COLUMNS)\
+                      .select_from(EventAttendee)\
+                      .join(User, User.id == EventAttendee.user_id)\
+                      .filter(EventAttendee.event_id == event_id)
+    if cursor:
+        query = query.filter(EventAttendee.user_id > cursor[0])
+    attendees = query.order_by(EventAttendee.user_id.asc())\
+                     .limit(limit + 1)\
+                     .all()
+    
+    has_more = len(attendees) > limit
+    attendees = [profile_row_to_dict(attendee) for attendee in attendees[:limit]]
+    return {
+        'event': event,
+        'attendees': attendees,
+        'next_cursor': encode_cursor(attendees[-1]['id']) if has_more else None
+    }
+
+def _event_filters(model, category, search):
+    """category/search conditions for Event or ArchivedEvent"""
+    conditions = []
+    if category and category != 'all':
+        # Filter by category in tags array
+        conditions.append(model.tags.contains([category]))
+    if search:
+        search_term = f"%{search}%"
+        conditions.append(db.or_(
+            model.title.ilike(search_term),
+            model.description.ilike(search_term),
+            model.location.ilike(search_term)
+        ))
+    return conditions
+
 @events_bp.route('/<event_id>/join', methods=['POST'])
 @jwt_required()
-def join_event(event_id):
+@idempotent
+@validate(params=JoinQuery)
+def join_event(event_id, params):
     """
     Join an event
+    Optional query param: waitlist (true queues you when the event is full -
+    202 with your waitlist_position, and a leave promotes the queue in order)
     """
     try:
         user_id = get_jwt_identity()
@@ -170,19 +422,57 @@ def join_event(event_id):
                 'event': event.to_dict()
             }), 400
         
-        # Check if event is full
+        # Check if event is full - waitlist requests go on to queue under the lock below
         current_attendees = len(event.attendees)
-        if current_attendees >= event.max_attendees:
+        if current_attendees >= event.max_attendees and not params.waitlist:
+            return jsonify({
+                'error': 'Event is full',
+                'event': event.to_dict()
+            }), 400
+        
+        # The reverse-lookup row goes in first: its primary key settles concurrent joins,
+        # and the write takes SQLite's lock before the attendees array is re-read below
+        attendance = EventAttendee(event_id=event.id, user_id=user_id, event_date=event.event_date)
+        db.session.add(attendance)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({
+                'error': 'You have already joined this event',
+                'event': event.to_dict()
+            }), 400
+        
+        # Latest attendees, row-locked on databases with FOR UPDATE, so no join is lost
+        db.session.refresh(event, with_for_update=True)
+        attendees = event.attendees or []
+        if len(attendees) >= event.max_attendees:
+            if params.waitlist:
+                # Still holding the lock, so no leave can free a spot before the entry is queued
+                db.session.delete(attendance)
+                return _join_waitlist(event, user_id)
+            db.session.rollback()
             return jsonify({
                 'error': 'Event is full',
                 'event': event.to_dict()
             }), 400
         
         # Add user to attendees
-        event.attendees = event.attendees + [user_id]
+        event.attendees = attendees + [user_id]
+        record_event_change(event.id)
+        if event.created_by != user_id:
+            user = User.query.get(user_id)
+            notify([event.created_by], 'event_joined', {
+                'event_id': event.id,
+                'title': event.title,
+                'user_id': user_id,
+                'username': user.username if user else 'Someone',
+            })
+        increment('joins', key=event.id)
         db.session.commit()
+        invalidate_event_detail(event.id)
         
-        print(f"✅ User {user_id} joined event '{event.title}' (now {len(event.attendees)} attendees)")
+        logger.info("User joined event", extra={'user_id': user_id, 'event_id': event_id, 'attendee_count': len(event.attendees)})
         
         return jsonify({
             'message': 'Successfully joined event',
@@ -192,11 +482,12 @@ def join_event(event_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Join event error: {str(e)}")
+        logger.exception("Join event error")
         return jsonify({'error': 'Failed to join event'}), 500
 
 @events_bp.route('/<event_id>/leave', methods=['POST'])
 @jwt_required()
+@idempotent
 def leave_event(event_id):
     """
     Leave an event
@@ -208,18 +499,35 @@ def leave_event(event_id):
         if not event:
             return jsonify({'error': 'Event not found'}), 404
         
-        # Check if user is actually attending
+        # Check if user is actually attending - or only queued
         if not event.attendees or user_id not in event.attendees:
+            return _leave_waitlist(event, user_id)
+        
+        # Same order as join: the lookup row first, then the freshly read array
+        EventAttendee.query.filter_by(event_id=event.id, user_id=user_id).delete(synchronize_session=False)
+        db.session.refresh(event, with_for_update=True)
+        if user_id not in (event.attendees or []):
+            db.session.rollback()
             return jsonify({
                 'error': 'You are not attending this event',
                 'event': event.to_dict()
             }), 400
         
-        # Remove user from attendees
+        # Remove user from attendees, and hand the spot to the head of the waitlist
         event.attendees = [uid for uid in event.attendees if uid != user_id]
+        promoted = _promote_from_waitlist(event)
+        record_event_change(event.id)
+        increment('leaves', key=event.id)
         db.session.commit()
+        invalidate_event_detail(event.id)
+        
+        if promoted:
+            from app import socketio
+            socketio.emit('waitlist_promoted', {'event_id': event.id, 'title': event.title}, to=user_room(promoted))
+            metrics.count_socket_event('waitlist_promoted', direction='out')
         
-        print(f"✅ User {user_id} left event '{event.title}' (now {len(event.attendees)} attendees)")
+        logger.info("User left event", extra={'user_id': user_id, 'event_id': event_id, 'attendee_count': len(event.attendees),
+                                               'promoted': promoted})
         
         return jsonify({
             'message': 'Successfully left event',
@@ -229,5 +537,80 @@ def leave_event(event_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Leave event error: {str(e)}")
-        return jsonify({'error': 'Failed to leave event'}), 500
\ No newline at end of file
+        logger.exception("Leave event error")
+        return jsonify({'error': 'Failed to leave event'}), 500
+
+def _join_waitlist(event, user_id):
+    """Queue user_id for the full `event` in the caller's transaction, which holds the event lock"""
+    db.session.add(WaitlistEntry(event_id=event.id, user_id=user_id))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({
+            'error': 'You are already on the waitlist',
+            'waitlist_position': _waitlist_position(event.id, user_id),
+            'event': event.to_dict()
+        }), 400
+    
+    position = _waitlist_position(event.id, user_id)
+    logger.info("User joined waitlist", extra={'user_id': user_id, 'event_id': event.id, 'position': position})
+    
+    return jsonify({
+        'message': 'Event is full - you are on the waitlist',
+        'event': event.to_dict(),
+        'waitlisted': True,
+        'waitlist_position': position
+    }), 202
+
+def _waitlist_position(event_id, user_id):
+    """1-based place in line, or None - a range count on (event_id, position)"""
+    mine = db.session.query(WaitlistEntry.position).filter_by(event_id=event_id, user_id=user_id).scalar()
+    if mine is None:
+        return None
+    return db.session.query(db.func.count())\
+                     .select_from(WaitlistEntry)\
+                     .filter(WaitlistEntry.event_id == event_id, WaitlistEntry.position <= mine)\
+                     .scalar()
+
+def _leave_waitlist(event, user_id):
+    """leave_event for a user who is queued rather than attending"""
+    # The delete takes the write lock first, as in leave_event, and the event row lock
+    # keeps it from racing a promotion of the same entry
+    deleted = WaitlistEntry.query.filter_by(event_id=event.id, user_id=user_id).delete(synchronize_session=False)
+    db.session.refresh(event, with_for_update=True)
+    if not deleted:
+        db.session.rollback()
+        return jsonify({
+            'error': 'You are not attending this event',
+            'event': event.to_dict()
+        }), 400
+    db.session.commit()
+    
+    logger.info("User left waitlist", extra={'user_id': user_id, 'event_id': event.id})
+    
+    return jsonify({
+        'message': 'Successfully left the waitlist',
+        'event': event.to_dict(),
+        'user_left': True
+    }), 200
+
+def _promote_from_waitlist(event):
+    """
+    Give a free spot to the head of the waitlist in the caller's transaction,
+    which holds the event lock. One index probe; returns the promoted user id or None.
+    """
+    if len(event.attendees) >= event.max_attendees:
+        return None
+    head = WaitlistEntry.query.filter_by(event_id=event.id)\
+                              .order_by(WaitlistEntry.position.asc())\
+                              .first()
+    if head is None:
+        return None
+    
+    db.session.delete(head)
+    db.session.add(EventAttendee(event_id=event.id, user_id=head.user_id, event_date=event.event_date))
+    event.attendees = event.attendees + [head.user_id]
+    notify([head.user_id], 'waitlist_promoted', {'event_id': event.id, 'title': event.title}, delay_seconds=0)
+    increment('joins', key=event.id)
+    return head.user_id
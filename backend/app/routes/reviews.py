@@ -0,0 +1,123 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.utils.auth import jwt_required
+from app.utils.database import replica_reads
+from app.utils.pagination import encode_cursor
+from app.utils.ratings import record_rating, get_rating
+from app.utils.validators import Schema, String, Integer, Cursor, validate
+from app.models import Event, ArchivedEvent, Review
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+reviews_bp = Blueprint('reviews', __name__, url_prefix='/api')
+
+class NewReview(Schema):
+    rating = Integer(required=True, min_value=1, max_value=5, error='Rating must be a whole number from 1 to 5')
+    comment = String(max_length=2000)
+
+class ReviewPageQuery(Schema):
+    limit = Integer(default=20, min_value=1, max_value=100, clamp=True)
+    cursor = Cursor(datetime, str)
+
+def _find_event(event_id):
+    """Live or archived - most reviews arrive after an event has been archived"""
+    return Event.query.get(event_id) or ArchivedEvent.query.get(event_id)
+
+@reviews_bp.route('/events/<event_id>/reviews', methods=['POST'])
+@jwt_required()
+@validate(body=NewReview)
+def create_review(event_id, body):
+    """
+    Review an event after it has happened
+    Only attendees can review, once per event
+    Expects JSON: {"rating": 1-5, "comment": "optional"}
+    """
+    try:
+        user_id = get_jwt_identity()
+        rating = body.rating
+
+        event = _find_event(event_id)
+        if not event:
+            return jsonify({'error': 'Event not found'}), 404
+
+        if not event.attendees or user_id not in event.attendees:
+            return jsonify({'error': 'Only attendees can review this event'}), 403
+
+        if event.event_date > datetime.utcnow():
+            return jsonify({'error': 'Event has not happened yet'}), 400
+
+        review = Review(event_id=event_id, user_id=user_id, rating=rating, comment=body.comment)
+        db.session.add(review)
+        db.session.flush()  # Duplicate reviews fail here, before the aggregates move
+        record_rating(event_id, event.created_by, rating)
+        db.session.commit()
+
+        logger.info("Event reviewed", extra={'user_id': user_id, 'event_id': event_id, 'rating': rating})
+
+        return jsonify({
+            'message': 'Review submitted',
+            'review': review.to_dict(),
+            'rating': get_rating('event', event_id).to_dict()
+        }), 201
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'You have already reviewed this event'}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Create review error")
+        return jsonify({'error': 'Failed to submit review'}), 500
+
+@reviews_bp.route('/events/<event_id>/reviews', methods=['GET'])
+@replica_reads
+@validate(params=ReviewPageQuery)
+def get_reviews(event_id, params):
+    """
+    Reviews for an event, newest first (public endpoint)
+    Optional query params: limit, cursor (next_cursor from the previous page)
+    """
+    try:
+        limit = params.limit
+
+        query = Review.query.filter_by(event_id=event_id)
+        if params.cursor:
+            created_at, review_id = params.cursor
+            # Row-value comparison, so the index range starts right after the cursor
+            query = query.filter(db.tuple_(Review.created_at, Review.id) < (created_at, review_id))
+
+        reviews = query.options(db.joinedload(Review.user))\
+                       .order_by(Review.created_at.desc(), Review.id.desc())\
+                       .limit(limit + 1)\
+                       .all()
+
+        has_more = len(reviews) > limit
+        reviews = reviews[:limit]
+        aggregate = get_rating('event', event_id)
+
+        return jsonify({
+            'reviews': [review.to_dict() for review in reviews],
+            'next_cursor': encode_cursor(reviews[-1].created_at, reviews[-1].id) if has_more else None,
+            'rating': aggregate.to_dict() if aggregate else None
+        }), 200
+
+    except Exception as e:
+        logger.exception("Get reviews error")
+        return jsonify({'error': 'Failed to get reviews'}), 500
+
+@reviews_bp.route('/organizers/<user_id>/rating', methods=['GET'])
+@replica_reads
+def get_organizer_rating(user_id):
+    """
+    Rating across all events a user has hosted (public endpoint)
+    """
+    try:
+        aggregate = get_rating('organizer', user_id)
+        return jsonify({'user_id': user_id, 'rating': aggregate.to_dict() if aggregate else None}), 200
+
+    except Exception as e:
+        logger.exception("Get organizer rating error")
+        return jsonify({'error': 'Failed to get rating'}), 500
@@ -0,0 +1,189 @@
+"""
+Incrementally maintained counters for the admin dashboard.
+
+Write paths call increment() before their commit, so a counter moves in
+the same transaction as the row it counts. Joins and leaves are keyed by
+event, so they only contend on the row of the event already locked. Dashboard reads then touch a
+handful of counter rows instead of GROUP BY scans over events and
+messages. `flask backfill-analytics` rebuilds the counters that can be
+derived from the raw tables.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+import click
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+
+from app import db
+from app.utils.database import UPSERT_DIALECTS, upsert_increment
+from app.models import Event, ArchivedEvent, Message, ArchivedMessage, AnalyticsCounter, ActiveUser
+
+logger = logging.getLogger(__name__)
+
+ALL_TIME = 'all'
+
+
+def today():
+    return datetime.utcnow().date().isoformat()
+
+
+def increment(metric, key='', amount=1, period=None, conn=None):
+    """Add `amount` to a counter in the current transaction (the session's, or `conn`'s)"""
+    upsert_increment(AnalyticsCounter, {'metric': metric, 'period': period or today(), 'key': key},
+                     {'value': amount}, executor=conn)
+
+
+class ActivityTracker:
+    """
+    Counts daily active users. Each process remembers who it has already
+    recorded today, so only a user's first request of the day counts, and
+    those sightings are written in batches by a background thread rather
+    than by the request that made them.
+    """
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._period = None
+        self._seen = set()
+        self._pending = []  # (period, user_id) not written yet
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def first_sighting(self, user_id):
+        period = today()
+        with self._lock:
+            if period != self._period:
+                self._period = period
+                self._seen = set()
+            if user_id in self._seen:
+                return None
+            self._seen.add(user_id)
+            return period
+
+    def record(self, user_id):
+        """Queue user_id's first request of the day - no I/O"""
+        period = self.first_sighting(user_id)
+        if period is None:
+            return
+        with self._lock:
+            self._pending.append((period, user_id))
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name='activity-flush', daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Record activity error")
+
+    def flush(self):
+        """Write the queued sightings, one insert and one counter update per day; returns how many"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        by_period = {}
+        for period, user_id in pending:
+            by_period.setdefault(period, []).append(user_id)
+        try:
+            # Own connection, so this never commits whatever a request left in the session
+            with db.engine.begin() as conn:
+                for period, user_ids in by_period.items():
+                    inserted = self._insert(conn, period, user_ids)
+                    if inserted:
+                        increment('active_users', amount=inserted, period=period, conn=conn)
+        except Exception:
+            with self._lock:
+                self._pending[:0] = pending  # Retried on the next flush
+            raise
+        return len(pending)
+
+    @staticmethod
+    def _insert(conn, period, user_ids):
+        """Add the ActiveUser rows that are missing; returns how many were new"""
+        rows = [{'period': period, 'user_id': user_id} for user_id in user_ids]
+        dialect = UPSERT_DIALECTS.get(db.engine.dialect.name)
+        if dialect is not None:
+            return conn.execute(dialect.insert(ActiveUser).values(rows).on_conflict_do_nothing()).rowcount
+        existing = set(conn.execute(
+            db.select(ActiveUser.user_id).where(ActiveUser.period == period, ActiveUser.user_id.in_(user_ids))
+        ).scalars())
+        rows = [row for row in rows if row['user_id'] not in existing]
+        if rows:
+            conn.execute(db.insert(ActiveUser), rows)
+        return len(rows)
+
+
+def init_analytics(app):
+    activity = app.extensions['activity'] = ActivityTracker(app, app.config['ANALYTICS_FLUSH_SECONDS'])
+
+    @app.after_request
+    def record_activity(response):
+        if response.status_code >= 400 or request.endpoint is None:
+            return response
+        try:
+            user_id = get_jwt_identity()
+        except RuntimeError:  # No JWT verified for this request
+            return response
+        if user_id:
+            activity.record(user_id)
+        return response
+
+    @app.cli.command('backfill-analytics')
+    def backfill_analytics_command():
+        """Rebuild event, message and active-user counters from the raw tables"""
+        counts = backfill()
+        for metric, rows in counts.items():
+            click.echo(f'{metric}: {rows} counters')
+
+
+def backfill():
+    """
+    Recompute events_created, messages and active_users in one transaction,
+    counting archived events and messages too.
+    joins/leaves are left alone - attendance changes are not kept anywhere
+    else, so those counters only exist from the write path.
+    """
+    rebuilt = {}
+
+    events_created = {}
+    for model in (Event, ArchivedEvent):
+        for created_at, tags, category in db.session.query(model.created_at, model.tags, model.category)\
+                                                     .yield_per(5000):
+            period = (created_at or datetime.utcnow()).date().isoformat()
+            for tag in tags or [category]:
+                events_created[(period, tag)] = events_created.get((period, tag), 0) + 1
+    rebuilt['events_created'] = [{'period': p, 'key': k, 'value': v} for (p, k), v in events_created.items()]
+
+    messages = {}
+    for model in (Message, ArchivedMessage):
+        for room_id, count in db.session.query(model.chat_room_id, db.func.count())\
+                                        .group_by(model.chat_room_id):
+            messages[room_id] = messages.get(room_id, 0) + count
+    rebuilt['messages'] = [{'period': ALL_TIME, 'key': k, 'value': v} for k, v in messages.items()]
+
+    rebuilt['active_users'] = [
+        {'period': period, 'key': '', 'value': count}
+        for period, count in db.session.query(ActiveUser.period, db.func.count()).group_by(ActiveUser.period)
+    ]
+
+    try:
+        for metric, rows in rebuilt.items():
+            AnalyticsCounter.query.filter_by(metric=metric).delete(synchronize_session=False)
+            if rows:
+                db.session.execute(db.insert(AnalyticsCounter), [{'metric': metric, **row} for row in rows])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info("Backfilled analytics counters", extra={m: len(rows) for m, rows in rebuilt.items()})
+    return {metric: len(rows) for metric, rows in rebuilt.items()}
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import logging
+
+import click
+
+from app import db
+from app.utils.changes import record_deleted_events
+from app.models import (Event, EventAttendee, WaitlistEntry, ChatRoom, Message, ArchivedEvent, ArchivedChatRoom,
+                        ArchivedMessage)
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ('id', 'title', 'description', 'category', 'tags', 'location', 'event_date',
+                'max_attendees', 'attendees', 'created_by', 'created_at', 'updated_at')
+CHAT_ROOM_FIELDS = ('id', 'event_id', 'created_at')
+MESSAGE_FIELDS = ('id', 'chat_room_id', 'user_id', 'content', 'message_type', 'created_at')
+
+
+def _copy(target, source, fields, condition, extra=None):
+    """INSERT INTO target (...) SELECT ... FROM source WHERE condition - rows never leave the database"""
+    columns = [getattr(source, f) for f in fields]
+    target_fields = list(fields)
+    if extra:
+        columns += [db.literal(value) for value in extra.values()]
+        target_fields += list(extra)
+    db.session.execute(
+        db.insert(target.__table__).from_select(target_fields, db.select(*columns).where(condition))
+    )
+
+
+def archive_finished_events(older_than=timedelta(days=1), batch_size=500):
+    """
+    Move events whose date is more than `older_than` in the past into the
+    archive tables, with their chat rooms and messages. Their event_attendees
+    rows and waitlists are dropped - archived events keep the attendees
+    array - and the change log records them as deleted. Works in batches
+    so each transaction stays short. Returns the number of events archived.
+    """
+    cutoff = datetime.utcnow() - older_than
+    archived = 0
+
+    while True:
+        event_ids = [row[0] for row in db.session.query(Event.id)
+                                                .filter(Event.event_date < cutoff)
+                                                .order_by(Event.event_date.asc())
+                                                .limit(batch_size)]
+        if not event_ids:
+            break
+
+        room_ids = [row[0] for row in db.session.query(ChatRoom.id).filter(ChatRoom.event_id.in_(event_ids))]
+        now = datetime.utcnow()
+
+        try:
+            if room_ids:
+                _copy(ArchivedMessage, Message, MESSAGE_FIELDS, Message.chat_room_id.in_(room_ids))
+                _copy(ArchivedChatRoom, ChatRoom, CHAT_ROOM_FIELDS, ChatRoom.id.in_(room_ids))
+                Message.query.filter(Message.chat_room_id.in_(room_ids)).delete(synchronize_session=False)
+                ChatRoom.query.filter(ChatRoom.id.in_(room_ids)).delete(synchronize_session=False)
+            _copy(ArchivedEvent, Event, EVENT_FIELDS, Event.id.in_(event_ids), extra={'archived_at': now})
+            EventAttendee.query.filter(EventAttendee.event_id.in_(event_ids)).delete(synchronize_session=False)
+            WaitlistEntry.query.filter(WaitlistEntry.event_id.in_(event_ids)).delete(synchronize_session=False)
+            Event.query.filter(Event.id.in_(event_ids)).delete(synchronize_session=False)
+            record_deleted_events(event_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(event_ids)
+        logger.info("Archived finished events", extra={'count': len(event_ids), 'chat_rooms': len(room_ids)})
+
+    return archived
+
+
+def register_commands(app):
+    @app.cli.command('archive-events')
+    @click.option('--batch-size', type=int, default=None, help='Events moved per transaction')
+    def archive_events_command(batch_size):
+        """Move finished events, their chat rooms and messages into the archive tables"""
+        count = archive_finished_events(
+            older_than=timedelta(hours=app.config['EVENTS_ARCHIVE_AFTER_HOURS']),
+            batch_size=batch_size or app.config['EVENTS_ARCHIVE_BATCH_SIZE'],
+        )
+        click.echo(f'Archived {count} events')
@@ -0,0 +1,154 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+import flask_jwt_extended
+from flask import current_app, request
+from flask_jwt_extended.exceptions import RevokedTokenError
+from sqlalchemy.exc import IntegrityError
+
+# WSGI environ key of an /api/batch sub-request: (jwt header, claims) the batch verified
+BATCH_JWT = 'clustr.batch_jwt'
+
+
+def jwt_required(optional=False, fresh=False, refresh=False):
+    """
+    flask_jwt_extended.jwt_required for the routes, except in an /api/batch
+    sub-request: it runs in the batch's app context, where get_jwt() already
+    returns the batch's verified token, and finds that token in its environ.
+    So only the revocation check runs again, not a second decode.
+    """
+    def wrapper(view):
+        protected = flask_jwt_extended.jwt_required(optional=optional, fresh=fresh, refresh=refresh)(view)
+
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            verified = request.environ.get(BATCH_JWT)
+            if verified is None or fresh or refresh:
+                return protected(*args, **kwargs)
+            jwt_header, jwt_data = verified
+            if token_blocklist.is_revoked(jwt_data['jti']):
+                raise RevokedTokenError(jwt_header, jwt_data)
+            return current_app.ensure_sync(view)(*args, **kwargs)
+        return decorated
+    return wrapper
+
+
+class TokenBlocklist:
+    """
+    JWT revocation list.
+
+    Revoked JTIs live in the revoked_tokens table, mirrored by an in-memory
+    dict of jti -> expiry timestamp. Checking a token is a dict lookup; the
+    database is only touched when revoking and when a worker pulls rows other
+    workers have added since its last sync (at most once per sync interval).
+
+    The pull is a primary-key range above the last settled id. On
+    PostgreSQL ids are handed out before commit, so a later id can become
+    visible before an earlier one; a gap only counts as settled once the
+    row after it is older than the settle window, and until then the rows
+    above it are read again on every sync. One thread syncs at a time, on
+    its own connection; the others keep answering from the mirror.
+    """
+
+    def __init__(self):
+        self._revoked = {}
+        self._settled_id = 0  # Every revocation up to this id is in the mirror
+        self._next_sync = 0.0
+        self._sync_interval = 5.0
+        self._settle_seconds = 30.0
+        self._lock = threading.Lock()  # Guards the mirror
+        self._sync_lock = threading.Lock()  # Held by the syncing thread, only waited on before the first sync
+        self._primed = False
+
+    def init_app(self, app, jwt):
+        self._sync_interval = app.config.get('JWT_REVOCATION_SYNC_INTERVAL', 5.0)
+        self._settle_seconds = app.config.get('JWT_REVOCATION_SETTLE_SECONDS', 30.0)
+
+        @jwt.token_in_blocklist_loader
+        def check_if_token_revoked(jwt_header, jwt_payload):
+            return self.is_revoked(jwt_payload['jti'])
+
+    def is_revoked(self, jti):
+        """Check a JTI against the local mirror, syncing it when stale"""
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return jti in self._revoked
+
+    def revoke(self, jti, expires_at, user_id=None):
+        """Persist a revoked JTI and add it to the local mirror immediately"""
+        from app import db
+        from app.models import RevokedToken
+        from app.utils.database import UPSERT_DIALECTS
+
+        if isinstance(expires_at, (int, float)):
+            expires_at = datetime.utcfromtimestamp(expires_at)
+
+        # The same token can be revoked twice at once (double-clicked logout, client retry) - both succeed
+        dialect = UPSERT_DIALECTS.get(db.engine.dialect.name)
+        if dialect is not None:
+            db.session.execute(dialect.insert(RevokedToken)
+                                      .values(jti=jti, user_id=user_id, expires_at=expires_at)
+                                      .on_conflict_do_nothing(index_elements=['jti']))
+        elif not RevokedToken.query.filter_by(jti=jti).first():
+            try:
+                with db.session.begin_nested():
+                    db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            except IntegrityError:
+                pass  # Revoked concurrently
+        # Rows for tokens past their expiry are dead weight - drop them while we're here
+        RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow())\
+                          .delete(synchronize_session=False)
+        db.session.commit()
+
+        with self._lock:
+            self._revoked[jti] = expires_at.timestamp()
+
+    def sync(self):
+        """
+        Pull JTIs revoked by other workers since the last sync and drop
+        entries whose token would have expired anyway
+        """
+        from app import db
+        from app.models import RevokedToken
+
+        # A sync already running elsewhere will cover this caller too - unless the mirror is still empty
+        if not self._sync_lock.acquire(blocking=not self._primed):
+            return
+        try:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self._sync_interval
+
+            now = datetime.utcnow()
+            # Own connection, so a slow read never joins the transaction of the request that triggered it.
+            # Expired rows are read too, so the only gaps are ids not visible yet (or rolled back)
+            with db.engine.connect() as conn:
+                rows = conn.execute(
+                    db.select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at, RevokedToken.created_at)
+                      .where(RevokedToken.id > self._settled_id)
+                      .order_by(RevokedToken.id.asc())
+                ).all()
+            settled = now - timedelta(seconds=self._settle_seconds)
+            advancing = True
+            with self._lock:
+                for row_id, jti, expires_at, created_at in rows:
+                    if expires_at > now:
+                        self._revoked[jti] = expires_at.timestamp()
+                    # A gap in front of a fresh row may be a revocation still committing - stop there
+                    if advancing and (row_id == self._settled_id + 1 or (created_at or now) <= settled):
+                        self._settled_id = row_id
+                    else:
+                        advancing = False
+
+                cutoff = now.timestamp()
+                expired = [jti for jti, exp in self._revoked.items() if exp <= cutoff]
+                for jti in expired:
+                    del self._revoked[jti]
+            self._primed = True
+        finally:
+            self._sync_lock.release()
+
+
+token_blocklist = TokenBlocklist()
@@ -0,0 +1,127 @@
+"""
+Event change log for delta sync.
+
+Writers call record_event_change() before they commit, so a change row
+exists exactly when the change does. A client keeps the watermark from
+its last feed or changes response and polls
+GET /api/events/changes?since=<watermark>: a primary-key range over the
+log plus a primary-key lookup of the events that moved, so a poll costs
+the same however large the feed is. Old rows are pruned on a schedule;
+a client whose watermark predates the oldest row reloads the feed.
+"""
+from datetime import datetime, timedelta
+import logging
+
+from app import db
+from app.models import EventChange
+
+logger = logging.getLogger(__name__)
+
+_MAX_SEQ = 2 ** 63 - 1
+
+
+def record_event_change(event_id, kind='updated'):
+    """Log a change to one event in the caller's transaction"""
+    db.session.add(EventChange(event_id=event_id, kind=kind))
+
+
+def record_deleted_events(event_ids):
+    """Log the removal of several events (archiving) in one INSERT"""
+    now = datetime.utcnow()
+    db.session.execute(db.insert(EventChange),
+                       [{'event_id': event_id, 'kind': 'deleted', 'changed_at': now} for event_id in event_ids])
+
+
+def current_watermark(settle_seconds):
+    """
+    The watermark the feed hands out so the next poll starts from there:
+    the newest seq with no unsettled gap below it, by the same rule as
+    changes_since(). A bare max(seq) could pass a lower seq that is still
+    committing, and the client would never be sent it.
+    """
+    settled = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    first_fresh = db.session.query(db.func.min(EventChange.seq))\
+                            .filter(EventChange.changed_at > settled)\
+                            .scalar_subquery()
+    # Every row below the oldest fresh one has settled, gaps included - start
+    # from the newest of those (the newest row of all when nothing is fresh)
+    start = db.session.query(db.func.max(EventChange.seq))\
+                      .filter(EventChange.seq < db.func.coalesce(first_fresh, _MAX_SEQ))\
+                      .scalar_subquery()
+    rows = db.session.query(EventChange.seq, EventChange.changed_at)\
+                     .filter(EventChange.seq >= db.func.coalesce(start, 0))\
+                     .order_by(EventChange.seq.asc())\
+                     .all()
+
+    watermark = 0
+    for seq, changed_at in rows:
+        if seq != watermark + 1 and changed_at > settled:
+            break
+        watermark = seq
+    return watermark
+
+
+def _newest_seq():
+    return db.session.query(db.func.max(EventChange.seq)).scalar() or 0
+
+
+def check_since(since):
+    """
+    Whether changes can be replayed from `since` (0 means the start of the
+    retained log): 'expired' when rows right after it may already be
+    pruned, 'unknown' when it is past the newest seq so no response handed
+    it out, else None. Either way the client has to reload the feed.
+    """
+    if not since:
+        return None
+    # Two scalar subqueries - min() and max() in one SELECT would scan the whole log
+    oldest, newest = db.session.query(db.session.query(db.func.min(EventChange.seq)).scalar_subquery(),
+                                      db.session.query(db.func.max(EventChange.seq)).scalar_subquery()).one()
+    if oldest is None or since < oldest - 1:
+        return 'expired'
+    if since > newest:
+        return 'unknown'
+    return None
+
+
+def changes_since(since, limit, settle_seconds):
+    """
+    Up to `limit` log rows after `since` as (seq, event_id, kind) tuples,
+    the watermark to resume from, and whether the page was cut short.
+
+    On PostgreSQL seq values are handed out before commit, so a later one
+    can become visible before an earlier one. A gap in front of a row
+    younger than `settle_seconds` may still fill, so the page stops before
+    it; behind an older row the gap is a rolled-back transaction and is
+    stepped over.
+    """
+    rows = db.session.query(EventChange.seq, EventChange.event_id, EventChange.kind, EventChange.changed_at)\
+                     .filter(EventChange.seq > since)\
+                     .order_by(EventChange.seq.asc())\
+                     .limit(limit + 1)\
+                     .all()
+
+    settled = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    watermark = since
+    changes = []
+    for seq, event_id, kind, changed_at in rows[:limit]:
+        if seq != watermark + 1 and changed_at > settled:
+            break
+        changes.append((seq, event_id, kind))
+        watermark = seq
+
+    return changes, watermark, len(changes) == limit and len(rows) > limit
+
+
+def prune_event_changes(older_than):
+    """
+    Drop log rows older than `older_than`, always keeping the newest so an
+    idle client's watermark still matches a row. Returns the number deleted.
+    """
+    cutoff = datetime.utcnow() - older_than
+    deleted = EventChange.query.filter(EventChange.changed_at < cutoff, EventChange.seq < _newest_seq())\
+                               .delete(synchronize_session=False)
+    db.session.commit()
+    if deleted:
+        logger.info("Pruned event changes", extra={'count': deleted})
+    return deleted
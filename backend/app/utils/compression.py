@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript'}
+
+# WSGI environ flag for responses consumed in-process (/api/batch sub-requests) - nobody revalidates them
+SKIP_ETAG = 'clustr.skip_etag'
+
+
+def no_etag(view):
+    """Mark a view whose responses are never revalidated, so they are not hashed for an ETag"""
+    view.no_etag = True
+    return view
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), so an unchanged feed is compressed once"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def choose_encoding(accept_encoding):
+    """Best encoding the client accepts: br when brotli is installed, then gzip"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+
+    wildcard = accepted.get('*', 0)
+    for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def init_compression(app):
+    """
+    Compress JSON/text responses according to Accept-Encoding.
+
+    Successful GET responses also get a content-hash ETag: a matching
+    If-None-Match becomes a bodiless 304, and compressed bodies are cached
+    by ETag so a repeated feed page isn't compressed again. Views marked
+    @no_etag, no-store responses and batch sub-requests skip the hash.
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+    cache = CompressedBodyCache(app.config.get('COMPRESS_CACHE_ENTRIES', 256))
+
+    def wants_etag(response):
+        if request.method != 'GET' or response.cache_control.no_store or request.environ.get(SKIP_ETAG):
+            return False
+        return not getattr(app.view_functions.get(request.endpoint), 'no_etag', False)
+
+    def compress(body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=brotli_quality)
+        return gzip.compress(body, compresslevel=gzip_level)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        body = response.get_data()
+        etag = None
+        if wants_etag(response):
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            response.set_etag(etag, weak=True)
+            if request.if_none_match.contains_weak(etag):
+                return response.make_conditional(request)
+
+        if len(body) < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        compressed = cache.get((etag, encoding)) if etag else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if etag:
+                cache.put((etag, encoding), compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,206 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_KEY = 'replica'
+UPSERT_DIALECTS = {'sqlite': sqlite, 'postgresql': postgresql}  # Dialects with INSERT ... ON CONFLICT
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads from routes marked with @replica_reads to the
+    replica engine when one is configured. Once the session writes anything,
+    every later query in it goes to the primary so a request reads its own writes,
+    and a committed write keeps the user's reads there for REPLICA_STICKY_SECONDS.
+    """
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._has_written = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+        engines = self._db.engines
+        if bind is not None or REPLICA_BIND_KEY not in engines or engine is not engines.get(None):
+            return engine
+
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self._has_written = True
+
+        if self._has_written or not (has_request_context() and g.get('use_replica')):
+            return engine
+
+        return engines[REPLICA_BIND_KEY]
+
+    def commit(self):
+        super().commit()
+        if self._has_written and has_request_context():
+            user_id = _request_user(verify=False)
+            if user_id is not None:
+                recent_writers().add(user_id)
+
+    def close(self):
+        super().close()
+        self._has_written = False
+
+
+class RecentWriters:
+    """
+    Users who committed a write in the last `window` seconds - their reads
+    stay on the primary until the replica has caught up. Per process: behind
+    several workers a read that lands on another worker can still see the
+    replica's lag, so balance users onto workers stickily when that matters.
+    """
+
+    def __init__(self, window, max_users=100000):
+        self.window = window
+        self.max_users = max_users
+        self._deadlines = OrderedDict()  # user_id -> when their reads may use the replica again
+        self._lock = threading.Lock()
+
+    def add(self, user_id):
+        with self._lock:
+            self._deadlines[user_id] = time.monotonic() + self.window
+            self._deadlines.move_to_end(user_id)
+            while len(self._deadlines) > self.max_users:
+                self._deadlines.popitem(last=False)
+
+    def __contains__(self, user_id):
+        with self._lock:
+            self._expire()
+            return user_id in self._deadlines
+
+    def __bool__(self):
+        with self._lock:
+            self._expire()
+            return bool(self._deadlines)
+
+    def _expire(self):
+        # Same window for everyone, so the oldest deadline is always first
+        now = time.monotonic()
+        while self._deadlines and next(iter(self._deadlines.values())) <= now:
+            self._deadlines.popitem(last=False)
+
+
+def recent_writers():
+    writers = current_app.extensions.get('recent_writers')
+    if writers is None:
+        writers = current_app.extensions.setdefault('recent_writers', RecentWriters(
+            current_app.config.get('REPLICA_STICKY_SECONDS', 5.0)))
+    return writers
+
+
+def _request_user(verify=True):
+    """JWT identity of the current request, reading an optional token on public routes when `verify`"""
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        if not verify:
+            return None
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None  # A bad token is the route's business, not the router's
+
+
+def replica_reads(f):
+    """Mark a route as safe to serve from the read replica"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        writers = recent_writers()
+        g.use_replica = not (writers and _request_user() in writers)
+        return f(*args, **kwargs)
+    return decorated
+
+
+def use_primary():
+    """Send the rest of this request's queries to the primary, e.g. before a get-or-create"""
+    g.use_replica = False
+
+
+def sqlite_pragmas(config):
+    """Build the PRAGMA statements applied to every new SQLite connection"""
+    return [
+        f"PRAGMA journal_mode={config.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 0))}",
+        f"PRAGMA cache_size={int(config.get('SQLITE_CACHE_SIZE', -2000))}",
+    ]
+
+
+def configure_engine(engine, config):
+    """
+    Apply connect-time settings to an engine.
+    Only SQLite needs anything - server databases are tuned through the pool options.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def check_cooperative_driver(engine, async_mode):
+    """
+    Under gevent/eventlet a database call that blocks in C stalls every
+    connection on the worker. psycopg2 is fine once psycogreen has installed
+    its wait callback (serve.py does this); SQLite can't be made cooperative.
+    """
+    if async_mode not in ('gevent', 'eventlet'):
+        return
+
+    if engine.dialect.name == 'sqlite':
+        logger.warning("SQLite blocks the event loop in async mode - use PostgreSQL in production",
+                       extra={'async_mode': async_mode})
+    elif engine.dialect.driver == 'psycopg2':
+        import psycopg2.extensions
+        if psycopg2.extensions.get_wait_callback() is None:
+            logger.warning("psycopg2 is not patched for cooperative I/O - start the app from serve.py",
+                           extra={'async_mode': async_mode})
+
+
+def upsert_increment(model, keys, increments, executor=None):
+    """
+    Add `increments` ({column: amount}) to the row of `model` identified by
+    `keys`, creating it if missing. Runs in the caller's transaction - the
+    session's, or `executor`'s when a connection is passed.
+    """
+    from app import db
+
+    executor = executor if executor is not None else db.session
+    dialect = UPSERT_DIALECTS.get(db.engine.dialect.name)
+    table = model.__table__
+
+    if dialect is not None:
+        stmt = dialect.insert(table).values(**keys, **increments)
+        executor.execute(stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + amount for column, amount in increments.items()},
+        ))
+        return
+
+    updated = executor.execute(
+        update(table).where(*(table.c[column] == value for column, value in keys.items()))
+                     .values({column: table.c[column] + amount for column, amount in increments.items()})
+    )
+    if updated.rowcount == 0:
+        executor.execute(insert(table).values(**keys, **increments))
@@ -0,0 +1,61 @@
+"""
+Per-process cache for GET /api/events/<id>.
+
+Entries are stamped with the event's updated_at, which join and leave
+bump, and a lookup only hits when the stamp still matches - so a join
+in another worker process is never served stale. join_event and
+leave_event also drop the event's entries here straight away. Anything
+that does not touch the event row (a new avatar, a new rating) shows up
+within EVENT_DETAIL_CACHE_SECONDS.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class EventDetailCache:
+    """LRU of event_id -> {page key: (version, expires, value)}"""
+
+    def __init__(self, max_events, ttl_seconds):
+        self.max_events = max_events
+        self.ttl_seconds = ttl_seconds
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, event_id, key, version):
+        with self._lock:
+            pages = self._events.get(event_id)
+            entry = pages.get(key) if pages else None
+            if entry is None:
+                return None
+            if entry[0] != version or entry[1] <= time.monotonic():
+                del pages[key]
+                return None
+            self._events.move_to_end(event_id)
+            return entry[2]
+
+    def put(self, event_id, key, version, value):
+        with self._lock:
+            pages = self._events.setdefault(event_id, {})
+            pages[key] = (version, time.monotonic() + self.ttl_seconds, value)
+            self._events.move_to_end(event_id)
+            while len(self._events) > self.max_events:
+                self._events.popitem(last=False)
+
+    def invalidate(self, event_id):
+        with self._lock:
+            self._events.pop(event_id, None)
+
+
+def event_detail_cache():
+    cache = current_app.extensions.get('event_detail_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('event_detail_cache', EventDetailCache(
+            current_app.config['EVENT_DETAIL_CACHE_EVENTS'], current_app.config['EVENT_DETAIL_CACHE_SECONDS']))
+    return cache
+
+
+def invalidate_event_detail(event_id):
+    event_detail_cache().invalidate(event_id)
@@ -1,8 +1,9 @@
-import requests
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
 from flask import current_app
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 class GoogleOAuth:
     @staticmethod
@@ -10,6 +11,10 @@ class GoogleOAuth:
         """
         Verify Google ID token and return user info
         """
+        # Imported here - google-auth and requests are slow to import and most workers never need them
+        from google.auth.transport import requests as google_requests
+        from google.oauth2 import id_token
+        
         try:
             # Try both client IDs (web and android)
             valid_client_ids = [
@@ -42,10 +47,10 @@ class GoogleOAuth:
             return user_info
             
         except ValueError as e:
-            print(f"Google token verification failed: {str(e)}")
+            logger.warning("Google token verification failed: %s", e)
             return None
         except Exception as e:
-            print(f"Google OAuth error: {str(e)}")
+            logger.exception("Google OAuth error")
             return None
     
     @staticmethod
@@ -54,6 +59,8 @@ class GoogleOAuth:
         Get user info from Google using access token
         Alternative method if ID token verification doesn't work
         """
+        import requests
+        
         try:
             response = requests.get(
                 'https://www.googleapis.com/oauth2/v2/userinfo',
@@ -63,9 +70,9 @@ class GoogleOAuth:
             if response.status_code == 200:
                 return response.json()
             else:
-                print(f"Google API error: {response.status_code}")
+                logger.warning("Google API error: %s", response.status_code)
                 return None
                 
         except Exception as e:
-            print(f"Google user info error: {str(e)}")
+            logger.exception("Google user info error")
             return None
@@ -0,0 +1,230 @@
+"""
+Idempotency-Key support for retried POSTs.
+
+A client sends the same Idempotency-Key on every retry of one logical
+request. The first request runs the view; its response (anything but a
+5xx or 429) is kept for IDEMPOTENCY_TTL_HOURS, and later requests with
+the key get that response back without running the view again, marked
+with an Idempotent-Replayed header.
+
+Finished responses live in the idempotency_keys table, with a
+per-process LRU in front so a replay usually costs no query. The table
+row is claimed before the view runs: a duplicate arriving while the
+first is still running waits for its response - on a threading.Event in
+the same process, by polling the row across processes - instead of
+running twice. A claim left behind by a crashed process is taken over
+after IDEMPOTENCY_LOCK_SECONDS.
+
+    @jwt_required()
+    @idempotent
+    @validate(body=NewMessage)
+    def send_message(event_id, body):
+"""
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from functools import wraps
+import hashlib
+import logging
+import threading
+import time
+
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+StoredResponse = namedtuple('StoredResponse', 'fingerprint status_code body expires_at')
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries, ttl_seconds, lock_seconds, wait_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self._responses = OrderedDict()  # (user_id, key) -> StoredResponse
+        self._running = {}  # (user_id, key) -> threading.Event, set when the owner finishes
+        self._lock = threading.Lock()
+
+    def _cached(self, scope):
+        with self._lock:
+            stored = self._responses.get(scope)
+            if stored is None:
+                return None
+            if stored.expires_at <= datetime.utcnow():
+                del self._responses[scope]
+                return None
+            self._responses.move_to_end(scope)
+            return stored
+
+    def _remember(self, scope, stored):
+        with self._lock:
+            self._responses[scope] = stored
+            self._responses.move_to_end(scope)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+
+    def run(self, scope, fingerprint, view):
+        """The stored response for `scope`, or view()'s after running it once"""
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            stored = self._cached(scope)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+
+            with self._lock:
+                running = self._running.get(scope)
+                owner = running is None
+                if owner:
+                    running = self._running[scope] = threading.Event()
+            if not owner:
+                # Same key already running in this process - wait for its response
+                if not running.wait(max(0.0, deadline - time.monotonic())):
+                    return _busy()
+                continue
+
+            try:
+                return self._run_claimed(scope, fingerprint, view, deadline)
+            finally:
+                with self._lock:
+                    del self._running[scope]
+                running.set()
+
+    def _run_claimed(self, scope, fingerprint, view, deadline):
+        user_id, key = scope
+        while True:
+            now = datetime.utcnow()
+            db.session.add(IdempotencyKey(user_id=user_id, key=key, fingerprint=fingerprint, created_at=now,
+                                          expires_at=now + timedelta(seconds=self.ttl_seconds)))
+            try:
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+
+            row = db.session.query(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body,
+                                   IdempotencyKey.created_at, IdempotencyKey.expires_at)\
+                            .filter_by(user_id=user_id, key=key)\
+                            .first()
+            if row is None:
+                continue  # Released or pruned in between - claim again
+            if row.status_code is not None and row.expires_at > now:
+                stored = StoredResponse(row.fingerprint, row.status_code, row.body, row.expires_at)
+                self._remember(scope, stored)
+                return _replay(stored, fingerprint)
+            if row.status_code is not None or row.created_at < now - timedelta(seconds=self.lock_seconds):
+                # Expired response, or a claim abandoned by a crashed process - only one taker wins
+                taken = IdempotencyKey.query.filter_by(user_id=user_id, key=key, created_at=row.created_at)\
+                                            .update({'fingerprint': fingerprint, 'status_code': None, 'body': None,
+                                                     'created_at': now,
+                                                     'expires_at': now + timedelta(seconds=self.ttl_seconds)},
+                                                    synchronize_session=False)
+                db.session.commit()
+                if taken:
+                    break
+                continue
+            if row.fingerprint != fingerprint:
+                return _mismatch()
+            # Running in another process - wait for it to store its response
+            if time.monotonic() >= deadline:
+                return _busy()
+            time.sleep(0.05)
+
+        try:
+            response = make_response(view())
+        except Exception:
+            self._release(scope)
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429:
+            # Worth retrying - free the key rather than replaying the failure
+            self._release(scope)
+            return response
+
+        body = response.get_data()
+        try:
+            IdempotencyKey.query.filter_by(user_id=user_id, key=key)\
+                                .update({'status_code': response.status_code, 'body': body},
+                                        synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to store idempotent response", extra={'key': key})
+            return response
+        self._remember(scope, StoredResponse(fingerprint, response.status_code, body,
+                                             datetime.utcnow() + timedelta(seconds=self.ttl_seconds)))
+        return response
+
+    def _release(self, scope):
+        user_id, key = scope
+        try:
+            db.session.rollback()
+            IdempotencyKey.query.filter_by(user_id=user_id, key=key, status_code=None)\
+                                .delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to release idempotency key", extra={'key': key})
+
+
+def _replay(stored, fingerprint):
+    if stored.fingerprint != fingerprint:
+        return _mismatch()
+    response = current_app.response_class(stored.body, status=stored.status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _mismatch():
+    return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+
+
+def _busy():
+    return jsonify({'error': f'A request with this {HEADER} is still in progress'}), 409
+
+
+def _fingerprint():
+    digest = hashlib.sha256(f'{request.method} {request.full_path}\n'.encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def idempotency_store():
+    store = current_app.extensions.get('idempotency')
+    if store is None:
+        config = current_app.config
+        store = current_app.extensions.setdefault('idempotency', IdempotencyStore(
+            config['IDEMPOTENCY_CACHE_ENTRIES'], config['IDEMPOTENCY_TTL_HOURS'] * 3600,
+            config['IDEMPOTENCY_LOCK_SECONDS'], config['IDEMPOTENCY_WAIT_SECONDS']))
+    return store
+
+
+def idempotent(view):
+    """Honour an Idempotency-Key header on this view. Goes below @jwt_required, so keys are per user."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+        scope = (get_jwt_identity() or '', key)
+        return idempotency_store().run(scope, _fingerprint(), lambda: view(*args, **kwargs))
+    return wrapper
+
+
+def prune_idempotency_keys():
+    """Drop stored responses past their expiry. Returns the number deleted."""
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow())\
+                                  .delete(synchronize_session=False)
+    db.session.commit()
+    if deleted:
+        logger.info("Pruned idempotency keys", extra={'count': deleted})
+    return deleted
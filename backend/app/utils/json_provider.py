@@ -0,0 +1,82 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional - the stdlib provider below is used instead
+    orjson = None
+
+
+def _default(o):
+    """Types neither encoder handles natively. Dates are ISO 8601, like Model.to_dict."""
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(JSONProvider):
+    """Compact json-module provider, used when orjson isn't installed"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('separators', (',', ':'))
+        kwargs.setdefault('ensure_ascii', False)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps(obj).encode('utf-8'), mimetype=self.mimetype)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    orjson-backed provider. Serializes datetimes natively and writes the
+    response body straight from the bytes orjson returns.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # Options only the json module understands (indent, sort_keys...)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS), mimetype=self.mimetype
+        )
+
+
+def make_json_provider(app):
+    """Pick the fastest available provider unless JSON_PROVIDER forces one"""
+    choice = app.config.get('JSON_PROVIDER', 'auto')
+    if choice not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f"JSON_PROVIDER must be auto, orjson or stdlib (got {choice!r})")
+    if choice == 'orjson' and orjson is None:
+        # Fail at startup rather than on the first response
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed - pip install orjson or use auto")
+    if choice == 'orjson' or (choice == 'auto' and orjson is not None):
+        return OrjsonProvider(app)
+    return StdlibJSONProvider(app)
@@ -0,0 +1,113 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+# Attributes every LogRecord has - anything else was passed through `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra` fields merged in"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Tag records with the current request ID and sample DEBUG records.
+    Runs on the request thread, so it only does cheap attribute work.
+    """
+
+    def __init__(self, debug_sample_rate=1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0:
+            if random.random() >= self.debug_sample_rate:
+                return False
+        if has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands the record over untouched. The stock prepare()
+    formats the message on the calling thread; here all formatting and I/O
+    happens on the listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def init_logging(app):
+    """
+    Route the `app` logger hierarchy through a queue drained by a background
+    listener, apply per-module levels from config and tag requests with an ID
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter(app.config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)))
+
+    app_logger = logging.getLogger('app')
+    app_logger.handlers = [queue_handler]
+    app_logger.propagate = False
+    app_logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+
+    for name, level in app.config.get('LOG_LEVELS', {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    @app.after_request
+    def return_request_id(response):
+        if g.get('request_id'):
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+
+@atexit.register
+def _stop_listener():
+    # Flush whatever is still queued on interpreter shutdown
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,192 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import Response, g, has_request_context, jsonify, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import event
+
+from app.utils.compression import no_etag
+
+# Upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket and made cumulative on export"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    In-process metrics registry for one worker.
+    Every update is a dict lookup and a few additions under one lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency = {}   # (endpoint, method, status) -> Histogram
+        self.sql_queries = {}       # endpoint -> count
+        self.sql_seconds = {}       # endpoint -> seconds
+        self.socket_events = {}     # (event, direction) -> count
+        self.sockets_connected = 0
+
+    def observe_request(self, endpoint, method, status, seconds, sql_count, sql_seconds):
+        key = (endpoint, method, status)
+        with self._lock:
+            histogram = self.request_latency.get(key)
+            if histogram is None:
+                histogram = self.request_latency[key] = Histogram()
+            histogram.observe(seconds)
+            if sql_count:
+                self.sql_queries[endpoint] = self.sql_queries.get(endpoint, 0) + sql_count
+                self.sql_seconds[endpoint] = self.sql_seconds.get(endpoint, 0.0) + sql_seconds
+
+    def count_socket_event(self, name, direction='in'):
+        key = (name, direction)
+        with self._lock:
+            self.socket_events[key] = self.socket_events.get(key, 0) + 1
+
+    def socket_connected(self):
+        with self._lock:
+            self.sockets_connected += 1
+
+    def socket_disconnected(self):
+        with self._lock:
+            self.sockets_connected = max(0, self.sockets_connected - 1)
+
+    def render(self):
+        """Export everything in the Prometheus text exposition format"""
+        with self._lock:
+            latency = {key: (list(h.counts), h.sum, h.count) for key, h in self.request_latency.items()}
+            sql_queries = dict(self.sql_queries)
+            sql_seconds = dict(self.sql_seconds)
+            socket_events = dict(self.socket_events)
+            sockets_connected = self.sockets_connected
+
+        lines = [
+            '# HELP clustr_http_request_duration_seconds HTTP request latency by endpoint and status',
+            '# TYPE clustr_http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method, status), (counts, total, count) in sorted(latency.items()):
+            labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'clustr_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'clustr_http_request_duration_seconds_sum{{{labels}}} {total}')
+            lines.append(f'clustr_http_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            '# HELP clustr_sql_queries_total SQL statements executed while serving each endpoint',
+            '# TYPE clustr_sql_queries_total counter',
+        ]
+        lines += [f'clustr_sql_queries_total{{endpoint="{e}"}} {n}' for e, n in sorted(sql_queries.items())]
+        lines += [
+            '# HELP clustr_sql_duration_seconds_total Time spent in SQL statements for each endpoint',
+            '# TYPE clustr_sql_duration_seconds_total counter',
+        ]
+        lines += [f'clustr_sql_duration_seconds_total{{endpoint="{e}"}} {s}' for e, s in sorted(sql_seconds.items())]
+
+        lines += [
+            '# HELP clustr_socketio_events_total Socket.IO events received (in) and emitted (out)',
+            '# TYPE clustr_socketio_events_total counter',
+        ]
+        lines += [
+            f'clustr_socketio_events_total{{event="{name}",direction="{direction}"}} {n}'
+            for (name, direction), n in sorted(socket_events.items())
+        ]
+        lines += [
+            '# HELP clustr_socketio_connected Currently connected Socket.IO clients',
+            '# TYPE clustr_socketio_connected gauge',
+            f'clustr_socketio_connected {sockets_connected}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def track_socket_event(f):
+    """Count calls to a Socket.IO handler under the event name it was registered for"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        metrics.count_socket_event(request.event['message'])
+        return f(*args, **kwargs)
+    return decorated
+
+
+def _instrument_engine(engine):
+    # The start time lives on the statement's execution context, so a statement that
+    # raises leaves nothing behind on the pooled connection
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_query_start
+        if has_request_context():
+            g.sql_count = g.get('sql_count', 0) + 1
+            g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+
+
+def init_metrics(app, engines):
+    """Hook request timing and SQL counting into the app and expose /metrics"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    for engine in engines:
+        _instrument_engine(engine)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('request_start')
+        if start is not None:
+            metrics.observe_request(
+                request.endpoint or 'unmatched',
+                request.method,
+                response.status_code,
+                time.perf_counter() - start,
+                g.get('sql_count', 0),
+                g.get('sql_seconds', 0.0),
+            )
+        return response
+
+    token = app.config.get('METRICS_TOKEN')
+
+    @app.route('/metrics')
+    @no_etag
+    def prometheus_metrics():
+        if not _scrape_allowed(token):
+            return jsonify({'error': 'Metrics token or admin access required'}), 401
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _scrape_allowed(token):
+    """METRICS_TOKEN as the bearer token, or an admin's access token"""
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if token and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+        return True
+    try:
+        verify_jwt_in_request()
+    except Exception:  # Missing, malformed, expired or revoked - all the same here
+        return False
+    return get_jwt().get('role') == 'admin'
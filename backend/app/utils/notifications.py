@@ -0,0 +1,205 @@
+"""
+Notification outbox.
+
+Route handlers call notify() before they commit, so a notification row
+exists exactly when the change that caused it does, and the request never
+waits on delivery. OutboxWorker.drain runs on the scheduler: it leases the
+due rows of a batch of users, coalesces each user's rows into one digest
+and hands the digests to the transport on a thread pool. Delivered rows
+are deleted; failed ones are retried with exponential backoff.
+"""
+import importlib
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import db
+from app.models import User, Event, Notification
+
+logger = logging.getLogger(__name__)
+
+
+def notify(user_ids, kind, payload, delay_seconds=None):
+    """
+    Queue a `kind` notification for each user in the current transaction -
+    the caller's commit makes it durable. Delivery waits delay_seconds
+    (NOTIFICATIONS_COALESCE_SECONDS by default) so bursts end up in one digest.
+    """
+    if delay_seconds is None:
+        delay_seconds = current_app.config['NOTIFICATIONS_COALESCE_SECONDS']
+    deliver_after = datetime.utcnow() + timedelta(seconds=delay_seconds)
+    db.session.add_all([
+        Notification(user_id=user_id, kind=kind, payload=payload, deliver_after=deliver_after)
+        for user_id in dict.fromkeys(user_ids)
+    ])
+
+
+def queue_event_reminders(lead=timedelta(hours=1)):
+    """Queue a reminder for every attendee of events starting within `lead`. Returns the number of events."""
+    now = datetime.utcnow()
+    events = Event.query.filter(Event.event_date >= now,
+                                Event.event_date <= now + lead,
+                                Event.reminders_queued_at.is_(None)).all()
+    for event in events:
+        notify(event.attendees or [], 'event_reminder', {
+            'event_id': event.id,
+            'title': event.title,
+            'event_date': event.event_date.isoformat(),
+        }, delay_seconds=0)
+        event.reminders_queued_at = now
+    db.session.commit()
+    return len(events)
+
+
+def build_digest(user, notifications):
+    """One message for all of a user's pending notifications - chat messages collapse per event"""
+    lines = []
+    chat_counts = defaultdict(int)
+    chat_titles = {}
+    for n in notifications:
+        payload = n.payload or {}
+        if n.kind == 'chat_message':
+            chat_counts[payload.get('event_id')] += 1
+            chat_titles[payload.get('event_id')] = payload.get('title')
+        elif n.kind == 'event_joined':
+            lines.append(f"{payload.get('username')} joined {payload.get('title')}")
+        elif n.kind == 'waitlist_promoted':
+            lines.append(f"A spot opened up - you're now going to {payload.get('title')}")
+        elif n.kind == 'event_reminder':
+            lines.append(f"Starting soon: {payload.get('title')} at {payload.get('event_date')}")
+        else:
+            lines.append(n.kind)
+    for event_id, count in chat_counts.items():
+        noun = 'message' if count == 1 else 'messages'
+        lines.append(f"{count} new {noun} in {chat_titles[event_id]}")
+
+    return {
+        'user_id': user.id,
+        'email': user.email,
+        'subject': lines[0] if len(lines) == 1 else f"{len(lines)} updates on Clustr",
+        'lines': lines,
+        'count': len(notifications),
+    }
+
+
+class LogTransport:
+    """Stand-in transport that logs each digest"""
+
+    def send(self, digest):
+        logger.info("Notification digest", extra={
+            'user_id': digest['user_id'],
+            'subject': digest['subject'],
+            'count': digest['count'],
+        })
+
+
+class FileTransport:
+    """Appends each digest to a JSON-lines file - for local development"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, digest):
+        line = json.dumps(digest, default=str)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line + '\n')
+
+
+def make_transport(app):
+    """NOTIFICATIONS_TRANSPORT: 'log', 'file', or 'package.module:factory' called with the app"""
+    name = app.config['NOTIFICATIONS_TRANSPORT']
+    if name == 'log':
+        return LogTransport()
+    if name == 'file':
+        return FileTransport(app.config['NOTIFICATIONS_FILE'])
+    module_name, attr = name.split(':')
+    return getattr(importlib.import_module(module_name), attr)(app)
+
+
+class OutboxWorker:
+    """Drains notification_outbox; safe to run in several processes at once thanks to the row leases"""
+
+    def __init__(self, app, transport=None):
+        self.transport = transport or make_transport(app)
+        self.batch_size = app.config['NOTIFICATIONS_BATCH_SIZE']
+        self.max_attempts = app.config['NOTIFICATIONS_MAX_ATTEMPTS']
+        self.retry_seconds = app.config['NOTIFICATIONS_RETRY_SECONDS']
+        self.lease = timedelta(seconds=app.config['NOTIFICATIONS_LEASE_SECONDS'])
+        self.pool = ThreadPoolExecutor(max_workers=app.config['NOTIFICATIONS_WORKERS'],
+                                       thread_name_prefix='notifications')
+
+    def drain(self):
+        """Deliver batches until nothing is due. Returns the number of notifications delivered."""
+        delivered = 0
+        while True:
+            count = self._drain_batch()
+            if count is None:
+                return delivered
+            delivered += count
+
+    def _drain_batch(self):
+        now = datetime.utcnow()
+        claimable = db.and_(Notification.deliver_after <= now,
+                            db.or_(Notification.claimed_until.is_(None), Notification.claimed_until < now))
+
+        user_ids = list(dict.fromkeys(row[0] for row in db.session.query(Notification.user_id)
+                                                                  .filter(claimable)
+                                                                  .order_by(Notification.deliver_after.asc())
+                                                                  .limit(self.batch_size)))
+        if not user_ids:
+            return None
+
+        # Lease every due row of these users, so each gets a single digest
+        token = str(uuid.uuid4())
+        Notification.query.filter(Notification.user_id.in_(user_ids), claimable)\
+                          .update({'claimed_by': token, 'claimed_until': now + self.lease},
+                                  synchronize_session=False)
+        db.session.commit()
+
+        rows = Notification.query.filter(Notification.user_id.in_(user_ids), Notification.claimed_by == token).all()
+        by_user = defaultdict(list)
+        for row in sorted(rows, key=lambda row: row.id):
+            by_user[row.user_id].append(row)
+        users = {user.id: user for user in User.query.filter(User.id.in_(list(by_user)))}
+
+        # Deleted users have nobody to notify - their rows are simply dropped
+        done = [row for user_id, user_rows in by_user.items() if user_id not in users for row in user_rows]
+        failed = []
+        futures = {
+            self.pool.submit(self.transport.send, build_digest(users[user_id], user_rows)): user_rows
+            for user_id, user_rows in by_user.items() if user_id in users
+        }
+        for future, user_rows in futures.items():
+            try:
+                future.result()
+                done.extend(user_rows)
+            except Exception:
+                logger.exception("Notification delivery failed", extra={'user_id': user_rows[0].user_id})
+                failed.extend(user_rows)
+
+        if done:
+            Notification.query.filter(Notification.id.in_([row.id for row in done]))\
+                              .delete(synchronize_session=False)
+        for row in failed:
+            row.attempts += 1
+            if row.attempts >= self.max_attempts:
+                logger.error("Dropping notification after repeated failures",
+                             extra={'user_id': row.user_id, 'kind': row.kind, 'attempts': row.attempts})
+                db.session.delete(row)
+            else:
+                row.deliver_after = now + timedelta(seconds=self.retry_seconds * 2 ** (row.attempts - 1))
+                row.claimed_by = None
+                row.claimed_until = None
+        db.session.commit()
+
+        delivered = len(rows) - len(failed)
+        logger.debug("Drained notification batch", extra={'users': len(by_user), 'delivered': delivered,
+                                                          'failed': len(failed)})
+        return delivered
@@ -0,0 +1,30 @@
+"""
+Opaque keyset cursors.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64'd. The next page filters past it, so it costs the same whether it
+is the 2nd page or the 2000th - unlike OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values):
+    """Cursor for a row's sort key, e.g. encode_cursor(created_at, id)"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, *types):
+    """Values from encode_cursor, converted with `types` (datetime is parsed from ISO 8601). ValueError if malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError('Invalid cursor')
+    try:
+        return tuple(datetime.fromisoformat(v) if t is datetime else t(v) for v, t in zip(values, types))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
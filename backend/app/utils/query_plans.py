@@ -0,0 +1,176 @@
+"""
+EXPLAIN QUERY PLAN checks for the hot queries.
+
+A plan fails when SQLite would read a whole table (a bare `SCAN <table>`)
+or sort rows in a temp b-tree instead of walking an index.
+
+tests/test_query_plans.py records the statements the hot endpoints and
+scheduled jobs really run and checks each one. `flask check-query-plans`
+checks the hot query shapes below against a migrated database, catching
+an index a migration forgot; it exits non-zero on any regression, so it
+can gate CI.
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+from sqlalchemy import event
+
+from app import db
+from app.models import (User, Event, EventAttendee, EventChange, WaitlistEntry, ChatRoom, Message, RevokedToken,
+                        IdempotencyKey, Notification, AnalyticsCounter, Review, RatingAggregate)
+from app.utils.serializers import EVENT_COLUMNS, EVENT_SUMMARY_COLUMNS, PROFILE_COLUMNS, message_rows
+
+_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+_TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+_PLANNED = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+PLACEHOLDER_ID = '00000000-0000-0000-0000-000000000000'
+
+
+def _hot_queries():
+    now = datetime.utcnow()
+    return {
+        'feed page': Event.query.filter(Event.event_date >= now).order_by(Event.event_date.asc())
+                     .with_entities(*EVENT_COLUMNS).limit(50),
+        'feed count': Event.query.filter(Event.event_date >= now).with_entities(db.func.count(Event.id)),
+        'archive batch': db.session.query(Event.id).filter(Event.event_date < now)
+                         .order_by(Event.event_date.asc()).limit(500),
+        'archive messages': Message.query.filter(Message.chat_room_id.in_([PLACEHOLDER_ID])),
+        'events by host': Event.query.filter_by(created_by=PLACEHOLDER_ID).order_by(Event.event_date.asc()),
+        'my events attending': db.session.query(*EVENT_SUMMARY_COLUMNS).select_from(EventAttendee)
+                               .join(Event, Event.id == EventAttendee.event_id)
+                               .filter(EventAttendee.user_id == PLACEHOLDER_ID, EventAttendee.event_date >= now,
+                                       db.tuple_(EventAttendee.event_date, EventAttendee.event_id) > (now, PLACEHOLDER_ID))
+                               .order_by(EventAttendee.event_date.asc(), EventAttendee.event_id.asc()).limit(21),
+        'my events hosting': db.session.query(*EVENT_SUMMARY_COLUMNS)
+                             .filter(Event.created_by == PLACEHOLDER_ID, Event.event_date >= now,
+                                     db.tuple_(Event.event_date, Event.id) > (now, PLACEHOLDER_ID))
+                             .order_by(Event.event_date.asc(), Event.id.asc()).limit(21),
+        'archive attendees': db.session.query(EventAttendee.user_id)
+                             .filter(EventAttendee.event_id.in_([PLACEHOLDER_ID])),
+        'changes page': db.session.query(EventChange.seq, EventChange.event_id, EventChange.kind,
+                                         EventChange.changed_at)
+                        .filter(EventChange.seq > 0).order_by(EventChange.seq.asc()).limit(501),
+        'changed events': db.session.query(*EVENT_COLUMNS).filter(Event.id.in_([PLACEHOLDER_ID])),
+        'change watermark': db.session.query(db.func.max(EventChange.seq)),
+        'change watermark fresh': db.session.query(db.func.min(EventChange.seq)).filter(EventChange.changed_at > now),
+        'change watermark base': db.session.query(db.func.max(EventChange.seq)).filter(EventChange.seq < 1),
+        'changes prune': EventChange.query.filter(EventChange.changed_at < now, EventChange.seq < 0),
+        'waitlist head': WaitlistEntry.query.filter_by(event_id=PLACEHOLDER_ID)
+                         .order_by(WaitlistEntry.position.asc()).limit(1),
+        'waitlist entry': db.session.query(WaitlistEntry.position)
+                          .filter_by(event_id=PLACEHOLDER_ID, user_id=PLACEHOLDER_ID),
+        'waitlist rank': db.session.query(db.func.count()).select_from(WaitlistEntry)
+                         .filter(WaitlistEntry.event_id == PLACEHOLDER_ID, WaitlistEntry.position <= 1),
+        'archive waitlist': WaitlistEntry.query.filter(WaitlistEntry.event_id.in_([PLACEHOLDER_ID])),
+        'event by id': Event.query.filter_by(id=PLACEHOLDER_ID),
+        'event detail': db.session.query(*EVENT_COLUMNS, *PROFILE_COLUMNS, ChatRoom.id)
+                        .outerjoin(User, User.id == Event.created_by)
+                        .outerjoin(ChatRoom, ChatRoom.event_id == Event.id).filter(Event.id == PLACEHOLDER_ID),
+        'event attendees page': db.session.query(*PROFILE_COLUMNS).select_from(EventAttendee)
+                                .join(User, User.id == EventAttendee.user_id)
+                                .filter(EventAttendee.event_id == PLACEHOLDER_ID,
+                                        EventAttendee.user_id > PLACEHOLDER_ID)
+                                .order_by(EventAttendee.user_id.asc()).limit(51),
+        'chat room by event': ChatRoom.query.filter_by(event_id=PLACEHOLDER_ID).limit(1),
+        'chat history page': message_rows(Message.query.filter_by(chat_room_id=PLACEHOLDER_ID))
+                             .order_by(Message.created_at.desc()).limit(50),
+        'chat history count': Message.query.filter_by(chat_room_id=PLACEHOLDER_ID)
+                              .with_entities(db.func.count(Message.id)),
+        'user by email': User.query.filter_by(email='someone@example.com').limit(1),
+        'revocation sync': db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at,
+                                            RevokedToken.created_at)
+                           .filter(RevokedToken.id > 0).order_by(RevokedToken.id.asc()),
+        'idempotency key': db.session.query(IdempotencyKey.fingerprint, IdempotencyKey.status_code,
+                                            IdempotencyKey.body, IdempotencyKey.created_at, IdempotencyKey.expires_at)
+                           .filter_by(user_id=PLACEHOLDER_ID, key='key').limit(1),
+        'idempotency prune': IdempotencyKey.query.filter(IdempotencyKey.expires_at < now),
+        'reminder window': Event.query.filter(Event.event_date >= now, Event.event_date <= now,
+                                              Event.reminders_queued_at.is_(None)),
+        'outbox due users': db.session.query(Notification.user_id)
+                            .filter(Notification.deliver_after <= now,
+                                    db.or_(Notification.claimed_until.is_(None), Notification.claimed_until < now))
+                            .order_by(Notification.deliver_after.asc()).limit(200),
+        'outbox claimed rows': Notification.query.filter(Notification.user_id.in_([PLACEHOLDER_ID]),
+                                                         Notification.claimed_by == PLACEHOLDER_ID),
+        'dashboard days': AnalyticsCounter.query.filter(AnalyticsCounter.metric.in_(['joins', 'leaves']),
+                                                        AnalyticsCounter.period >= '2026-01-01',
+                                                        AnalyticsCounter.period <= '2026-01-31'),
+        'busiest rooms': db.session.query(AnalyticsCounter.key, AnalyticsCounter.value)
+                         .filter(AnalyticsCounter.metric == 'messages', AnalyticsCounter.period == 'all')
+                         .order_by(AnalyticsCounter.value.desc()).limit(20),
+        'reviews page': Review.query.filter(Review.event_id == PLACEHOLDER_ID,
+                                            db.tuple_(Review.created_at, Review.id) < (now, PLACEHOLDER_ID))
+                        .order_by(Review.created_at.desc(), Review.id.desc()).limit(21),
+        'feed ratings': RatingAggregate.query.filter(db.or_(
+                            db.and_(RatingAggregate.subject_type == 'event',
+                                    RatingAggregate.subject_id.in_([PLACEHOLDER_ID])),
+                            db.and_(RatingAggregate.subject_type == 'organizer',
+                                    RatingAggregate.subject_id.in_([PLACEHOLDER_ID])))),
+    }
+
+
+def explain(query):
+    """SQLite's EXPLAIN QUERY PLAN detail lines for an ORM query"""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = [compiled.params[name] for name in compiled.positiontup]
+    params = [p.isoformat(' ') if isinstance(p, datetime) else p for p in params]
+    return explain_statement(compiled.string, tuple(params))
+
+
+def explain_statement(statement, parameters=()):
+    """EXPLAIN QUERY PLAN detail lines for raw SQL, e.g. a statement caught by record_statements()"""
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan):
+    """The plan lines that read a whole table or sort without an index"""
+    return [line for line in plan if _FULL_SCAN.match(line) or _TEMP_SORT in line]
+
+
+@contextmanager
+def record_statements(engine):
+    """(statement, parameters) of every SELECT, UPDATE and DELETE run on `engine` inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and _PLANNED.match(statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def check_query_plans():
+    """Return {query name: (plan lines, problems)} for every hot query"""
+    results = {}
+    for name, query in _hot_queries().items():
+        plan = explain(query)
+        results[name] = (plan, plan_problems(plan))
+    return results
+
+
+def register_commands(app):
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Fail if any hot query falls back to a full table scan"""
+        if db.engine.dialect.name != 'sqlite':
+            # A gate that passes without checking anything is worse than none - point it at a SQLite copy
+            raise click.ClickException(f'Query plan checks only support SQLite (got {db.engine.dialect.name}), '
+                                       f'run them with DATABASE_URL=sqlite:///... after flask db upgrade')
+
+        failed = False
+        for name, (plan, problems) in check_query_plans().items():
+            click.echo(f"{'FAIL' if problems else 'ok  '} {name}")
+            for line in plan:
+                click.echo(f"       {line}")
+            failed = failed or bool(problems)
+        if failed:
+            raise SystemExit(1)
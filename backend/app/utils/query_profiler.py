@@ -0,0 +1,146 @@
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _call_site():
+    """Innermost frame in our own code - the line that triggered the query"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+            return f"{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryRecorder:
+    """Statements executed during one request or one `record_queries` block"""
+
+    def __init__(self):
+        self.queries = []  # (statement, seconds, call_site)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def add(self, statement, seconds, call_site):
+        self.queries.append((statement, seconds, call_site))
+
+    def grouped(self):
+        """statement -> (count, total seconds, set of call sites)"""
+        groups = defaultdict(lambda: [0, 0.0, set()])
+        for statement, seconds, call_site in self.queries:
+            group = groups[statement]
+            group[0] += 1
+            group[1] += seconds
+            group[2].add(call_site)
+        return groups
+
+    def n_plus_one(self, threshold):
+        """Statements repeated at least `threshold` times - the usual lazy-load loop"""
+        return {stmt: group for stmt, group in self.grouped().items() if group[0] >= threshold}
+
+    def slow(self, threshold_seconds):
+        return [q for q in self.queries if q[1] >= threshold_seconds]
+
+    def report(self):
+        lines = [f"{len(self.queries)} queries:"]
+        for statement, (count, seconds, call_sites) in self.grouped().items():
+            lines.append(f"  {count}x {seconds * 1000:.1f}ms  {' '.join(statement.split())[:200]}")
+            for call_site in sorted(call_sites):
+                lines.append(f"      at {call_site}")
+        return '\n'.join(lines)
+
+
+def _attach(engine, on_query):
+    # Timed on the execution context, so a statement that raises leaves nothing on the connection.
+    # Each listener pair keys by itself - record_queries() can be nested, or run under the profiler.
+    key = f'_profiler_start_{id(on_query)}'
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        setattr(context, key, time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, key, None)
+        if started is None:  # Attached while the statement was already running
+            return
+        on_query(statement, time.perf_counter() - started, _call_site())
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    return before_cursor_execute, after_cursor_execute
+
+
+def _detach(engine, listeners):
+    before_cursor_execute, after_cursor_execute = listeners
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    event.remove(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+@contextmanager
+def record_queries(engines):
+    """Record every statement run on `engines` inside the block"""
+    recorder = QueryRecorder()
+    attached = [(engine, _attach(engine, recorder.add)) for engine in engines]
+    try:
+        yield recorder
+    finally:
+        for engine, listeners in attached:
+            _detach(engine, listeners)
+
+
+def init_query_profiler(app, engines):
+    """
+    Development/CI profiler: log N+1 patterns and slow queries per request,
+    with the call site of each. Off unless QUERY_PROFILER_ENABLED is set -
+    walking the stack on every query is too expensive for production.
+    """
+    if not app.config.get('QUERY_PROFILER_ENABLED'):
+        return
+
+    n_plus_one_threshold = app.config.get('QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 5)
+    slow_threshold = app.config.get('QUERY_PROFILER_SLOW_MS', 100) / 1000
+
+    def on_query(statement, seconds, call_site):
+        if has_request_context():
+            recorder = g.get('query_recorder')
+            if recorder is None:
+                recorder = g.query_recorder = QueryRecorder()
+            recorder.add(statement, seconds, call_site)
+
+    for engine in engines:
+        _attach(engine, on_query)
+
+    @app.after_request
+    def report_queries(response):
+        recorder = g.get('query_recorder')
+        if recorder is None:
+            return response
+
+        for statement, (count, seconds, call_sites) in recorder.n_plus_one(n_plus_one_threshold).items():
+            logger.warning("Possible N+1 query", extra={
+                'endpoint': request.endpoint,
+                'count': count,
+                'total_ms': round(seconds * 1000, 2),
+                'statement': ' '.join(statement.split()),
+                'call_sites': sorted(call_sites),
+            })
+        for statement, seconds, call_site in recorder.slow(slow_threshold):
+            logger.warning("Slow query", extra={
+                'endpoint': request.endpoint,
+                'ms': round(seconds * 1000, 2),
+                'statement': ' '.join(statement.split()),
+                'call_site': call_site,
+            })
+        return response
@@ -0,0 +1,39 @@
+"""
+Rating aggregates.
+
+Each review bumps two rating_aggregates rows - its event's and its
+organizer's - in the review's own transaction, so averages and histograms
+are read back as single rows instead of aggregating over reviews.
+"""
+from app import db
+from app.models import RatingAggregate
+from app.utils.database import upsert_increment
+
+
+def record_rating(event_id, organizer_id, rating):
+    """Count a new `rating` (1-5) for the event and its organizer - the caller commits"""
+    increments = {'count': 1, 'total': rating, f'stars_{rating}': 1}
+    upsert_increment(RatingAggregate, {'subject_type': 'event', 'subject_id': event_id}, increments)
+    upsert_increment(RatingAggregate, {'subject_type': 'organizer', 'subject_id': organizer_id}, increments)
+
+
+def get_rating(subject_type, subject_id):
+    return db.session.get(RatingAggregate, (subject_type, subject_id))
+
+
+def rating_summaries(event_ids, organizer_ids):
+    """({event_id: summary}, {organizer_id: summary}) for a page of events, in one query"""
+    conditions = []
+    if event_ids:
+        conditions.append(db.and_(RatingAggregate.subject_type == 'event',
+                                  RatingAggregate.subject_id.in_(set(event_ids))))
+    if organizer_ids:
+        conditions.append(db.and_(RatingAggregate.subject_type == 'organizer',
+                                  RatingAggregate.subject_id.in_(set(organizer_ids))))
+    events, organizers = {}, {}
+    if not conditions:
+        return events, organizers
+    for aggregate in RatingAggregate.query.filter(db.or_(*conditions)):
+        target = events if aggregate.subject_type == 'event' else organizers
+        target[aggregate.subject_id] = aggregate.summary()
+    return events, organizers
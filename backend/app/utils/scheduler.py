@@ -0,0 +1,95 @@
+"""
+In-process periodic jobs.
+
+Each job runs on its own daemon thread inside an app context, so a slow
+archive pass never holds up notification delivery. Jobs only start when
+SCHEDULER_ENABLED is set (single-process deployments) or under
+`flask worker` (a dedicated worker process next to the web dynos). Every
+job is safe to run in several processes at once.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+import click
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    def __init__(self, app):
+        self.app = app
+        self.jobs = []  # (name, interval seconds, func)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add_job(self, name, interval, func):
+        self.jobs.append((name, interval, func))
+
+    def _run(self, name, interval, func):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            with self.app.app_context():
+                try:
+                    func()
+                except Exception:
+                    logger.exception("Scheduled job failed", extra={'job': name})
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for name, interval, func in self.jobs:
+            thread = threading.Thread(target=self._run, args=(name, interval, func),
+                                      name=f'job-{name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Scheduler started", extra={'jobs': [job[0] for job in self.jobs]})
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_forever(self):
+        self.start()
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+def init_scheduler(app):
+    from app.utils.archive import archive_finished_events
+    from app.utils.changes import prune_event_changes
+    from app.utils.idempotency import prune_idempotency_keys
+    from app.utils.notifications import OutboxWorker, queue_event_reminders
+
+    config = app.config
+    scheduler = Scheduler(app)
+    outbox = OutboxWorker(app)
+    scheduler.add_job('drain-notifications', config['NOTIFICATIONS_POLL_SECONDS'], outbox.drain)
+    scheduler.add_job('event-reminders', 60, lambda: queue_event_reminders(
+        timedelta(minutes=config['NOTIFICATIONS_REMINDER_LEAD_MINUTES'])))
+    scheduler.add_job('archive-events', config['EVENTS_ARCHIVE_INTERVAL_MINUTES'] * 60, lambda: archive_finished_events(
+        timedelta(hours=config['EVENTS_ARCHIVE_AFTER_HOURS']), config['EVENTS_ARCHIVE_BATCH_SIZE']))
+    scheduler.add_job('prune-event-changes', 3600, lambda: prune_event_changes(
+        timedelta(hours=config['EVENTS_CHANGES_RETENTION_HOURS'])))
+    scheduler.add_job('prune-idempotency-keys', 3600, prune_idempotency_keys)
+    app.extensions['scheduler'] = scheduler
+
+    @app.cli.command('worker')
+    def worker_command():
+        """Run the scheduled jobs (notifications, reminders, archiving, pruning) until interrupted"""
+        click.echo(f"Running jobs: {', '.join(job[0] for job in scheduler.jobs)}")
+        scheduler.run_forever()
+
+    if config['SCHEDULER_ENABLED']:
+        scheduler.start()
+    return scheduler
@@ -0,0 +1,104 @@
+"""
+Row serializers for read-heavy endpoints.
+
+Each *_COLUMNS tuple is selected with `query.with_entities(*COLUMNS)`, which
+returns plain row tuples instead of hydrated ORM objects (no identity map,
+no attribute instrumentation). The matching *_row_to_dict unpacks a row
+positionally into the same shape as Model.to_dict. Datetimes are left as
+datetime objects - the JSON provider encodes them as ISO 8601 directly.
+"""
+from app.models import User, Event, Message, ArchivedEvent
+
+EVENT_COLUMNS = (
+    Event.id, Event.title, Event.description, Event.category, Event.tags, Event.location,
+    Event.event_date, Event.max_attendees, Event.attendees, Event.created_by, Event.created_at, Event.updated_at,
+)
+
+# Same shape from the archive table, so the two can be UNIONed for include_past
+ARCHIVED_EVENT_COLUMNS = tuple(getattr(ArchivedEvent, column.key) for column in EVENT_COLUMNS)
+
+
+def event_row_to_dict(row):
+    """Same keys as Event.to_dict, from a row of EVENT_COLUMNS"""
+    (id, title, description, category, tags, location,
+     event_date, max_attendees, attendees, created_by, created_at, updated_at) = row
+    attendees = attendees or []
+    attendee_count = len(attendees)
+    return {
+        'id': id,
+        'title': title,
+        'description': description,
+        'category': category,
+        'tags': tags or [],
+        'location': location,
+        'event_date': event_date,
+        'max_attendees': max_attendees,
+        'attendees': attendees,
+        'attendee_count': attendee_count,
+        'spots_left': max_attendees - attendee_count,
+        'created_by': created_by,
+        'created_at': created_at,
+        'updated_at': updated_at,
+    }
+
+
+# Home-screen list ("my events") - no description or attendee ids
+EVENT_SUMMARY_COLUMNS = (
+    Event.id, Event.title, Event.category, Event.tags, Event.location,
+    Event.event_date, Event.max_attendees, Event.attendees, Event.created_by, Event.updated_at,
+)
+
+
+def event_summary_row_to_dict(row):
+    """Compact event from a row of EVENT_SUMMARY_COLUMNS"""
+    id, title, category, tags, location, event_date, max_attendees, attendees, created_by, updated_at = row
+    attendee_count = len(attendees) if attendees else 0
+    return {
+        'id': id,
+        'title': title,
+        'category': category,
+        'tags': tags or [],
+        'location': location,
+        'event_date': event_date,
+        'max_attendees': max_attendees,
+        'attendee_count': attendee_count,
+        'spots_left': max_attendees - attendee_count,
+        'created_by': created_by,
+        'updated_at': updated_at,
+    }
+
+
+# Public face of a user - attendee lists and event hosts
+PROFILE_COLUMNS = (User.id, User.username, User.avatar_url)
+
+
+def profile_row_to_dict(row):
+    id, username, avatar_url = row
+    return {'id': id, 'username': username, 'avatar_url': avatar_url}
+
+
+# Username comes from an outer join on users instead of one lazy load per message
+MESSAGE_COLUMNS = (
+    Message.id, Message.chat_room_id, Message.user_id, User.username,
+    Message.content, Message.message_type, Message.created_at,
+)
+
+
+def message_rows(query):
+    """Narrow a Message query to MESSAGE_COLUMNS, joining the author's username"""
+    return query.outerjoin(User, Message.user_id == User.id).with_entities(*MESSAGE_COLUMNS)
+
+
+def message_row_to_dict(row):
+    """Same keys as Message.to_dict, from a row of MESSAGE_COLUMNS"""
+    id, chat_room_id, user_id, username, content, message_type, created_at = row
+    return {
+        'id': id,
+        'chat_room_id': chat_room_id,
+        'user_id': user_id,
+        'username': username if username is not None else 'Unknown',
+        'content': content,
+        'message_type': message_type,
+        'created_at': created_at,
+        'timestamp': int(created_at.timestamp() * 1000) if created_at else None,
+    }
@@ -0,0 +1,12 @@
+"""
+Socket.IO room names shared by the blueprints.
+
+Kept out of app.routes.chat so the HTTP blueprints can address a socket
+room without importing the chat blueprint, its presence tracking and its
+handlers - an events-only worker emits through the message queue.
+"""
+
+
+def user_room(user_id):
+    """Socket.IO room of every socket its user authenticated on connect - for events meant for them alone"""
+    return f"user_{user_id}"
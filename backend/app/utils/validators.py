@@ -0,0 +1,357 @@
+"""
+Declarative request validation.
+
+A Schema subclass lists its fields once; the class statement compiles them
+into a loader table and a namedtuple, so a request only pays for one pass
+over that table - no per-request regex compilation or field discovery.
+Handlers wrapped in @validate() receive typed, bounded values, and bad or
+oversized input is answered with 400/413 before the handler (and any
+database work) runs.
+
+    class NewMessage(Schema):
+        content = String(required=True, max_length=2000)
+
+    @validate(body=NewMessage)
+    def send_message(event_id, body):
+        body.content
+"""
+import re
+from collections import namedtuple
+from functools import wraps
+
+from flask import request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from app.utils.pagination import decode_cursor
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+PASSWORD_RULES = (
+    (re.compile(r'[A-Z]'), "Password must contain at least one uppercase letter"),
+    (re.compile(r'[a-z]'), "Password must contain at least one lowercase letter"),
+    (re.compile(r'\d'), "Password must contain at least one number"),
+)
+
+_EMPTY = (None, '', [])
+
+
+class ValidationError(ValueError):
+    """Rejected input - `field` is the request key at fault, if any"""
+
+    def __init__(self, message, field=None, status=400):
+        super().__init__(message)
+        self.message = message
+        self.field = field
+        self.status = status
+
+    def to_dict(self):
+        body = {'error': self.message}
+        if self.field:
+            body['field'] = self.field
+        return body
+
+
+class Field:
+    """
+    One request key. `key` defaults to the attribute name; `error` replaces
+    every message except the missing-value one, which `required_error` sets.
+    """
+
+    def __init__(self, key=None, required=False, default=None, error=None, required_error=None):
+        self.key = key
+        self.required = required
+        self.default = default
+        self.error = error
+        self.required_error = required_error
+
+    def bind(self, name):
+        self.key = self.key or name
+        self.required_error = self.required_error or f'{self.key} is required'
+
+    def fail(self, message):
+        raise ValidationError(self.error or message, field=self.key)
+
+    def convert(self, value):
+        return value
+
+
+class String(Field):
+    def __init__(self, max_length=255, min_length=0, strip=True, lower=False, pattern=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.min_length = min_length
+        self.strip = strip
+        self.lower = lower
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+
+    def convert(self, value):
+        if not isinstance(value, str):
+            self.fail(f'{self.key} must be a string')
+        if self.strip:
+            value = value.strip()
+        if self.lower:
+            value = value.lower()
+        if not value:
+            return value
+        if len(value) > self.max_length:
+            self.fail(f'{self.key} must be at most {self.max_length} characters')
+        if len(value) < self.min_length:
+            self.fail(f'{self.key} must be at least {self.min_length} characters')
+        if self.pattern is not None and self.pattern.match(value) is None:
+            self.fail(f'Invalid {self.key} format')
+        return value
+
+
+class Email(String):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('error', 'Invalid email format')
+        super().__init__(max_length=254, lower=True, pattern=EMAIL_PATTERN, **kwargs)
+
+
+class Password(String):
+    """Strength rules for new passwords. The cap keeps hashing cost bounded."""
+
+    def __init__(self, **kwargs):
+        super().__init__(max_length=128, strip=False, **kwargs)
+
+    def convert(self, value):
+        value = super().convert(value)
+        if not value:
+            return value
+        if len(value) < 8:
+            self.fail("Password must be at least 8 characters long")
+        for pattern, message in PASSWORD_RULES:
+            if pattern.search(value) is None:
+                self.fail(message)
+        return value
+
+
+class Choice(String):
+    def __init__(self, choices, **kwargs):
+        super().__init__(**kwargs)
+        self.choices = frozenset(choices)
+
+    def convert(self, value):
+        value = super().convert(value)
+        if value and value not in self.choices:
+            self.fail(f"{self.key} must be one of: {', '.join(sorted(self.choices))}")
+        return value
+
+
+class Integer(Field):
+    """Whole numbers, from JSON or from query-string digits. clamp=True pulls out-of-range values into range."""
+
+    def __init__(self, min_value=None, max_value=None, clamp=False, **kwargs):
+        super().__init__(**kwargs)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.clamp = clamp
+
+    def convert(self, value):
+        if isinstance(value, bool):
+            self.fail(f'{self.key} must be a whole number')
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                return value
+            try:
+                value = int(value)
+            except ValueError:
+                self.fail(f'{self.key} must be a whole number')
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif not isinstance(value, int):
+            self.fail(f'{self.key} must be a whole number')
+
+        if self.min_value is not None and value < self.min_value:
+            if not self.clamp:
+                self.fail(self._range_message())
+            value = self.min_value
+        if self.max_value is not None and value > self.max_value:
+            if not self.clamp:
+                self.fail(self._range_message())
+            value = self.max_value
+        return value
+
+    def _range_message(self):
+        if self.max_value is None:
+            return f'{self.key} must be at least {self.min_value}'
+        if self.min_value is None:
+            return f'{self.key} must be at most {self.max_value}'
+        return f'{self.key} must be between {self.min_value} and {self.max_value}'
+
+
+class Boolean(Field):
+    TRUE = frozenset(('true', '1', 'yes'))
+    FALSE = frozenset(('false', '0', 'no'))
+
+    def __init__(self, default=False, **kwargs):
+        super().__init__(default=default, **kwargs)
+
+    def convert(self, value):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in self.TRUE:
+                return True
+            if lowered in self.FALSE:
+                return False
+        self.fail(f'{self.key} must be true or false')
+
+
+class StringList(Field):
+    """JSON array of short strings; duplicates are dropped, order kept"""
+
+    def __init__(self, min_items=0, max_items=50, item_max_length=50, **kwargs):
+        super().__init__(**kwargs)
+        self.min_items = min_items
+        self.max_items = max_items
+        self.item_max_length = item_max_length
+
+    def convert(self, value):
+        if not isinstance(value, list):
+            self.fail(f'{self.key} must be an array')
+        if len(value) > self.max_items:
+            self.fail(f'{self.key} can have at most {self.max_items} items')
+        items = []
+        for item in value:
+            if not isinstance(item, str) or not item.strip() or len(item) > self.item_max_length:
+                self.fail(f'{self.key} must contain non-empty strings of at most {self.item_max_length} characters')
+            items.append(item.strip())
+        items = list(dict.fromkeys(items))
+        if items and len(items) < self.min_items:
+            self.fail(f'At least {self.min_items} {self.key} are required')
+        return items
+
+
+class Object(Field):
+    """Free-form JSON object, passed through as a dict"""
+
+    def convert(self, value):
+        if not isinstance(value, dict):
+            self.fail(f'{self.key} must be an object')
+        return value
+
+
+class ObjectList(Field):
+    """JSON array of objects, each loaded with `schema`; max_items may be a callable, read per request"""
+
+    def __init__(self, schema, min_items=0, max_items=50, **kwargs):
+        super().__init__(**kwargs)
+        self.schema = schema
+        self.min_items = min_items
+        self.max_items = max_items
+
+    def convert(self, value):
+        if not isinstance(value, list):
+            self.fail(f'{self.key} must be an array')
+        max_items = self.max_items() if callable(self.max_items) else self.max_items
+        if len(value) > max_items:
+            self.fail(f'{self.key} can have at most {max_items} items')
+        if value and len(value) < self.min_items:
+            self.fail(f'At least {self.min_items} {self.key} are required')
+        items = []
+        for index, item in enumerate(value):
+            if not isinstance(item, dict):
+                self.fail(f'{self.key}[{index}] must be an object')
+            try:
+                items.append(self.schema.load(item))
+            except ValidationError as e:
+                raise ValidationError(f'{self.key}[{index}]: {e.message}', field=self.key)
+        return items
+
+
+class Cursor(Field):
+    """Opaque pagination cursor, decoded into a tuple of `types`"""
+
+    def __init__(self, *types, **kwargs):
+        super().__init__(**kwargs)
+        self.types = types
+
+    def convert(self, value):
+        if not isinstance(value, str) or len(value) > 512:
+            self.fail('Invalid cursor')
+        if not value:
+            return value
+        try:
+            return decode_cursor(value, *self.types)
+        except ValueError:
+            self.fail('Invalid cursor')
+
+
+class Schema:
+    """
+    Subclass with Field attributes. load() returns a namedtuple of the
+    converted values; missing or blank optional fields get their default.
+    Unknown keys are ignored. `max_bytes` caps the raw request body.
+    """
+
+    max_bytes = 16 * 1024
+    _loaders = ()
+    _record = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Field):
+                    fields[name] = value
+        for name, field in fields.items():
+            field.bind(name)
+        cls._loaders = tuple((field.key, field.convert, field.required, field.required_error, field.default)
+                             for field in fields.values())
+        cls._record = namedtuple(cls.__name__, fields)
+
+    @classmethod
+    def load(cls, data):
+        """Validate a mapping (JSON object, request.args, Socket.IO payload). Raises ValidationError."""
+        if not hasattr(data, 'get'):
+            raise ValidationError('Request body must be a JSON object')
+        values = []
+        for key, convert, required, required_error, default in cls._loaders:
+            value = data.get(key)
+            if value is not None:
+                value = convert(value)
+            if value in _EMPTY:
+                if required:
+                    raise ValidationError(required_error, field=key)
+                value = default
+            values.append(value)
+        return cls._record(*values)
+
+    @classmethod
+    def from_request(cls):
+        """load() the JSON body, refusing anything over max_bytes before it is parsed"""
+        if request.content_length is not None and request.content_length > cls.max_bytes:
+            raise ValidationError('Request body too large', status=413)
+        try:
+            raw = request.get_data(cache=True)
+        except RequestEntityTooLarge:
+            raise ValidationError('Request body too large', status=413)
+        if len(raw) > cls.max_bytes:
+            raise ValidationError('Request body too large', status=413)
+        if not raw:
+            raise ValidationError('No data provided')
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValidationError('Request body must be a JSON object')
+        return cls.load(data)
+
+
+def validate(body=None, params=None):
+    """Pass the validated JSON body and/or query string to the view as `body=` / `params=`"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                if body is not None:
+                    kwargs['body'] = body.from_request()
+                if params is not None:
+                    kwargs['params'] = params.load(request.args)
+            except ValidationError as e:
+                return jsonify(e.to_dict()), e.status
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput benchmarks for the REST and Socket.IO hot paths.
+
+Runs in-process against a seeded SQLite database (see benchmarks/seed.py),
+so the numbers measure server-side cost without network noise. Each
+scenario reports p50/p95/p99 latency and requests per second; --output
+writes everything as JSON so runs can be diffed.
+
+Usage:
+    python benchmarks/api_bench.py --db bench.db [--seed-if-missing] [--requests 200] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, socketio
+from app.models import User, Event, EventAttendee, ChatRoom, Message
+from app.routes.events import EventFeedQuery
+from app.routes.chat import ChatPageQuery
+from app.utils.changes import record_event_change, current_watermark
+from benchmarks import seed
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, wall_seconds, errors=0, **extra):
+    latencies = sorted(latencies)
+    result = {
+        'scenario': name,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'throughput_rps': round(len(latencies) / wall_seconds, 1) if wall_seconds else None,
+    }
+    result.update(extra)
+    return result
+
+
+def timed_requests(name, n, call, ok=lambda r: r.status_code < 400):
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        response = call(i)
+        latencies.append(time.perf_counter() - t0)
+        if not ok(response):
+            errors += 1
+    return summarize(name, latencies, time.perf_counter() - started, errors)
+
+
+def auth_header(app, user):
+    with app.test_request_context():
+        return {'Authorization': f'Bearer {user.generate_token()}'}
+
+
+def bench_feed(app, client, n, rng):
+    # Seeded dates are fixed around seed.BASE_DATE, so they are all in the past by
+    # now - include_past keeps the feed scenarios measuring the whole dataset
+    total_events = Event.query.count()
+    deep_offset = min(max(0, total_events - 100), EventFeedQuery.offset.max_value)
+    return [
+        timed_requests('get_events', n, lambda i: client.get('/api/events?include_past=true')),
+        timed_requests('get_events:category', n,
+                       lambda i: client.get(f'/api/events?include_past=true&category={rng.choice(seed.CATEGORIES)}')),
+        timed_requests('get_events:search', n,
+                       lambda i: client.get(f'/api/events?include_past=true&search={rng.choice(seed.WORDS)}')),
+        timed_requests('get_events:deep_page', n,
+                       lambda i: client.get(f'/api/events?include_past=true&offset={rng.randrange(deep_offset + 1)}&limit=50')),
+    ]
+
+
+def bench_my_events(app, client, n):
+    """Home screen for the user attending the most events, and for the busiest host"""
+    attendee_id = db.session.query(EventAttendee.user_id)\
+                            .group_by(EventAttendee.user_id)\
+                            .order_by(db.func.count().desc())\
+                            .first()[0]
+    host_id = db.session.query(Event.created_by)\
+                        .group_by(Event.created_by)\
+                        .order_by(db.func.count().desc())\
+                        .first()[0]
+    attendee = auth_header(app, db.session.get(User, attendee_id))
+    host = auth_header(app, db.session.get(User, host_id))
+    return [
+        timed_requests('my_events:attending', n,
+                       lambda i: client.get('/api/events/mine?role=attending&include_past=true', headers=attendee)),
+        timed_requests('my_events:hosting', n,
+                       lambda i: client.get('/api/events/mine?role=hosting&include_past=true', headers=host)),
+    ]
+
+
+def bench_event_detail(app, client, n):
+    """Detail page of the most-attended event, first page served from cache and paging cold"""
+    event_id = db.session.query(EventAttendee.event_id)\
+                         .group_by(EventAttendee.event_id)\
+                         .order_by(db.func.count().desc())\
+                         .first()[0]
+    url = f'/api/events/{event_id}?limit=50'
+    cursors = []
+    cursor = client.get(url).get_json()['next_cursor']
+    while cursor and len(cursors) < n:
+        cursors.append(cursor)
+        cursor = client.get(f'{url}&cursor={cursor}').get_json()['next_cursor']
+
+    def cold(i):
+        app.extensions['event_detail_cache'].invalidate(event_id)
+        return client.get(f'{url}&cursor={cursors[i % len(cursors)]}' if cursors else url)
+
+    return [
+        timed_requests('event_detail:cached', n, lambda i: client.get(url)),
+        timed_requests('event_detail:uncached', n, cold),
+    ]
+
+
+def bench_feed_sync(app, client, n, rng, changed=10):
+    """
+    Keeping the feed fresh: reloading a page of it, versus polling the change
+    log when nothing changed and when `changed` events moved since the last poll
+    """
+    event_ids = [row[0] for row in db.session.query(Event.id).limit(1000)]
+    for event_id in rng.sample(event_ids, min(changed, len(event_ids))):
+        record_event_change(event_id)
+    db.session.commit()
+    watermark = current_watermark(app.config['EVENTS_CHANGES_SETTLE_SECONDS'])
+    return [
+        timed_requests('feed_sync:reload', n, lambda i: client.get('/api/events?include_past=true')),
+        timed_requests('feed_sync:idle', n, lambda i: client.get(f'/api/events/changes?since={watermark}')),
+        timed_requests(f'feed_sync:{changed}_changed', n,
+                       lambda i: client.get(f'/api/events/changes?since={watermark - changed}')),
+    ]
+
+
+def bench_app_open(app, client, n, rtt_ms):
+    """
+    The calls the mobile app makes on open, one by one and as one /api/batch.
+    modeled_ms adds a network round trip per HTTP request to the p50, which
+    is what dominates time-to-first-render on a slow mobile link.
+    """
+    user_id = db.session.query(EventAttendee.user_id).first()[0]
+    header = auth_header(app, db.session.get(User, user_id))
+    paths = ['/api/auth/me', '/api/auth/interests', '/api/events?include_past=true',
+             '/api/events/mine?include_past=true']
+
+    def separate(i):
+        for path in paths:
+            response = client.get(path, headers=header)
+            if response.status_code >= 400:
+                return response
+        return response
+
+    def batched(parallel):
+        payload = {'requests': [{'path': path} for path in paths], 'parallel': parallel}
+        return lambda i: client.post('/api/batch', headers=header, json=payload)
+
+    all_ok = lambda r: r.status_code < 400 and all(sub['status'] < 400 for sub in r.get_json()['responses'])
+    results = [
+        timed_requests('app_open:separate', n, separate),
+        timed_requests('app_open:batch', n, batched(False), ok=all_ok),
+        timed_requests('app_open:batch_parallel', n, batched(True), ok=all_ok),
+    ]
+    for result, round_trips in zip(results, (len(paths), 1, 1)):
+        result.update({'round_trips': round_trips, 'rtt_ms': rtt_ms,
+                       'modeled_ms': round(result['p50_ms'] + round_trips * rtt_ms, 3)})
+    return results
+
+
+def bench_join_leave(app, n, threads, rng):
+    """Many users join and leave the same few events at once"""
+    hot_events = [e.id for e in Event.query.order_by(Event.id).limit(3).all()]
+    users = User.query.order_by(User.id).limit(threads).all()
+    headers = [auth_header(app, user) for user in users]
+    # Room for everyone, so failures are contention rather than capacity
+    Event.query.filter(Event.id.in_(hot_events)).update({'max_attendees': 9999, 'attendees': []},
+                                                         synchronize_session=False)
+    EventAttendee.query.filter(EventAttendee.event_id.in_(hot_events)).delete(synchronize_session=False)
+    db.session.commit()
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(header, worker_rng):
+        client = app.test_client()
+        local = []
+        local_errors = 0
+        for _ in range(n // threads or 1):
+            event_id = worker_rng.choice(hot_events)
+            for action in ('join', 'leave'):
+                t0 = time.perf_counter()
+                response = client.post(f'/api/events/{event_id}/{action}', headers=header)
+                local.append(time.perf_counter() - t0)
+                if response.status_code >= 400:
+                    local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=worker, args=(h, random.Random(rng.random()))) for h in headers]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return [summarize('join_leave:contended', latencies, time.perf_counter() - started, errors[0], threads=threads)]
+
+
+def busiest_room():
+    return db.session.query(Message.chat_room_id, db.func.count(Message.id))\
+                     .group_by(Message.chat_room_id)\
+                     .order_by(db.func.count(Message.id).desc())\
+                     .first()
+
+
+def attendee_header(app, event):
+    user_id = (event.attendees or [event.created_by])[0]
+    if user_id not in (event.attendees or []):
+        event.attendees = (event.attendees or []) + [user_id]
+        db.session.commit()
+    return auth_header(app, db.session.get(User, user_id))
+
+
+def bench_chat_history(app, client, n, rng):
+    room_id, message_count = busiest_room()
+    event = db.session.get(Event, db.session.get(ChatRoom, room_id).event_id)
+    header = attendee_header(app, event)
+    url = f'/api/chat/events/{event.id}/messages'
+    max_offset = min(max(0, message_count - 50), ChatPageQuery.offset.max_value)
+    return [
+        timed_requests('chat_history:latest', n, lambda i: client.get(url, headers=header)),
+        timed_requests('chat_history:deep_page', n,
+                       lambda i: client.get(f'{url}?offset={rng.randrange(max_offset + 1)}&limit=50', headers=header)),
+    ]
+
+
+def bench_send_message(app, client, n, socket_clients):
+    """POST a message while N Socket.IO clients are connected and count what they receive"""
+    room_id, _ = busiest_room()
+    event = db.session.get(Event, db.session.get(ChatRoom, room_id).event_id)
+    header = attendee_header(app, event)
+    sockets = [socketio.test_client(app) for _ in range(socket_clients)]
+
+    result = timed_requests('send_message:fanout', n, lambda i: client.post(
+        f'/api/chat/events/{event.id}/messages', headers=header, json={'content': f'bench message {i}'}))
+
+    delivered = sum(
+        sum(1 for packet in s.get_received() if packet['name'] == 'new_message') for s in sockets
+    )
+    for s in sockets:
+        s.disconnect()
+    result.update({'socket_clients': socket_clients, 'delivered': delivered, 'expected': n * socket_clients})
+
+    # Retries of one message with an Idempotency-Key: the first posts it, the rest replay the stored response
+    retry = {**header, 'Idempotency-Key': f'bench-{time.time_ns()}'}
+    replayed = lambda r: r.status_code == 201 and r.headers.get('Idempotent-Replayed') == 'true'
+    client.post(f'/api/chat/events/{event.id}/messages', headers=retry, json={'content': 'bench retry'})
+    memory = timed_requests('send_message:retry', n, lambda i: client.post(
+        f'/api/chat/events/{event.id}/messages', headers=retry, json={'content': 'bench retry'}), ok=replayed)
+
+    def from_database(i):
+        app.extensions['idempotency']._responses.clear()
+        return client.post(f'/api/chat/events/{event.id}/messages', headers=retry, json={'content': 'bench retry'})
+
+    stored = timed_requests('send_message:retry_db', n, from_database, ok=replayed)
+    return [result, memory, stored]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='bench.db', help='Seeded SQLite database')
+    parser.add_argument('--seed-if-missing', action='store_true', help='Generate --db with seed.py defaults if absent')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent users for join/leave')
+    parser.add_argument('--socket-clients', type=int, default=100, help='Connected Socket.IO clients for fan-out')
+    parser.add_argument('--rtt-ms', type=float, default=150, help='Mobile round trip added to app_open results')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        if not args.seed_if_missing:
+            parser.error(f'{args.db} does not exist - run benchmarks/seed.py first or pass --seed-if-missing')
+        seed.generate(args.db, seed=args.seed)
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.db)}',
+        'SQLALCHEMY_BINDS': {},
+        'LOG_LEVEL': 'WARNING',
+    })
+    rng = random.Random(args.seed)
+    client = app.test_client()
+
+    results = []
+    with app.app_context():
+        counts = {'users': User.query.count(), 'events': Event.query.count(), 'messages': Message.query.count()}
+        results += bench_feed(app, client, args.requests, rng)
+        results += bench_my_events(app, client, args.requests)
+        results += bench_event_detail(app, client, args.requests)
+        results += bench_feed_sync(app, client, args.requests, rng)
+        results += bench_app_open(app, client, args.requests, args.rtt_ms)
+        results += bench_chat_history(app, client, args.requests, rng)
+        results += bench_send_message(app, client, args.requests, args.socket_clients)
+        results += bench_join_leave(app, args.requests, args.threads, rng)
+
+    for r in results:
+        print(f"{r['scenario']:>24}: p50={r['p50_ms']:>8}ms p95={r['p95_ms']:>8}ms p99={r['p99_ms']:>8}ms "
+              f"{r['throughput_rps']:>8} req/s  errors={r['errors']}"
+              + (f"  modeled={r['modeled_ms']}ms @ {r['rtt_ms']}ms RTT" if 'modeled_ms' in r else ''))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'git_revision': git_revision(),
+                'dataset': counts,
+                'seed': args.seed,
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Deterministic data generator for benchmarks.
+
+Builds a SQLite database with users, events (with attendees and chat rooms)
+and chat messages. The same seed and sizes always produce the same rows, so
+benchmark runs against separately generated databases are comparable.
+
+Usage: python benchmarks/seed.py bench.db [--users 10000] [--events 100000] [--messages 1000000] [--seed 42]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import User, Event, EventAttendee, ChatRoom, Message
+
+CATEGORIES = ['social', 'sports', 'food', 'music', 'outdoor', 'arts', 'tech', 'fitness']
+WORDS = ['pickup', 'basketball', 'brunch', 'jazz', 'hike', 'sketching', 'hackathon', 'yoga', 'board',
+         'games', 'trivia', 'night', 'picnic', 'run', 'club', 'meetup', 'coffee', 'vinyl', 'climb', 'tacos']
+CITIES = ['San Francisco, CA', 'Oakland, CA', 'Berkeley, CA', 'San Jose, CA', 'Palo Alto, CA']
+
+# Fixed reference point so generated dates don't depend on when the script runs
+BASE_DATE = datetime(2025, 1, 1)
+BENCH_PASSWORD = 'BenchPassw0rd'
+CHUNK = 10000
+
+
+def make_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def insert_chunked(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(model), rows[start:start + CHUNK])
+    db.session.commit()
+
+
+def generate(path, users=10000, events=100000, messages=1000000, seed=42):
+    """Create `path` and fill it. Returns {'user_ids', 'event_ids', 'room_ids'} lists."""
+    rng = random.Random(seed)
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}',
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': False,
+    })
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        # Hashing is deliberately slow - every seeded user shares one hash
+        password_hash = generate_password_hash(BENCH_PASSWORD)
+        user_rows = []
+        for i in range(users):
+            user_rows.append({
+                'id': make_uuid(rng),
+                'email': f'user{i}@bench.clustr.app',
+                'username': f'user{i}',
+                'interests': rng.sample(CATEGORIES, 3),
+                'role': 'user',
+                'created_at': BASE_DATE - timedelta(days=rng.randrange(365)),
+                'password_hash': password_hash,
+                'is_active': True,
+                'is_verified': True,
+            })
+        insert_chunked(User, user_rows)
+        user_ids = [row['id'] for row in user_rows]
+
+        event_rows = []
+        room_rows = []
+        for i in range(events):
+            tags = rng.sample(CATEGORIES, rng.randint(1, 3))
+            capacity = rng.choice([5, 10, 25, 50, 100])
+            attendee_count = min(capacity, int(rng.paretovariate(1.5)))
+            event_id = make_uuid(rng)
+            event_rows.append({
+                'id': event_id,
+                'title': ' '.join(rng.sample(WORDS, 3)).title(),
+                'description': ' '.join(rng.choices(WORDS, k=20)),
+                'category': tags[0],
+                'tags': tags,
+                'location': f'{rng.randrange(1, 9999)} Main St, {rng.choice(CITIES)}',
+                'event_date': BASE_DATE + timedelta(hours=rng.randrange(-24 * 180, 24 * 180)),
+                'max_attendees': capacity,
+                'attendees': rng.sample(user_ids, attendee_count),
+                'created_by': rng.choice(user_ids),
+                'created_at': BASE_DATE - timedelta(minutes=rng.randrange(60 * 24 * 180)),
+            })
+            room_rows.append({'id': make_uuid(rng), 'event_id': event_id, 'created_at': BASE_DATE})
+        insert_chunked(Event, event_rows)
+        insert_chunked(EventAttendee, [{'event_id': event['id'], 'user_id': user_id, 'event_date': event['event_date'],
+                                        'joined_at': event['created_at']}
+                                       for event in event_rows for user_id in event['attendees']])
+        insert_chunked(ChatRoom, room_rows)
+
+        # Chat activity is heavily skewed towards a few busy rooms
+        room_attendees = [(room['id'], event['attendees'] or [event['created_by']])
+                          for room, event in zip(room_rows, event_rows)]
+        message_rows = []
+        for i in range(messages):
+            room_id, attendees = room_attendees[min(len(room_attendees) - 1, int(rng.paretovariate(1.2)) - 1)]
+            message_rows.append({
+                'id': make_uuid(rng),
+                'chat_room_id': room_id,
+                'user_id': rng.choice(attendees),
+                'content': ' '.join(rng.choices(WORDS, k=rng.randint(3, 15))),
+                'message_type': 'text',
+                'created_at': BASE_DATE + timedelta(seconds=i),
+            })
+            if len(message_rows) == CHUNK:
+                insert_chunked(Message, message_rows)
+                message_rows = []
+        insert_chunked(Message, message_rows)
+
+    return {
+        'user_ids': user_ids,
+        'event_ids': [row['id'] for row in event_rows],
+        'room_ids': [row['id'] for row in room_rows],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='SQLite file to create (overwritten)')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    generate(args.path, args.users, args.events, args.messages, args.seed)
+    print(f"Seeded {args.users} users, {args.events} events, {args.messages} messages "
+          f"into {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
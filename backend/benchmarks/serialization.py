@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: cost of serializing one 50-event feed page and one 50-message
+chat page, comparing the ORM to_dict path with the row serializers in
+app/utils/serializers.py, each encoded with Flask's default json provider
+and with the orjson provider.
+
+Usage: python benchmarks/serialization.py [--events 2000] [--page 50] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app, db
+from app.models import Event, Message
+from app.utils.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+from app.utils.serializers import EVENT_COLUMNS, event_row_to_dict, message_rows, message_row_to_dict
+from benchmarks import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--page', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'serialization.db')
+    seed.generate(path, users=500, events=args.events, messages=args.events * 5)
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': False,
+        'LOG_LEVEL': 'WARNING',
+    })
+
+    encoders = {'flask-default': DefaultJSONProvider(app), 'stdlib-compact': StdlibJSONProvider(app)}
+    if orjson is not None:
+        encoders['orjson'] = OrjsonProvider(app)
+
+    with app.app_context():
+        room_id = db.session.query(Message.chat_room_id).first()[0]
+
+        def feed_orm():
+            db.session.expunge_all()  # Fresh identity map, as in a new request
+            events = Event.query.order_by(Event.event_date.asc()).limit(args.page).all()
+            return {'events': [e.to_dict() for e in events]}
+
+        def feed_rows():
+            events = Event.query.order_by(Event.event_date.asc()).with_entities(*EVENT_COLUMNS).limit(args.page).all()
+            return {'events': [event_row_to_dict(e) for e in events]}
+
+        def chat_orm():
+            db.session.expunge_all()
+            messages = Message.query.filter_by(chat_room_id=room_id).order_by(Message.created_at.desc())\
+                                    .limit(args.page).all()
+            return {'messages': [m.to_dict() for m in messages]}
+
+        def chat_rows():
+            messages = message_rows(Message.query.filter_by(chat_room_id=room_id))\
+                                    .order_by(Message.created_at.desc()).limit(args.page).all()
+            return {'messages': [message_row_to_dict(m) for m in messages]}
+
+        print(f"{'path':<50}{'build':>10}{'encode':>10}{'total':>10}  (ms per page, orjson={'yes' if orjson else 'no'})")
+        for label, build in [('feed: ORM + to_dict', feed_orm), ('feed: rows + event_row_to_dict', feed_rows),
+                             ('chat: ORM + to_dict', chat_orm), ('chat: rows + message_row_to_dict', chat_rows)]:
+            build_ms = timeit.timeit(build, number=args.repeat) / args.repeat * 1000
+            payload = build()
+            for name, provider in encoders.items():
+                # flask-default cannot encode raw datetimes as ISO strings, so it only runs on to_dict output
+                if name == 'flask-default' and 'rows' in label:
+                    continue
+                encode_ms = timeit.timeit(lambda: provider.response(payload), number=args.repeat) / args.repeat * 1000
+                print(f"{label + ' / ' + name:<50}{build_ms:>8.3f}{encode_ms:>10.3f}{build_ms + encode_ms:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Soak test: thousands of idle Socket.IO connections plus chat traffic.
+
+Starts the production server - gunicorn running serve.py with the gevent
+(default) or eventlet worker, as in the Procfile - against a small seeded
+SQLite database, opens --sockets WebSocket connections that only answer pings,
+then posts --messages chat messages while they stay connected. Every
+socket receives every message (send_message broadcasts), so delivery is
+checked as well as HTTP latency. Server memory is read from /proc before
+and after connecting, giving the resident cost of one idle connection.
+
+Linux only (reads /proc). Both processes need a file descriptor limit
+above --sockets; the script raises its own soft limit to the hard limit
+and the server inherits it.
+
+Usage:
+    python benchmarks/socket_soak.py [--sockets 10000] [--messages 50] [--hold 60] [--output soak.json]
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import gevent
+import gevent.pool
+import requests
+import simple_websocket
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import seed
+from benchmarks.api_bench import percentile, git_revision
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker_pid(master_pid):
+    """The single gunicorn worker under `master_pid`"""
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        children = f.read().split()
+    return int(children[0]) if children else None
+
+
+def rss_bytes(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        soft = hard
+    if soft < needed:
+        print(f"warning: open file limit {soft} is below the {needed} needed - raise `ulimit -n`", file=sys.stderr)
+
+
+class IdleSocket:
+    """Engine.IO v4 / Socket.IO v5 client that only connects, answers pings and counts broadcasts"""
+
+    def __init__(self, url, stats):
+        self.url = url
+        self.stats = stats
+        self.ws = None
+
+    def connect(self):
+        started = time.perf_counter()
+        self.ws = simple_websocket.Client(self.url)
+        # The server sends the Engine.IO open packet with the handshake, and the client
+        # library can swallow a frame that arrives in the same read - so don't wait for it
+        self.ws.send('40')  # Socket.IO connect to the default namespace
+        while True:
+            reply = self.ws.receive(timeout=30)
+            if reply is None:
+                raise RuntimeError('no Socket.IO connect reply')
+            if reply.startswith('40'):
+                break
+        self.stats['connect_latencies'].append(time.perf_counter() - started)
+        gevent.spawn(self._listen)
+
+    def _listen(self):
+        try:
+            while True:
+                packet = self.ws.receive()
+                if packet is None:
+                    break
+                if packet == '2':
+                    self.ws.send('3')
+                    self.stats['pings'] += 1
+                elif packet.startswith('42["new_message"'):
+                    self.stats['delivered'] += 1
+                    self.stats['last_delivery'] = time.perf_counter()
+        except simple_websocket.ConnectionClosed:
+            pass
+        self.stats['closed'] += 1
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+
+def prepare_database(path, seed_value):
+    """Small dataset plus an attendee token for posting chat messages"""
+    seed.generate(path, users=200, events=100, messages=2000, seed=seed_value)
+
+    from app import create_app, db
+    from app.models import User, Event, ChatRoom
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': False,
+        'LOG_LEVEL': 'WARNING',
+    })
+    with app.app_context():
+        room = ChatRoom.query.first()
+        event = db.session.get(Event, room.event_id)
+        user = db.session.get(User, event.attendees[0] if event.attendees else event.created_by)
+        if user.id not in (event.attendees or []):
+            event.attendees = (event.attendees or []) + [user.id]
+            db.session.commit()
+        with app.test_request_context():
+            token = user.generate_token()
+        return event.id, token
+
+
+def start_server(db_path, port, async_mode, worker_connections):
+    env = dict(os.environ,
+               ASYNC_MODE=async_mode,
+               DATABASE_URL=f'sqlite:///{db_path}',
+               PORT=str(port),
+               LOG_LEVEL='WARNING',
+               MIGRATIONS_ENABLED='false',
+               COMPRESS_ENABLED='false')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-k', async_mode, '-w', '1',
+                               '--worker-connections', str(worker_connections),
+                               '--graceful-timeout', '10', '--bind', f'127.0.0.1:{port}',
+                               '--log-level', 'warning', 'serve:app'],
+                              cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/api/health', timeout=1).ok:
+                return server, worker_pid(server.pid)
+        except requests.ConnectionError:
+            pass
+        gevent.sleep(0.2)
+    server.kill()
+    raise RuntimeError('server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sockets', type=int, default=10000, help='Idle connections to hold')
+    parser.add_argument('--messages', type=int, default=50, help='Chat messages posted while connected')
+    parser.add_argument('--message-interval', type=float, default=0.5, help='Seconds between chat messages')
+    parser.add_argument('--hold', type=float, default=60, help='Seconds to stay connected after the chat traffic')
+    parser.add_argument('--concurrency', type=int, default=200, help='Connections opened at once')
+    parser.add_argument('--async-mode', default='gevent', choices=['gevent', 'eventlet'])
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    raise_fd_limit(args.sockets + 1000)
+    workdir = tempfile.mkdtemp(prefix='clustr-soak-')
+    db_path = os.path.join(workdir, 'soak.db')
+    event_id, token = prepare_database(db_path, args.seed)
+
+    server, pid = start_server(db_path, args.port, args.async_mode, args.sockets + 1000)
+    stats = {'connect_latencies': [], 'pings': 0, 'delivered': 0, 'closed': 0, 'last_delivery': None}
+    sockets = []
+    try:
+        # Let the server settle before the baseline reading
+        gevent.sleep(1)
+        baseline_rss = rss_bytes(pid)
+
+        url = f'ws://127.0.0.1:{args.port}/socket.io/?EIO=4&transport=websocket'
+        failures = [0]
+
+        def open_socket(_):
+            client = IdleSocket(url, stats)
+            try:
+                client.connect()
+                sockets.append(client)
+            except Exception:
+                failures[0] += 1
+
+        started = time.perf_counter()
+        gevent.pool.Pool(args.concurrency).map(open_socket, range(args.sockets))
+        connect_seconds = time.perf_counter() - started
+        gevent.sleep(2)
+        connected_rss = rss_bytes(pid)
+        print(f"{len(sockets)} sockets connected in {connect_seconds:.1f}s ({failures[0]} failed), "
+              f"server RSS {baseline_rss / 2**20:.0f} -> {connected_rss / 2**20:.0f} MiB")
+
+        # Chat traffic while everything stays connected
+        session = requests.Session()
+        headers = {'Authorization': f'Bearer {token}'}
+        post_latencies = []
+        post_errors = 0
+        traffic_started = time.perf_counter()
+        for i in range(args.messages):
+            t0 = time.perf_counter()
+            response = session.post(f'http://127.0.0.1:{args.port}/api/chat/events/{event_id}/messages',
+                                    headers=headers, json={'content': f'soak message {i}'})
+            post_latencies.append(time.perf_counter() - t0)
+            if response.status_code != 201:
+                post_errors += 1
+            gevent.sleep(args.message_interval)
+
+        expected = (args.messages - post_errors) * len(sockets)
+        deadline = time.time() + 60
+        while stats['delivered'] < expected and time.time() < deadline:
+            gevent.sleep(0.5)
+        fanout_seconds = (stats['last_delivery'] - traffic_started) if stats['last_delivery'] else None
+
+        # Idle period - sockets must survive several ping intervals
+        gevent.sleep(args.hold)
+        final_rss = rss_bytes(pid)
+        still_open = len(sockets) - stats['closed']
+    finally:
+        for client in sockets:
+            client.close()
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    connect = sorted(stats['connect_latencies'])
+    posts = sorted(post_latencies)
+    result = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'git_revision': git_revision(),
+        'async_mode': args.async_mode,
+        'sockets_requested': args.sockets,
+        'sockets_connected': len(sockets),
+        'sockets_failed': failures[0],
+        'sockets_open_after_hold': still_open,
+        'connect_seconds': round(connect_seconds, 2),
+        'connect_p50_ms': round(percentile(connect, 50) * 1000, 2) if connect else None,
+        'connect_p99_ms': round(percentile(connect, 99) * 1000, 2) if connect else None,
+        'rss_baseline_mib': round(baseline_rss / 2**20, 1),
+        'rss_connected_mib': round(connected_rss / 2**20, 1),
+        'rss_after_hold_mib': round(final_rss / 2**20, 1),
+        'bytes_per_connection': round((connected_rss - baseline_rss) / len(sockets)) if sockets else None,
+        'messages_posted': args.messages,
+        'message_errors': post_errors,
+        'post_p50_ms': round(percentile(posts, 50) * 1000, 2) if posts else None,
+        'post_p99_ms': round(percentile(posts, 99) * 1000, 2) if posts else None,
+        'deliveries': stats['delivered'],
+        'deliveries_expected': expected,
+        'fanout_seconds': round(fanout_seconds, 2) if fanout_seconds else None,
+        'pings_answered': stats['pings'],
+    }
+    for key, value in result.items():
+        print(f"{key:>26}: {value}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write throughput benchmark for the SQLite connection settings.
+
+Runs several worker processes against one database file - each one inserts
+chat messages and reads back the latest page, like send_message and
+get_chat_messages do - once with SQLite defaults and once with the pragmas
+from app.config.Config. Reports operations per second and lock errors.
+
+Usage: python benchmarks/sqlite_concurrency.py [--workers 8] [--seconds 5] [--write-ratio 0.2]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import Config
+from app.utils.database import configure_engine
+
+DEFAULT_SETTINGS = {
+    'SQLITE_JOURNAL_MODE': 'DELETE',
+    'SQLITE_SYNCHRONOUS': 'FULL',
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,  # Same wait as the pysqlite driver default
+    'SQLITE_MMAP_SIZE': 0,
+    'SQLITE_CACHE_SIZE': -2000,
+}
+
+TUNED_SETTINGS = {
+    'SQLITE_JOURNAL_MODE': Config.SQLITE_JOURNAL_MODE,
+    'SQLITE_SYNCHRONOUS': Config.SQLITE_SYNCHRONOUS,
+    'SQLITE_BUSY_TIMEOUT_MS': Config.SQLITE_BUSY_TIMEOUT_MS,
+    'SQLITE_MMAP_SIZE': Config.SQLITE_MMAP_SIZE,
+    'SQLITE_CACHE_SIZE': Config.SQLITE_CACHE_SIZE,
+}
+
+
+def make_engine(path, settings):
+    # timeout=0 so the pysqlite driver doesn't add its own busy wait on top of the pragma
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 0})
+    configure_engine(engine, settings)
+    return engine
+
+
+def setup_database(path, settings):
+    engine = make_engine(path, settings)
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE messages (id VARCHAR(36) PRIMARY KEY, chat_room_id VARCHAR(36) NOT NULL, '
+            'user_id VARCHAR(36) NOT NULL, content TEXT NOT NULL, created_at DATETIME)'
+        ))
+        conn.execute(text('CREATE INDEX ix_messages_room_created ON messages (chat_room_id, created_at)'))
+        for i in range(2000):
+            conn.execute(text('INSERT INTO messages VALUES (:id, :room, :user, :content, datetime(\'now\'))'), {
+                'id': str(uuid.uuid4()), 'room': f'room-{i % 20}', 'user': f'user-{i % 100}', 'content': 'x' * 80,
+            })
+    engine.dispose()
+
+
+def worker(path, settings, seconds, write_ratio, seed, results):
+    rng = random.Random(seed)
+    engine = make_engine(path, settings)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        room = f'room-{rng.randrange(20)}'
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as conn:
+                    conn.execute(text('INSERT INTO messages VALUES (:id, :room, :user, :content, datetime(\'now\'))'), {
+                        'id': str(uuid.uuid4()), 'room': room, 'user': 'bench', 'content': 'y' * 80,
+                    })
+                writes += 1
+            else:
+                with engine.connect() as conn:
+                    conn.execute(text(
+                        'SELECT * FROM messages WHERE chat_room_id = :room ORDER BY created_at DESC LIMIT 50'
+                    ), {'room': room}).fetchall()
+                reads += 1
+        except OperationalError:
+            errors += 1
+    engine.dispose()
+    results.put((reads, writes, errors))
+
+
+def run(label, settings, args):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    setup_database(path, settings)
+
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=worker, args=(path, settings, args.seconds, args.write_ratio, i, results))
+        for i in range(args.workers)
+    ]
+    for proc in procs:
+        proc.start()
+    totals = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    reads = sum(t[0] for t in totals)
+    writes = sum(t[1] for t in totals)
+    errors = sum(t[2] for t in totals)
+    return {
+        'label': label,
+        'reads': reads,
+        'writes': writes,
+        'lock_errors': errors,
+        'ops_per_sec': round((reads + writes) / args.seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = [run('sqlite defaults', DEFAULT_SETTINGS, args), run('tuned pragmas', TUNED_SETTINGS, args)]
+    for r in results:
+        print(f"{r['label']:>16}: {r['ops_per_sec']:>9} ops/s  "
+              f"(reads={r['reads']} writes={r['writes']} lock errors={r['lock_errors']})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for create_app().
+
+Starts fresh interpreters and times `from app import create_app; create_app()`
+for each worker profile, then checks the median against a budget and that
+heavy optional integrations (Google OAuth, Alembic) were not
+imported. Exits non-zero when a check fails, so it can gate CI.
+
+Usage: python benchmarks/startup.py [--runs 5] [--budget-ms 1500] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules no worker should pay for at startup. (`requests` itself can't be listed -
+# python-engineio imports it unconditionally.)
+LAZY_MODULES = ['google.oauth2', 'google.auth.transport.requests', 'alembic']
+
+PROFILES = {
+    'full': {},
+    'api-only': {'APP_COMPONENTS': 'auth,events,chat,reviews,admin,batch'},
+    'chat-only': {'APP_COMPONENTS': 'socketio'},
+}
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = time.perf_counter() - started
+print(json.dumps({{'ms': elapsed * 1000, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure(profile_env, runs):
+    env = dict(os.environ, MIGRATIONS_ENABLED='false', LOG_LEVEL='WARNING', **profile_env)
+    timings = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=env, text=True)
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['ms'])
+        loaded.update(result['loaded'])
+    return {
+        'median_ms': round(statistics.median(timings), 1),
+        'min_ms': round(min(timings), 1),
+        'max_ms': round(max(timings), 1),
+        'heavy_modules_loaded': sorted(loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500, help='Max median create_app() time per profile')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for name, env in PROFILES.items():
+        result = measure(env, args.runs)
+        result['within_budget'] = result['median_ms'] <= args.budget_ms and not result['heavy_modules_loaded']
+        failed = failed or not result['within_budget']
+        results[name] = result
+        print(f"{name:>10}: median {result['median_ms']}ms (min {result['min_ms']}, max {result['max_ms']})"
+              f"  heavy imports: {', '.join(result['heavy_modules_loaded']) or 'none'}"
+              f"  {'OK' if result['within_budget'] else 'OVER BUDGET'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'budget_ms': args.budget_ms, 'profiles': results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
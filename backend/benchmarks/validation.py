@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: validation cost per request for the route schemas in
+app/utils/validators.py. For each schema it times load() on a typical
+valid payload and on a rejected one, then the whole body path
+(from_request: size check, JSON parse, load) against a bare
+request.get_json() in the same request context.
+
+Usage: python benchmarks/validation.py [--repeat 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import request
+from werkzeug.datastructures import MultiDict
+
+from app import create_app
+from app.routes.auth import SignupRequest, LoginRequest
+from app.routes.events import NewEvent, EventFeedQuery
+from app.routes.chat import NewMessage, ChatPageQuery
+from app.routes.reviews import NewReview, ReviewPageQuery
+from app.utils.pagination import encode_cursor
+from app.utils.validators import ValidationError
+from datetime import datetime
+
+NEW_EVENT = {
+    'title': 'Pickup basketball', 'description': 'Casual 5v5, all levels welcome. Bring water.',
+    'categories': ['sports', 'social'], 'streetAddress': '123 Main St', 'city': 'San Francisco',
+    'state': 'CA', 'zipCode': '94102', 'landmark': 'Near Golden Gate Park', 'capacity': 25,
+    'date': '2025-09-25T10:00:00Z',
+}
+
+CASES = [
+    # (label, schema, valid payload, rejected payload)
+    ('signup body', SignupRequest,
+     {'email': 'Someone@Example.com', 'password': 'Sup3rSecret', 'interests': ['music', 'food', 'art']},
+     {'email': 'someone@example.com', 'password': 'weakpassword'}),
+    ('login body', LoginRequest,
+     {'email': 'someone@example.com', 'password': 'Sup3rSecret'},
+     {'email': 'not-an-email', 'password': 'x'}),
+    ('create event body', NewEvent, NEW_EVENT, {**NEW_EVENT, 'capacity': 0}),
+    ('send message body', NewMessage, {'content': 'See everyone at 6!'}, {'content': 'x' * 5000}),
+    ('review body', NewReview, {'rating': 4, 'comment': 'Great host'}, {'rating': 9}),
+    ('feed query', EventFeedQuery,
+     MultiDict({'category': 'sports', 'search': 'ball', 'limit': '50', 'offset': '100', 'include_past': 'true'}),
+     MultiDict({'limit': 'lots'})),
+    ('chat page query', ChatPageQuery, MultiDict({'limit': '50', 'offset': '0'}), MultiDict({'offset': '-5'})),
+    ('review page query', ReviewPageQuery,
+     MultiDict({'limit': '20', 'cursor': encode_cursor(datetime(2025, 9, 25, 10), 'a' * 36)}),
+     MultiDict({'cursor': 'garbage'})),
+]
+
+
+def reject(schema, payload):
+    try:
+        schema.load(payload)
+    except ValidationError:
+        return
+    raise AssertionError(f'{schema.__name__} accepted {payload!r}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': False,
+        'LOG_LEVEL': 'WARNING',
+    })
+
+    def per_call_us(fn):
+        return timeit.timeit(fn, number=args.repeat) / args.repeat * 1e6
+
+    print(f"{'schema':<24}{'valid':>10}{'rejected':>10}  (us per load)")
+    for label, schema, valid, rejected in CASES:
+        schema.load(valid)
+        valid_us = per_call_us(lambda: schema.load(valid))
+        rejected_us = per_call_us(lambda: reject(schema, rejected))
+        print(f"{label:<24}{valid_us:>10.2f}{rejected_us:>10.2f}")
+
+    print(f"\n{'body path':<24}{'get_json':>10}{'validated':>10}  (us per request, create event body)")
+    with app.test_request_context('/api/events', method='POST', json=NEW_EVENT):
+        # get_json caches its result, so clear it to parse afresh each time as a new request would
+        def bare():
+            request._cached_json = (Ellipsis, Ellipsis)
+            return request.get_json()
+
+        def validated():
+            request._cached_json = (Ellipsis, Ellipsis)
+            return NewEvent.from_request()
+
+        print(f"{'create event':<24}{per_call_us(bare):>10.2f}{per_call_us(validated):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Contention check for the event waitlist: concurrent joins, leaves and
+waitlist exits against one small event, then an audit of the result.
+
+First a sequential pass checks that leaves promote the queue in FIFO
+order. Then --threads users hammer the same event: attendees leave and
+rejoin with ?waitlist=true, queued users drop out, newcomers queue. At the
+end the event must be consistent - the attendees array matches the
+event_attendees rows, nobody is both attending and queued, capacity holds
+and no spot is free while someone waits - and no request may fail with a
+5xx. Exits non-zero on any violation, so it can gate CI.
+
+Runs in-process against a fresh SQLite file by default, or pass
+--database-url for another (empty) database.
+
+Usage: python benchmarks/waitlist_contention.py [--threads 16] [--rounds 50] [--capacity 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Event, EventAttendee, WaitlistEntry, Notification
+from benchmarks.api_bench import summarize, auth_header
+
+
+def make_event(capacity, host_id):
+    event = Event(id=str(uuid.uuid4()), title='Popular event', description='Everyone wants in',
+                  category='social', tags=['social'], location='Somewhere',
+                  event_date=datetime.utcnow() + timedelta(days=7), max_attendees=capacity,
+                  attendees=[], created_by=host_id)
+    db.session.add(event)
+    db.session.commit()
+    return event.id
+
+
+def fifo_check(client, event_id, headers, capacity):
+    """Fill the event, queue the rest in order, then leave one by one: promotions must follow the queue"""
+    for header in headers[:capacity]:
+        assert client.post(f'/api/events/{event_id}/join', headers=header).status_code == 200
+    queued = headers[capacity:]
+    for expected, header in enumerate(queued, start=1):
+        response = client.post(f'/api/events/{event_id}/join?waitlist=true', headers=header)
+        assert response.status_code == 202, response.get_json()
+        assert response.get_json()['waitlist_position'] == expected
+
+    problems = []
+    for header, promoted in zip(headers[:capacity], queued):
+        client.post(f'/api/events/{event_id}/leave', headers=header)
+        attendees = client.get(f'/api/events/{event_id}').get_json()['event']['attendee_count']
+        if attendees != capacity:
+            problems.append(f'fifo: {attendees} attendees after a promotion, expected {capacity}')
+        # The promoted user is now an attendee, so a second join is refused as a duplicate
+        again = client.post(f'/api/events/{event_id}/join', headers=promoted)
+        if again.get_json().get('error') != 'You have already joined this event':
+            problems.append('fifo: head of the waitlist was not promoted')
+    return problems
+
+
+def audit(event_id):
+    problems = []
+    event = db.session.get(Event, event_id)
+    attendees = event.attendees or []
+    rows = {row[0] for row in db.session.query(EventAttendee.user_id).filter_by(event_id=event_id)}
+    queued = [row[0] for row in db.session.query(WaitlistEntry.user_id)
+                                          .filter_by(event_id=event_id)
+                                          .order_by(WaitlistEntry.position)]
+    if len(attendees) != len(set(attendees)):
+        problems.append('attendees array has duplicates')
+    if set(attendees) != rows:
+        problems.append(f'attendees array ({len(attendees)}) and event_attendees rows ({len(rows)}) differ')
+    if len(attendees) > event.max_attendees:
+        problems.append(f'{len(attendees)} attendees for {event.max_attendees} spots')
+    if set(attendees) & set(queued):
+        problems.append('users both attending and waitlisted')
+    if queued and len(attendees) < event.max_attendees:
+        problems.append(f'{event.max_attendees - len(attendees)} spots free with {len(queued)} waiting')
+    return problems, len(attendees), len(queued)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent users')
+    parser.add_argument('--rounds', type=int, default=50, help='Actions per user')
+    parser.add_argument('--capacity', type=int, default=5, help='Spots on the contested event')
+    parser.add_argument('--database-url', help='Empty database to use instead of a temporary SQLite file')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='clustr-waitlist-'), 'waitlist.db')}"
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': url,
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': False,
+        'LOG_LEVEL': 'WARNING',
+    })
+    rng = random.Random(args.seed)
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        users = [User(id=str(uuid.uuid4()), email=f'waitlist{i}@example.com', username=f'waitlist{i}', interests=[])
+                 for i in range(max(args.threads, args.capacity * 2) + 1)]
+        db.session.add_all(users)
+        db.session.commit()
+        host, users = users[0], users[1:]
+        headers = [auth_header(app, user) for user in users]
+
+        problems = fifo_check(client, make_event(args.capacity, host.id), headers[:args.capacity * 2], args.capacity)
+        event_id = make_event(args.capacity, host.id)
+        promotions_before = Notification.query.filter_by(kind='waitlist_promoted').count()
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(header, worker_rng):
+        client = app.test_client()
+        local = []
+        local_statuses = {}
+        for _ in range(args.rounds):
+            action = worker_rng.choice(('join', 'join?waitlist=true', 'join?waitlist=true', 'leave', 'leave'))
+            t0 = time.perf_counter()
+            response = client.post(f'/api/events/{event_id}/{action}', headers=header)
+            local.append(time.perf_counter() - t0)
+            local_statuses[response.status_code] = local_statuses.get(response.status_code, 0) + 1
+        with lock:
+            latencies.extend(local)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    workers = [threading.Thread(target=worker, args=(header, random.Random(rng.random())))
+               for header in headers[:args.threads]]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - started
+
+    with app.app_context():
+        found, attending, waiting = audit(event_id)
+        problems += found
+        promotions = Notification.query.filter_by(kind='waitlist_promoted').count() - promotions_before
+    errors = sum(count for status, count in statuses.items() if status >= 500)
+    if errors:
+        problems.append(f'{errors} requests failed with a server error')
+
+    result = summarize('waitlist:contended', latencies, wall, errors, threads=args.threads, capacity=args.capacity)
+    print(f"{result['scenario']}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+          f"{result['throughput_rps']} req/s")
+    print(f"statuses {dict(sorted(statuses.items()))}, {promotions} promotions, "
+          f"final {attending}/{args.capacity} attending with {waiting} waiting")
+    for problem in problems:
+        print(f'FAIL {problem}')
+    if problems:
+        sys.exit(1)
+    print('ok')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Shared pytest fixtures.
+
+query_budget fails a test when a block runs more SQL than declared:
+
+    def test_feed_query_count(client, query_budget):
+        with query_budget(4):
+            client.get('/api/events')
+"""
+import itertools
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models import User, Event
+from app.utils.query_profiler import record_queries
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': False,
+    })
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user; returns (user id, Authorization headers for them)"""
+    counter = itertools.count()
+
+    def make(**fields):
+        n = next(counter)
+        user = User(id=str(uuid.uuid4()), email=f'user{n}@example.com', username=f'user{n}', interests=[], **fields)
+        db.session.add(user)
+        db.session.commit()
+        with app.test_request_context():
+            headers = {'Authorization': f'Bearer {user.generate_token()}'}
+        return user.id, headers
+    return make
+
+
+@pytest.fixture
+def make_event(app):
+    """Create an upcoming event hosted by `host_id` with nobody attending yet; returns its id"""
+    def make(host_id, **fields):
+        event = Event(**{'id': str(uuid.uuid4()), 'title': 'Meetup', 'description': 'Come along',
+                         'category': 'social', 'tags': ['social'], 'location': 'Somewhere',
+                         'event_date': datetime.utcnow() + timedelta(days=7), 'max_attendees': 10,
+                         'attendees': [], 'created_by': host_id, **fields})
+        db.session.add(event)
+        db.session.commit()
+        return event.id
+    return make
+
+
+@pytest.fixture
+def query_budget(app):
+    """Context manager asserting the block runs at most `max_queries` statements"""
+    @contextmanager
+    def budget(max_queries):
+        with record_queries(db.engines.values()) as recorder:
+            yield recorder
+        if len(recorder) > max_queries:
+            pytest.fail(f"Query budget exceeded: {len(recorder)} > {max_queries}\n{recorder.report()}")
+    return budget
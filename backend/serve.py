@@ -0,0 +1,42 @@
+"""
+Production entry point with a selectable async mode.
+
+ASYNC_MODE=gevent (the default here) or eventlet patches the standard
+library before anything else is imported, so each Socket.IO connection is
+a greenlet instead of a pinned OS thread and one worker can hold
+thousands of them. psycogreen makes psycopg2 yield to the event loop
+while it waits on PostgreSQL.
+
+    gunicorn -k gevent -w 1 --worker-connections 10000 serve:app
+    python serve.py
+
+Run a single worker: without a Socket.IO message queue every client has
+to reach the process that holds its session.
+"""
+import os
+
+ASYNC_MODE = os.environ.setdefault('ASYNC_MODE', 'gevent')
+
+if ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:  # Only needed with PostgreSQL
+        pass
+elif ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+    try:
+        from psycogreen.eventlet import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
+from app import create_app, socketio  # noqa: E402 - must come after monkey patching
+
+app = create_app()
+
+if __name__ == '__main__':
+    socketio.run(app, host='0.0.0.0', port=app.config['PORT'])
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Event, ArchivedEvent, AnalyticsCounter, ActiveUser
+from app.utils.analytics import backfill
+
+
+def test_backfill_counts_archived_events(app):
+    created = datetime(2026, 3, 1, 12, 0)
+    fields = dict(title='Run', description='5k', category='sports', tags=['running'], location='Park',
+                  max_attendees=10, attendees=[], created_by=str(uuid.uuid4()), created_at=created)
+    db.session.add(Event(id=str(uuid.uuid4()), event_date=datetime.utcnow() + timedelta(days=1), **fields))
+    db.session.add(ArchivedEvent(id=str(uuid.uuid4()), event_date=created + timedelta(days=1), **fields))
+    db.session.commit()
+
+    backfill()
+
+    counter = AnalyticsCounter.query.filter_by(metric='events_created', period='2026-03-01', key='running').one()
+    assert counter.value == 2
+
+
+def test_attendance_counters_are_per_event_and_summed_per_day(app, client, make_user, make_event):
+    host, _ = make_user()
+    _, admin_headers = make_user(role='admin')
+    (first, first_headers), (second, second_headers) = make_user(), make_user()
+    events = [make_event(host), make_event(host)]
+    for event_id in events:
+        client.post(f'/api/events/{event_id}/join', headers=first_headers)
+        client.post(f'/api/events/{event_id}/join', headers=second_headers)
+    client.post(f'/api/events/{events[0]}/leave', headers=first_headers)
+
+    joins = dict(db.session.query(AnalyticsCounter.key, AnalyticsCounter.value).filter_by(metric='joins'))
+    assert joins == {events[0]: 2, events[1]: 2}
+    today = client.get('/api/admin/stats/attendance?days=1', headers=admin_headers).get_json()['days'][0]
+    assert (today['joins'], today['leaves']) == (4, 1)
+
+
+def test_active_users_are_written_in_batches(app, client, make_user, query_budget):
+    users = [make_user() for _ in range(3)]
+    activity = app.extensions['activity']
+
+    with query_budget(len(users)):  # Only the /me lookups - recording a sighting does no I/O
+        for _, headers in users:
+            client.get('/api/auth/me', headers=headers)
+    client.get('/api/auth/me', headers=users[0][1])  # Already seen today
+
+    assert activity.flush() == 3
+    assert ActiveUser.query.count() == 3
+    assert AnalyticsCounter.query.filter_by(metric='active_users').one().value == 3
+    assert activity.flush() == 0
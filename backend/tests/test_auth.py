@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import RevokedToken
+from app.utils.auth import TokenBlocklist
+
+
+def sync_now(blocklist):
+    blocklist._next_sync = 0.0
+    blocklist.sync()
+
+
+def test_sync_picks_up_revocation_committed_out_of_order(app):
+    blocklist = TokenBlocklist()
+    expires = datetime.utcnow() + timedelta(days=30)
+
+    # id 2 commits while id 1 is still in flight
+    db.session.add(RevokedToken(id=2, jti='second', expires_at=expires))
+    db.session.commit()
+    sync_now(blocklist)
+    assert blocklist.is_revoked('second')
+
+    db.session.add(RevokedToken(id=1, jti='first', expires_at=expires))
+    db.session.commit()
+    sync_now(blocklist)
+    assert blocklist.is_revoked('first')
+
+
+def test_sync_steps_over_settled_gap(app):
+    blocklist = TokenBlocklist()
+    expires = datetime.utcnow() + timedelta(days=30)
+    old = datetime.utcnow() - timedelta(hours=1)
+
+    # id 1 was rolled back long ago - the gap in front of id 2 is settled
+    db.session.add(RevokedToken(id=2, jti='old', expires_at=expires, created_at=old))
+    db.session.add(RevokedToken(id=3, jti='new', expires_at=expires))
+    db.session.commit()
+    sync_now(blocklist)
+    assert blocklist._settled_id == 3
+    assert blocklist.is_revoked('old') and blocklist.is_revoked('new')
+
+
+def test_revoking_a_token_twice_succeeds(app):
+    blocklist = TokenBlocklist()
+    expires = datetime.utcnow() + timedelta(days=30)
+    # Another worker's logout with the same token committed first
+    db.session.add(RevokedToken(jti='twice', expires_at=expires))
+    db.session.commit()
+
+    blocklist.revoke('twice', expires)
+    blocklist.revoke('twice', expires)
+
+    assert RevokedToken.query.filter_by(jti='twice').count() == 1
+    assert blocklist.is_revoked('twice')
+
+
+def test_sync_stays_off_the_request_session(app, monkeypatch):
+    db.session.add(RevokedToken(jti='elsewhere', expires_at=datetime.utcnow() + timedelta(days=30)))
+    db.session.commit()
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("sync used the request's session")
+    monkeypatch.setattr(db.session, 'query', refuse)
+    monkeypatch.setattr(db.session, 'execute', refuse)
+    blocklist = TokenBlocklist()
+    sync_now(blocklist)
+    assert blocklist.is_revoked('elsewhere')
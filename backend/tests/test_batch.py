@@ -0,0 +1,47 @@
+import pytest
+from flask_jwt_extended import view_decorators
+
+from app.utils.auth import token_blocklist
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Count the tokens jwt_required decodes"""
+    calls = []
+    decode = view_decorators.decode_token
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return decode(*args, **kwargs)
+    monkeypatch.setattr(view_decorators, 'decode_token', counting)
+    return calls
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_batch_verifies_token_once(client, make_user, decodes, parallel):
+    user_id, headers = make_user()
+    payload = {'requests': [{'path': '/api/auth/me'}] * 5, 'parallel': parallel}
+
+    response = client.post('/api/batch', json=payload, headers=headers)
+
+    assert [sub['status'] for sub in response.get_json()['responses']] == [200] * 5
+    assert [sub['body']['user']['id'] for sub in response.get_json()['responses']] == [user_id] * 5
+    assert len(decodes) == 1
+
+
+def test_batch_sub_requests_still_check_revocation(client, make_user, monkeypatch):
+    user_id, headers = make_user()
+    checks = []
+    monkeypatch.setattr(token_blocklist, 'is_revoked', lambda jti: checks.append(jti) or len(checks) > 2)
+
+    response = client.post('/api/batch', json={'requests': [{'path': '/api/auth/me'}] * 3}, headers=headers)
+
+    assert len(checks) == 4  # The batch and each sub-request
+    assert [sub['status'] for sub in response.get_json()['responses']] == [200, 401, 401]  # Revoked mid-batch
+
+
+def test_batch_size_limit_comes_from_config(app, client):
+    app.config['BATCH_MAX_REQUESTS'] = 2
+    response = client.post('/api/batch', json={'requests': [{'path': '/api/health'}] * 3})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'requests can have at most 2 items'
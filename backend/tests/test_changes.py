@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Event, ArchivedEvent, EventChange
+from app.utils.archive import archive_finished_events
+from app.utils.changes import current_watermark, changes_since
+
+
+def test_watermark_stops_before_unsettled_gap(app):
+    # seq 2 is visible while seq 1 is still committing
+    db.session.add(EventChange(seq=2, event_id='b', kind='updated'))
+    db.session.commit()
+    assert current_watermark(5) == 0
+
+    db.session.add(EventChange(seq=1, event_id='a', kind='updated'))
+    db.session.commit()
+    assert current_watermark(5) == 2
+
+
+def test_watermark_steps_over_settled_gap(app):
+    old = datetime.utcnow() - timedelta(minutes=1)
+    db.session.add_all([EventChange(seq=1, event_id='a', kind='updated', changed_at=old),
+                        EventChange(seq=3, event_id='c', kind='updated', changed_at=old),  # seq 2 rolled back
+                        EventChange(seq=4, event_id='d', kind='updated'),
+                        EventChange(seq=6, event_id='f', kind='updated')])  # seq 5 may still commit
+    db.session.commit()
+    watermark = current_watermark(5)
+    assert watermark == 4
+    assert changes_since(0, 100, 5)[1] == watermark
+
+
+def test_every_event_listing_carries_updated_at(app, client, make_user, make_event):
+    host, headers = make_user()
+    event_id = make_event(host)
+    old_id = make_event(host, event_date=datetime.utcnow() - timedelta(days=3))
+    archive_finished_events(timedelta(hours=1))
+    expected = db.session.get(Event, event_id).to_dict()
+    archived = db.session.get(ArchivedEvent, old_id)
+
+    feed = client.get('/api/events').get_json()['events']
+    assert [event['updated_at'] for event in feed] == [expected['updated_at']]
+    assert set(feed[0]) >= set(expected)
+    past = client.get('/api/events?include_past=true').get_json()['events']
+    assert [event['updated_at'] for event in past] == [archived.updated_at.isoformat(), expected['updated_at']]
+    mine = client.get('/api/events/mine?role=hosting', headers=headers).get_json()['events']
+    assert [event['updated_at'] for event in mine] == [expected['updated_at']]
+    assert client.get(f'/api/events/{event_id}').get_json()['event']['updated_at'] == expected['updated_at']
+
+
+def test_changes_reject_a_watermark_past_the_log(client):
+    db.session.add_all([EventChange(seq=1, event_id='a', kind='updated'),
+                        EventChange(seq=2, event_id='b', kind='updated')])
+    db.session.commit()
+
+    assert client.get('/api/events/changes?since=2').get_json()['watermark'] == 2
+    response = client.get('/api/events/changes?since=50')
+    assert response.status_code == 400
+    assert response.get_json()['watermark'] == 2
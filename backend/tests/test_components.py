@@ -0,0 +1,16 @@
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_events_worker_does_not_import_chat(tmp_path):
+    config = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}", 'SQLALCHEMY_BINDS': {},
+              'APP_COMPONENTS': ['auth', 'events'], 'SOCKETIO_MESSAGE_QUEUE': None}
+    script = (f"import sys\nfrom app import create_app\ncreate_app({config!r})\n"
+              "print(sorted(name for name in sys.modules if name.startswith('app.routes.')))")
+
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                            cwd=Path(__file__).parents[1])
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == "['app.routes.auth', 'app.routes.events']"
@@ -0,0 +1,34 @@
+import hashlib
+
+import pytest
+
+from app.utils import compression
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Bodies hashed for an ETag"""
+    bodies = []
+    original = hashlib.blake2b
+
+    def blake2b(body, **kwargs):
+        bodies.append(body)
+        return original(body, **kwargs)
+    monkeypatch.setattr(compression.hashlib, 'blake2b', blake2b)
+    return bodies
+
+
+def test_feed_gets_an_etag_and_revalidates(client, hashed):
+    response = client.get('/api/events')
+    assert response.headers['ETag']
+    assert client.get('/api/events', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert len(hashed) == 2
+
+
+def test_uncacheable_responses_are_not_hashed(client, make_user, hashed):
+    _, headers = make_user()
+    assert 'ETag' not in client.get('/api/health').headers
+    response = client.post('/api/batch', json={'requests': [{'path': '/api/events'}, {'path': '/api/auth/me'}]},
+                           headers=headers)
+    assert [sub['status'] for sub in response.get_json()['responses']] == [200, 200]
+    assert hashed == []
@@ -0,0 +1,23 @@
+import pytest
+
+from app import create_app
+from app.utils import json_provider
+from app.utils.json_provider import StdlibJSONProvider
+
+
+def config(tmp_path, provider):
+    return {'TESTING': True, 'JSON_PROVIDER': provider, 'SQLALCHEMY_BINDS': {},
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}"}
+
+
+def test_forced_orjson_without_orjson_fails_at_startup(monkeypatch, tmp_path):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    with pytest.raises(RuntimeError, match='orjson is not installed'):
+        create_app(config(tmp_path, 'orjson'))
+
+
+def test_auto_falls_back_to_stdlib(monkeypatch, tmp_path):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    app = create_app(config(tmp_path, 'auto'))
+    assert isinstance(app.json, StdlibJSONProvider)
+    assert app.json.dumps({'ok': True}) == '{"ok":true}'
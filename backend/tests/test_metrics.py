@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.utils.query_profiler import record_queries
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The conftest app with metrics on"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SQLALCHEMY_BINDS': {},
+        'METRICS_ENABLED': True,
+        'METRICS_TOKEN': 'scrape-me',
+    })
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+
+
+def test_metrics_needs_the_token_or_an_admin(client, make_user):
+    _, user_headers = make_user()
+    _, admin_headers = make_user(role='admin')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers=user_headers).status_code == 401
+    scraped = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert scraped.status_code == 200
+    assert 'ETag' not in scraped.headers  # Never revalidated, so never hashed
+    assert client.get('/metrics', headers=admin_headers).status_code == 200
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app):
+    with record_queries([db.engine]), db.engine.connect() as conn:
+        before = dict(conn.info)
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql('SELECT * FROM missing_table')
+        assert dict(conn.info) == before
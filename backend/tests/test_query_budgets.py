@@ -0,0 +1,56 @@
+"""
+Query budgets for the hot endpoints. The pages hold several rows each, so a
+per-row query (an N+1) blows the budget rather than hiding in a one-row test.
+"""
+import pytest
+
+from app import db
+
+
+@pytest.fixture
+def seeded(app, client, make_user, make_event):
+    host, host_headers = make_user()
+    users = [make_user() for _ in range(5)]
+    event_ids = [make_event(host) for _ in range(20)]
+    event_id = event_ids[0]
+    for user_id, headers in users:
+        client.post(f'/api/events/{event_id}/join', headers=headers)
+        client.post(f'/api/chat/events/{event_id}/messages', headers=headers, json={'content': 'hi'})
+    headers = users[0][1]
+    # Warm up: the first authenticated request syncs the token blocklist, later ones within the interval don't
+    client.get('/api/auth/me', headers=headers)
+    db.session.remove()
+    return event_id, headers
+
+
+@pytest.mark.parametrize('path, budget', [
+    ('/api/events', 4),  # Watermark, page, count, ratings
+    ('/api/events?include_past=true', 4),
+    ('/api/events/changes?since=0', 3),  # Log page, changed events, ratings
+    ('/api/events/changes?since={watermark}', 2),  # Watermark check, empty log page
+])
+def test_public_feed_budgets(client, query_budget, seeded, path, budget):
+    path = path.format(watermark=client.get('/api/events').get_json()['watermark'])  # Caught up
+    with query_budget(budget):
+        response = client.get(path)
+    assert response.status_code == 200
+
+
+def test_event_detail_budget(client, query_budget, seeded):
+    event_id, headers = seeded
+    with query_budget(4):  # Version, event + host + room, attendee page, ratings
+        assert client.get(f'/api/events/{event_id}').status_code == 200
+    with query_budget(1):  # Cached - only the version check
+        assert client.get(f'/api/events/{event_id}').status_code == 200
+
+
+@pytest.mark.parametrize('path, budget', [
+    ('/api/events/mine', 1),
+    ('/api/auth/me', 1),
+    ('/api/chat/events/{event_id}/messages', 4),  # Event, room, message page, count
+])
+def test_authenticated_budgets(client, query_budget, seeded, path, budget):
+    event_id, headers = seeded
+    with query_budget(budget):
+        response = client.get(path.format(event_id=event_id), headers=headers)
+    assert response.status_code == 200
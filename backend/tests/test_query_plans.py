@@ -0,0 +1,58 @@
+"""
+Run the hot endpoints and the scheduled jobs for real, then check the
+plan of every statement they sent - no hand-copied queries to drift.
+"""
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import ArchivedEvent
+from app.utils.query_plans import explain_statement, plan_problems, record_statements
+
+
+def test_hot_paths_use_indexes(app, client, make_user, make_event):
+    host, host_headers = make_user()
+    (alice, alice_headers), (bob, bob_headers), (carol, carol_headers) = make_user(), make_user(), make_user()
+    event_id = make_event(host, max_attendees=1)
+    past_id = make_event(host, event_date=datetime.utcnow() - timedelta(hours=2), attendees=[alice])
+    make_event(host, event_date=datetime.utcnow() - timedelta(days=3))  # Due for archiving
+    db.session.remove()
+
+    requests = [
+        ('post', f'/api/events/{event_id}/join', alice_headers, {}),
+        ('post', f'/api/events/{event_id}/join?waitlist=true', bob_headers, {}),
+        ('post', f'/api/events/{event_id}/join?waitlist=true', carol_headers, {'Idempotency-Key': 'carol-1'}),
+        ('post', f'/api/events/{event_id}/join?waitlist=true', carol_headers, {'Idempotency-Key': 'carol-1'}),
+        ('get', '/api/events', None, {}),
+        ('get', '/api/events?include_past=true', None, {}),
+        ('get', '/api/events/changes?since=0', None, {}),
+        ('get', '/api/events/changes?since=1', None, {}),
+        ('get', f'/api/events/{event_id}', None, {}),
+        ('get', '/api/events/mine', alice_headers, {}),
+        ('get', '/api/events/mine?role=hosting', host_headers, {}),
+        ('post', f'/api/chat/events/{event_id}/messages', alice_headers, {}),
+        ('get', f'/api/chat/events/{event_id}/messages', alice_headers, {}),
+        ('post', f'/api/events/{past_id}/reviews', alice_headers, {}),
+        ('get', f'/api/events/{past_id}/reviews', None, {}),
+        ('get', f'/api/organizers/{host}/rating', None, {}),
+        ('get', '/api/auth/me', alice_headers, {}),
+        ('get', '/api/auth/interests', alice_headers, {}),
+        ('post', f'/api/events/{event_id}/leave', alice_headers, {}),  # Promotes bob
+        ('post', f'/api/events/{event_id}/leave', carol_headers, {}),  # Leaves the waitlist
+    ]
+    bodies = {'messages': {'content': 'hello'}, 'reviews': {'rating': 5}}
+
+    with record_statements(db.engine) as statements:
+        for method, path, headers, extra in requests:
+            body = bodies.get(path.rsplit('/', 1)[-1]) if method == 'post' else None
+            response = getattr(client, method)(path, headers={**(headers or {}), **extra}, json=body)
+            assert response.status_code < 400, (path, response.get_json())
+        for name, interval, job in app.extensions['scheduler'].jobs:
+            job()
+    assert ArchivedEvent.query.count() == 1  # The archive job had work to do
+
+    failures = {}
+    for statement, parameters in statements:
+        problems = plan_problems(explain_statement(statement, parameters))
+        if problems:
+            failures[' '.join(statement.split())] = problems
+    assert not failures
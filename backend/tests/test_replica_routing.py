@@ -0,0 +1,78 @@
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models import User, Event, ChatRoom
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}',
+        'SQLALCHEMY_BINDS': {'replica': f'sqlite:///{replica}'},
+        'METRICS_ENABLED': False,
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def snapshot_replica(app):
+    """Copy the primary to the replica - writes after this are 'replication lag'"""
+    db.session.commit()
+    with sqlite3.connect(app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]) as source, \
+         sqlite3.connect(app.config['SQLALCHEMY_BINDS']['replica'][len('sqlite:///'):]) as target:
+        source.backup(target)
+
+
+def seed_event(app, attendees=2):
+    users = [User(id=str(uuid.uuid4()), email=f'user{i}@example.com', username=f'user{i}', interests=[])
+             for i in range(attendees)]
+    db.session.add_all(users)
+    event = Event(id=str(uuid.uuid4()), title='Meetup', description='Chat', category='social', tags=[],
+                  location='Somewhere', event_date=datetime.utcnow() + timedelta(days=7), max_attendees=10,
+                  attendees=[user.id for user in users], created_by=users[0].id)
+    db.session.add(event)
+    db.session.commit()
+    with app.test_request_context():
+        headers = [{'Authorization': f'Bearer {user.generate_token()}'} for user in users]
+    return event.id, headers
+
+
+def test_chat_room_created_behind_replica_is_reused(replica_app):
+    client = replica_app.test_client()
+    event_id, headers = seed_event(replica_app)
+    snapshot_replica(replica_app)
+
+    # Another request created the room; the replica hasn't seen it yet
+    room = ChatRoom(event_id=event_id)
+    db.session.add(room)
+    db.session.commit()
+    room_id = room.id
+    db.session.remove()
+
+    response = client.get(f'/api/chat/events/{event_id}/messages', headers=headers[0])
+    assert response.status_code == 200
+    assert response.get_json()['chat_room_id'] == room_id
+    assert ChatRoom.query.filter_by(event_id=event_id).count() == 1
+
+
+def test_reads_stay_on_primary_after_a_write(replica_app):
+    client = replica_app.test_client()
+    event_id, (writer, reader) = seed_event(replica_app)
+    db.session.add(ChatRoom(event_id=event_id))
+    snapshot_replica(replica_app)
+
+    response = client.post(f'/api/chat/events/{event_id}/messages', json={'content': 'hello'}, headers=writer)
+    assert response.status_code == 201
+    db.session.remove()  # Each production request starts with a fresh session
+
+    # The writer reads their message from the primary; others may still be served by the lagging replica
+    assert client.get(f'/api/chat/events/{event_id}/messages', headers=writer).get_json()['total'] == 1
+    assert client.get(f'/api/chat/events/{event_id}/messages', headers=reader).get_json()['total'] == 0
@@ -0,0 +1,75 @@
+from app import db, socketio
+from app.models import Event, EventAttendee, WaitlistEntry
+
+
+def attendees(event_id):
+    db.session.expire_all()
+    return db.session.get(Event, event_id).attendees
+
+
+def queued(event_id):
+    return [row[0] for row in db.session.query(WaitlistEntry.user_id)
+                                        .filter_by(event_id=event_id)
+                                        .order_by(WaitlistEntry.position)]
+
+
+def test_leave_promotes_waitlist_in_fifo_order(client, make_user, make_event):
+    host, _ = make_user()
+    (first, first_headers), *waiting = [make_user() for _ in range(4)]
+    event_id = make_event(host, max_attendees=1)
+
+    assert client.post(f'/api/events/{event_id}/join', headers=first_headers).status_code == 200
+    assert client.post(f'/api/events/{event_id}/join', headers=waiting[0][1]).status_code == 400  # Full
+    for position, (user_id, headers) in enumerate(waiting, start=1):
+        response = client.post(f'/api/events/{event_id}/join?waitlist=true', headers=headers)
+        assert response.status_code == 202
+        assert response.get_json()['waitlist_position'] == position
+    assert queued(event_id) == [user_id for user_id, _ in waiting]
+
+    leaving = first_headers
+    for index, (user_id, headers) in enumerate(waiting):
+        assert client.post(f'/api/events/{event_id}/leave', headers=leaving).status_code == 200
+        assert attendees(event_id) == [user_id]
+        assert queued(event_id) == [user_id for user_id, _ in waiting[index + 1:]]
+        leaving = headers
+
+
+def test_one_spot_promotes_one_user(client, make_user, make_event):
+    host, _ = make_user()
+    (first, first_headers), (second, second_headers), (third, third_headers) = [make_user() for _ in range(3)]
+    event_id = make_event(host, max_attendees=1)
+    client.post(f'/api/events/{event_id}/join', headers=first_headers)
+    client.post(f'/api/events/{event_id}/join?waitlist=true', headers=second_headers)
+    client.post(f'/api/events/{event_id}/join?waitlist=true', headers=third_headers)
+
+    client.post(f'/api/events/{event_id}/leave', headers=first_headers)
+    # Leaving again, or leaving the waitlist, frees no spot
+    assert client.post(f'/api/events/{event_id}/leave', headers=first_headers).status_code == 400
+    assert client.post(f'/api/events/{event_id}/leave', headers=third_headers).status_code == 200
+
+    assert attendees(event_id) == [second]
+    assert queued(event_id) == []
+    assert [row[0] for row in db.session.query(EventAttendee.user_id).filter_by(event_id=event_id)] == [second]
+    response = client.post(f'/api/events/{event_id}/join', headers=second_headers)
+    assert response.get_json()['error'] == 'You have already joined this event'
+
+
+def test_promotion_is_emitted_to_the_promoted_user_only(app, client, make_user, make_event):
+    host, _ = make_user()
+    (first, first_headers), (second, second_headers), (third, third_headers) = [make_user() for _ in range(3)]
+    event_id = make_event(host, max_attendees=1)
+    client.post(f'/api/events/{event_id}/join', headers=first_headers)
+    client.post(f'/api/events/{event_id}/join?waitlist=true', headers=second_headers)
+    client.post(f'/api/events/{event_id}/join?waitlist=true', headers=third_headers)
+
+    token = lambda headers: headers['Authorization'].split()[1]
+    promoted = socketio.test_client(app, auth={'token': token(second_headers)})
+    bystander = socketio.test_client(app, auth={'token': token(third_headers)})
+    anonymous = socketio.test_client(app)
+
+    client.post(f'/api/events/{event_id}/leave', headers=first_headers)
+
+    received = [(message['name'], message['args'][0]) for message in promoted.get_received()]
+    assert received == [('waitlist_promoted', {'event_id': event_id, 'title': 'Meetup'})]
+    assert bystander.get_received() == []
+    assert anonymous.get_received() == []
@@ -67,8 +67,11 @@ export const useChatStore = create((set, get) => ({
   // Initialize Socket.IO connection
   initializeSocket: async () => {
     try {
+      // The token puts this socket in our user's room, where waitlist_promoted arrives
+      const token = await AsyncStorage.getItem('userToken')
       const socket = io(SOCKET_URL, {
-        transports: ['websocket', 'polling']
+        transports: ['websocket', 'polling'],
+        auth: token ? { token } : undefined
       })
       
       socket.on('connect', () => {
@@ -102,6 +105,11 @@ export const useChatStore = create((set, get) => ({
         }
       })
       
+      socket.on('waitlist_promoted', (data) => {
+        console.log('🎉 Promoted from the waitlist:', data.event_id)
+        Alert.alert("You're in!", `A spot opened up for ${data.title}`)
+      })
+      
       socket.on('user_joined_chat', (data) => {
         console.log('👥 User joined chat:', data.username)
         // Add system message with unique ID
@@ -1,33 +1,43 @@
 #!/usr/bin/env python3
 """
-Simple script to recreate the database if permissions are stuck
+Simple script to recreate the local SQLite database if it is stuck or broken.
+The schema is built by the migrations (same as `flask db upgrade`), so the
+new database is stamped at head and later migrations apply cleanly.
 """
 import os
 import sys
 
 # Add the backend directory to the path
-backend_dir = '/Users/bhanupriyaandgaurav/Desktop/Assignment/clustr-app/backend'
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
 sys.path.insert(0, backend_dir)
 os.chdir(backend_dir)
 
 try:
-    from app import create_app, db
-    
+    from flask_migrate import upgrade
+    from app import create_app
+
     print("🔧 Recreating database...")
-    
-    # Remove old database if it exists
-    db_path = os.path.join(backend_dir, 'app', 'clustr.db')
-    if os.path.exists(db_path):
-        os.remove(db_path)
-        print("🗑️ Old database removed")
-    
-    # Create new database
+
     app = create_app()
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite:///'):
+        sys.exit(f"❌ Refusing to recreate a non-SQLite database ({uri.split(':', 1)[0]})")
+
+    # Remove old database if it exists
+    db_path = uri[len('sqlite:///'):]
+    for path in (db_path, f'{db_path}-wal', f'{db_path}-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"🗑️ Removed {os.path.basename(path)}")
+
+    # Create new database from the migrations
     with app.app_context():
-        db.create_all()
+        upgrade()
         print("✅ New database created successfully")
         print("🚀 You can now restart Flask with: python run.py")
-        
+
+except SystemExit:
+    raise
 except Exception as e:
     print(f"❌ Error: {e}")
-    print("💡 Try manually deleting app/clustr.db and restarting Flask")
+    print("💡 Try manually deleting app/clustr.db and running: FLASK_APP=run.py flask db upgrade")